@@ -1,16 +1,53 @@
 import streamlit as st
-import pandas as pd
 import numpy as np
-import plotly.graph_objects as go
-from datetime import date
-import calendar
+from collections import deque
+from datetime import date, timedelta
 import os # Import the os module for path handling
+import io
+import tempfile
+import time
+import zipfile
+from plant_calendar.config import FILE_OPTIONS, COLUMN_MAPPINGS, MONTH_NAMES
+from plant_calendar.filters import SORT_ORDERS, selected_activities, filter_and_sort, activity_month_counts
+from plant_calendar.chart import PAGE_SIZES, DEFAULT_PAGE_SIZE, CHART_BACKENDS, page_count, page_slice, build_overview_figure, figure_spec
+from plant_calendar.geometry import activity_intervals
+from plant_calendar.climate import DEFAULT_REGION, REGIONS, shift_calendar, shifted_month_masks
+from plant_calendar.lookup import build_name_index, lookup_row
+from plant_calendar.memo import LRUCache
+from plant_calendar.search import SearchIndex
+from plant_calendar.catalog import CalendarCatalog
+from plant_calendar.tasks import TaskIndex
+from plant_calendar.details import plant_details
+from plant_calendar.data import data_version, read_calendar_csv, common_name_column_for
+from plant_calendar.ingest import ingest_calendar
+from plant_calendar.warmup import CalendarLoader
+from plant_calendar.api import CalendarAPI, serve_in_thread
+from plant_calendar.reload import ROW_HASH_COLUMN, update_intervals
+from plant_calendar.quality import MissingnessReport, diff_against_reference
+from plant_calendar.store import CalendarStore
+from plant_calendar.schema import memory_usage
+from plant_calendar.export import iter_ics, iter_csv, image_formats, poster_file_name, poster_tasks, render_posters
+from plant_calendar.profiling import HISTORY_LENGTH, RerunProfile, stage, stage_table, to_jsonl
 
 # --- Configuration for Local Development ---
 # Define the directory where your CSV files are located.
 # It's good practice to keep them in a 'data' subfolder,
 # but if they are in the same directory as your app.py, set this to '.'
 DATA_DIR = '.' # CORRECTED: Changed from 'data' to '.' as CSVs are in the same folder as app.py
+# Parsed calendars are cached here as Parquet so new server processes skip CSV parsing
+CACHE_DIR = os.path.join(DATA_DIR, '.calendar_cache')
+# Curated 'golden standard' copies of the calendar CSVs (same file names) for the Data Quality Check
+REFERENCE_DIR = os.path.join(DATA_DIR, 'reference')
+# 'pandas' loads each calendar whole and filters it in memory; 'sqlite' imports the calendars into an
+# indexed SQLite database and fetches only the rows a view needs, for catalogs too large to load whole
+STORAGE_BACKEND = 'pandas'
+STORE_PATH = os.path.join(CACHE_DIR, 'calendars.sqlite')
+FETCHED_ROWS_CACHE_BYTES = 256 * 2**20
+# Encoded chart JSON kept for reruns that show the same plants (see get_result_caches)
+FIGURE_CACHE_BYTES = 64 * 2**20
+# Port of the local JSON API (plant_calendar.api) served from this process next to the page, sharing its
+# loaded calendars; None leaves it off. It can also run on its own: python -m plant_calendar.api
+API_PORT = None
 
 
 # --- Main App Interface ---
@@ -30,6 +67,12 @@ if 'app_initialized' not in st.session_state:
     st.session_state.selected_light_types = [] # List to hold selected light types checkboxes
     st.session_state.sort_order = "Alphabetical (A-Z)" # New default sort order
 
+# Performance panel state, set up separately so sessions started before it existed get it too
+if 'perf_history' not in st.session_state:
+    st.session_state.perf_history = deque(maxlen=HISTORY_LENGTH) # Stage timings of recent reruns
+    st.session_state.perf_track_memory = False
+    st.session_state.perf_cprofile_next = False # Set by the "Profile next rerun" button
+
 
 # --- Inject Custom CSS for Tighter Spacing ---
 st.markdown("""
@@ -48,187 +91,174 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
+# --- Calendar Warm-Up and Hot Reload (first script run of the server process) ---
+# Every calendar file starts loading in the background as soon as the server serves its first
+# page, so switching calendars later finds the table ready. The loader is shared by all sessions
+# and never loads the same file twice at once. It also watches the files: a CSV saved while the
+# app is running is reloaded in the background, and structures derived from it (name index, chart
+# intervals, search index) are updated only for the rows that changed.
+@st.cache_resource
+def get_calendar_loader():
+    loader = CalendarLoader(CACHE_DIR)
+    calendar_files = [(os.path.join(DATA_DIR, file_name), COLUMN_MAPPINGS[option]) for option, file_name in FILE_OPTIONS.items()]
+    if STORAGE_BACKEND == 'pandas': # The SQLite backend doesn't keep calendars in memory
+        loader.warm_up(calendar_files)
+    loader.watch(calendar_files)
+    return loader
+
+calendar_loader = get_calendar_loader()
+
+# --- Local JSON API (started once per server process, on its own thread and event loop) ---
+@st.cache_resource
+def start_calendar_api(port):
+    return serve_in_thread(CalendarAPI(DATA_DIR, get_calendar_loader()), port=port)
+
+if API_PORT is not None:
+    try:
+        start_calendar_api(API_PORT)
+    except OSError as error: # Port taken: the page works without it, and the next rerun tries again
+        st.sidebar.warning(f"Calendar API not started on port {API_PORT}: {error}")
+
+
 # --- Sidebar Controls ---
 st.sidebar.title("Controls")
 
-# --- File and Column Mapping Configuration ---
-FILE_OPTIONS = {
-    "Annuals From Seed": "Annuals_by_Seed.csv",
-    "Perennials From Seed": "Perennials_by_Seed.csv",
-    "Perennials & Shrubs From Cuttings": "Perennials_Shrubs_by_Cutting.csv",
-    "Perennials by Division": "Perennials_by_Division.csv",
-    "Bulbs Corms & Tubers": "Bulbs_Corms_Tubers.csv"
-}
-
-COLUMN_MAPPINGS = {
-    "Annuals From Seed": {'Sow': ('Sow Start', 'Sow End'), 'Plant Out': ('Plant Out Start', 'Plant Out End'), 'Flower': ('Flower Start', 'Flower End')},
-    "Perennials From Seed": {'Sow': ('Sow Start', 'Sow End'), 'Plant Out': ('Plant Out Start', 'Plant Out End'), 'Flower': ('Flower Start', 'Flower End')}, # CORRECTED Column Names to match simpler CSV headers
-    "Perennials & Shrubs From Cuttings": {'Cut': ('Cut Start', 'Cut End'), 'Plant Out': ('Plant Out Start', 'Plant Out End'), 'Flower': ('Flower Start', 'Flower End')},
-    "Perennials by Division": {'Division': ('Division Start', 'Division End'), 'Flower': ('Flower Start', 'Flower End')},
-    "Bulbs Corms & Tubers": {'Plant': ('Plant Start', 'Plant End'), 'Flower': ('Flower Start', 'Flower End')}
-}
-
-# --- Plant Details Configuration Mapping ---
-PLANT_DETAILS_MAPPING = {
-    "Annuals From Seed": [
-        {'label': 'Germination Temperature Range', 'cols': ['Germ Temp Min (°C)', 'Germ Temp Max (°C)'], 'type': 'range', 'unit': '°C'},
-        {'label': 'Germination Days Range', 'cols': ['Germ Days Min', 'Germ Days Max'], 'type': 'range', 'unit': ' days'},
-        {'label': 'Height', 'cols': ['Height (cm)'], 'type': 'single', 'unit': ' cm'},
-        {'label': 'Spread', 'cols': ['Spread (cm)'], 'type': 'single', 'unit': ' cm'},
-        {'label': 'Spacing', 'cols': ['Spacing (cm)'], 'type': 'single', 'unit': ' cm'},
-        {'label': 'Light', 'cols': ['Light'], 'type': 'single', 'unit': ''},
-        {'label': 'Water Need', 'cols': ['Water Need'], 'type': 'single', 'unit': ''},
-        {'label': 'Pollinator Friendly', 'cols': ['Pollinator Friendly'], 'type': 'single', 'unit': ''},
-        {'label': 'How to Overwinter', 'cols': ['How to Overwinter'], 'type': 'single', 'unit': ''},
-        {'label': 'Notes', 'cols': ['Notes'], 'type': 'single', 'unit': ''},
-    ],
-    "Perennials & Shrubs From Cuttings": [
-        {'label': 'Root Temperature Range', 'cols': ['Root Temp Min (°C)', 'Root Temp Max (°C)'], 'type': 'range', 'unit': '°C'},
-        {'label': 'Days to Root', 'cols': ['Root Days Min', 'Root Days Max'], 'type': 'range', 'unit': ' days'},
-        {'label': 'Height', 'cols': ['Height (cm)'], 'type': 'single', 'unit': ' cm'},
-        {'label': 'Spread', 'cols': ['Spread (cm)'], 'type': 'single', 'unit': ' cm'},
-        {'label': 'Spacing', 'cols': ['Spacing (cm)'], 'type': 'single', 'unit': ' cm'},
-        {'label': 'Light', 'cols': ['Light'], 'type': 'single', 'unit': ''},
-        {'label': 'Water Need', 'cols': ['Water Need'], 'type': 'single', 'unit': ''},
-        {'label': 'Pollinator Friendly', 'cols': ['Pollinator Friendly'], 'type': 'single', 'unit': ''},
-        {'label': 'How to Overwinter', 'cols': ['How to Overwinter'], 'type': 'single', 'unit': ''},
-        {'label': 'Notes', 'cols': ['Notes'], 'type': 'single', 'unit': ''}, # Added Notes
-    ],
-    # MODIFIED: Added germination details for Perennials From Seed
-    "Perennials From Seed": [
-        {'label': 'Germination Temperature Range', 'cols': ['Germ Temp Min (°C)', 'Germ Temp Max (°C)'], 'type': 'range', 'unit': '°C'},
-        {'label': 'Germination Days Range', 'cols': ['Germ Days Min', 'Germ Days Max'], 'type': 'range', 'unit': ' days'},
-        {'label': 'Height', 'cols': ['Height (cm)'], 'type': 'single', 'unit': ' cm'},
-        {'label': 'Spread', 'cols': ['Spread (cm)'], 'type': 'single', 'unit': ' cm'},
-        {'label': 'Spacing', 'cols': ['Spacing (cm)'], 'type': 'single', 'unit': ' cm'},
-        {'label': 'Light', 'cols': ['Light'], 'type': 'single', 'unit': ''},
-        {'label': 'Water Need', 'cols': ['Water Need'], 'type': 'single', 'unit': ''},
-        {'label': 'Pollinator Friendly', 'cols': ['Pollinator Friendly'], 'type': 'single', 'unit': ''},
-        {'label': 'How to Overwinter', 'cols': ['How to Overwinter'], 'type': 'single', 'unit': ''},
-        {'label': 'Notes', 'cols': ['Notes'], 'type': 'single', 'unit': ''},
-    ],
-    "Perennials by Division": [
-        {'label': 'Height', 'cols': ['Height (cm)'], 'type': 'single', 'unit': ' cm'},
-        {'label': 'Spread', 'cols': ['Spread (cm)'], 'type': 'single', 'unit': ' cm'},
-        {'label': 'Spacing', 'cols': ['Spacing (cm)'], 'type': 'single', 'unit': ' cm'},
-        {'label': 'Light', 'cols': ['Light'], 'type': 'single', 'unit': ''},
-        {'label': 'Water Need', 'cols': ['Water Need'], 'type': 'single', 'unit': ''},
-        {'label': 'Pollinator Friendly', 'cols': ['Pollinator Friendly'], 'type': 'single', 'unit': ''},
-        {'label': 'How to Overwinter', 'cols': ['How to Overwinter'], 'type': 'single', 'unit': ''},
-        {'label': 'Notes', 'cols': ['Notes'], 'type': 'single', 'unit': ''},
-    ],
-    "Bulbs Corms & Tubers": [
-        {'label': 'Height', 'cols': ['Height (cm)'], 'type': 'single', 'unit': ' cm'},
-        {'label': 'Spread', 'cols': ['Spread (cm)'], 'type': 'single', 'unit': ' cm'},
-        {'label': 'Spacing', 'cols': ['Spacing (cm)'], 'type': 'single', 'unit': ''},
-        {'label': 'Light', 'cols': ['Light'], 'type': 'single', 'unit': ''},
-        {'label': 'Water Need', 'cols': ['Water Need'], 'type': 'single', 'unit': ''},
-        {'label': 'Pollinator Friendly', 'cols': ['Pollinator Friendly'], 'type': 'single', 'unit': ''},
-        {'label': 'How to Overwinter', 'cols': ['How to Overwinter'], 'type': 'single', 'unit': ''}, # CORRECTED: Changed back to 'How to Overwinter'
-        {'label': 'Notes', 'cols': ['Notes'], 'type': 'single', 'unit': ''},
-    ],
-}
-
-LEGEND_SORT_ORDER = {
-    'Sow': 1,
-    'Cut': 2,
-    'Softwood Cutting': 3,
-    'Semi-Ripe Cutting': 4,
-    'Hardwood Cutting': 5,
-    'Division': 6,
-    'Plant': 7,
-    'Plant Out': 8,
-    'Flower': 9
-}
-
-# --- Advanced Color Logic Function ---
-def get_bar_color_and_legend(option, activity, row_data):
-    """
-    Determines the bar color and legend text based on the selected option,
-    the activity, and data from the row (for cutting types).
-    """
-    if option == "Perennials & Shrubs From Cuttings":
-        if activity == 'Cut':
-            cutting_type = row_data.get('Cutting Type', '').lower()
-            if 'softwood' in cutting_type:
-                return 'limegreen', 'Softwood Cutting'
-            elif 'semi-ripe' in cutting_type:
-                return 'darkgreen', 'Semi-Ripe Cutting'
-            elif 'hardwood' in cutting_type:
-                return 'saddlebrown', 'Hardwood Cutting'
-            else:
-                return 'purple', 'Cut'
-        elif activity == 'Plant Out':
-            return 'blue', 'Plant Out'
-        elif activity == 'Flower':
-            return 'yellow', 'Flower'
-
-    elif option == "Perennials by Division":
-        if activity == 'Division':
-            return 'blue', 'Division'
-        elif activity == 'Flower':
-            return 'yellow', 'Flower'
-
-    elif option == "Bulbs Corms & Tubers":
-        if activity == 'Plant':
-            return 'green', 'Plant'
-        elif activity == 'Flower':
-            return 'yellow', 'Flower'
-
-    else: # Default rules for Seed files
-        if activity == 'Sow':
-            return 'blue', 'Sow'
-        elif activity == 'Plant Out':
-            return 'green', 'Plant Out'
-        elif activity == 'Flower':
-            return 'yellow', 'Flower'
-
-    return 'grey', activity # Fallback color
-
 # --- Calendar Selection (FIRST) ---
-selected_option = st.sidebar.selectbox("Choose a Calendar to View:", options=list(FILE_OPTIONS.keys()))
-# Construct full path to the CSV file
-LOCAL_CSV_FILE = os.path.join(DATA_DIR, FILE_OPTIONS[selected_option])
-activity_periods = COLUMN_MAPPINGS[selected_option]
-
-
-# --- Data Loading (using st.cache_data for efficiency) ---
-@st.cache_data
-def load_data(file_path):
-    # Determine the correct 'Common Name' column based on the selected file
-    common_name_col_map = {
-        "Annuals_by_Seed.csv": "Common Name",  # CORRECTED: Changed from "Common Name (Scientific)"
-        "Bulbs_Corms_Tubers.csv": "Common Name",
-        "Perennials_by_Division.csv": "Common Name",
-        "Perennials_by_Seed.csv": "Common Name",
-        "Perennials_Shrubs_by_Cutting.csv": "Common Name"
-    }
-    
-    file_name = os.path.basename(file_path)
-    common_name_column = common_name_col_map.get(file_name, "Common Name") # Default to 'Common Name'
-
+ALL_CALENDARS = "All Calendars" # Cross-calendar view answered by plant_calendar.catalog
+WEEKLY_TASKS = "Weekly Tasks" # What needs doing week by week, answered by plant_calendar.tasks
+selected_option = st.sidebar.selectbox("Choose a Calendar to View:", options=list(FILE_OPTIONS.keys()) + [ALL_CALENDARS, WEEKLY_TASKS])
+if selected_option not in (ALL_CALENDARS, WEEKLY_TASKS):
+    # Construct full path to the CSV file
+    LOCAL_CSV_FILE = os.path.join(DATA_DIR, FILE_OPTIONS[selected_option])
+    activity_periods = COLUMN_MAPPINGS[selected_option]
+    # Moves every activity window and the frost bands from the UK dates the calendars are written for
+    selected_region = st.sidebar.selectbox("Climate Region:", options=list(REGIONS), key='climate_region')
+
+
+# --- Data Loading (one shared, read-only copy per calendar version for every session) ---
+# `file_version` is only part of the cache key: it changes when the CSV is saved,
+# so edits are picked up on the next rerun instead of serving stale data.
+# st.cache_resource hands every session the same DataFrame instead of an unpickled copy per call
+# (st.cache_data); sessions never modify it, they select rows by position (filters.filter_and_sort),
+# and pandas' copy-on-write would copy rather than change it if anything tried. The current and
+# previous version of each calendar are kept.
+@st.cache_resource(max_entries=2 * len(FILE_OPTIONS))
+def load_data(file_path, activity_periods, file_version=None):
     # Ensure DATA_DIR exists if it's a subfolder
     if DATA_DIR != '.' and not os.path.exists(DATA_DIR):
         st.error(f"Error: Data directory '{DATA_DIR}' not found. Please create this folder and place your CSVs inside, or set DATA_DIR = '.' if CSVs are in the same folder as app.py.")
         st.stop()
-        
-    # Check if the specific CSV file exists before attempting to load
-    if not os.path.exists(file_path):
+
+    # Parsed, normalized table (from the warm-up, or the on-disk Parquet cache when the CSV is unchanged),
+    # with every activity's start/end months parsed into integer codes and month bitmasks
+    try:
+        df_loaded, common_name_column = get_calendar_loader().get(file_path, activity_periods)
+    except FileNotFoundError:
         st.error(f"Error: CSV file not found at '{file_path}'. Please ensure your CSVs are in the '{DATA_DIR}' folder and correctly named.")
         st.stop()
-
-    df_loaded = pd.read_csv(file_path, skipinitialspace=True)
-    df_loaded.columns = df_loaded.columns.str.strip()
-    
-    # Drop rows where the determined 'Common Name' column is missing or empty, then reset index
-    if common_name_column in df_loaded.columns:
-        df_loaded.dropna(subset=[common_name_column], inplace=True)
-        df_loaded = df_loaded[df_loaded[common_name_column] != ''].reset_index(drop=True)
-    else:
-        st.error(f"Error: Expected column '{common_name_column}' not found in '{file_name}'. Please check your CSV file.")
+    except KeyError as missing_column:
+        st.error(f"Error: Expected column {missing_column} not found in '{os.path.basename(file_path)}'. Please check your CSV file.")
         st.stop()
+
+    # Name -> row positions index, so rows are fetched by dict lookup rather than mask scans
+    # (kept from the previous version of the file if an edit left the names as they were)
+    name_index, duplicate_names = get_calendar_loader().derived(
+        file_path, file_version, df_loaded, 'name_index', lambda df: build_name_index(df[common_name_column]),
+        update=lambda previous, changes, df: previous if changes.names_unchanged else None
+    )
     
-    return df_loaded, common_name_column # Return both DataFrame and the common name column name
+    return df_loaded, common_name_column, name_index, duplicate_names # DataFrame, common name column and the name index
+
+# --- Chart Geometry (cached per calendar file and year, shared like load_data) ---
+@st.cache_resource(max_entries=2 * len(FILE_OPTIONS))
+def load_intervals(file_path, activity_periods, file_version, option, year):
+    # Integer (position, activity, start_doy, end_doy, segment, legend) table for every bar of the calendar;
+    # after an edit only the changed rows' bars are recomputed
+    df_loaded, _, _, _ = load_data(file_path, activity_periods, file_version)
+    return get_calendar_loader().derived(
+        file_path, file_version, df_loaded, ('intervals', option, year),
+        lambda df: activity_intervals(df, option, activity_periods, year),
+        update=lambda previous, changes, df: update_intervals(previous, changes, df, option, activity_periods, year)
+    )
+
+# --- Regional Calendars (windows and month masks shifted per region, calendar version and year) ---
+@st.cache_resource(max_entries=2 * len(FILE_OPTIONS))
+def load_shifted_calendar(file_path, activity_periods, file_version, option, year, region):
+    df_loaded, _, _, _ = load_data(file_path, activity_periods, file_version)
+    return shift_calendar(
+        df_loaded, option, activity_periods, year, REGIONS[region],
+        intervals=load_intervals(file_path, activity_periods, file_version, option, year)
+    )
+
+@st.cache_resource(max_entries=2 * len(FILE_OPTIONS))
+def load_shifted_month_masks(option, activity_periods, file_version, year, region):
+    # SQLite storage: every row's month masks shifted to the region, for the month filter of the database query
+    # (from the stored month codes alone; the bars' legends aren't needed)
+    return shifted_month_masks(get_calendar_store().month_codes(option), activity_periods, year, REGIONS[region])
+
+# --- Result Caches (shared by all sessions of this server process) ---
+@st.cache_resource
+def get_result_caches():
+    # Search results and filtered/sorted row positions are small; figures (FigureSpec) are bounded
+    # by the estimated size of their JSON (chart.figure_size)
+    return LRUCache(max_entries=256), LRUCache(max_entries=256, max_size=FIGURE_CACHE_BYTES, sizeof=lambda spec: spec.size)
+
+@st.cache_resource
+def get_figure_savings():
+    # Build + encode time of the figures served from the figure cache since server start
+    return {'ms': 0.0}
+
+# --- SQLite Storage (STORAGE_BACKEND = 'sqlite'; calendars are imported again when their CSV changes) ---
+@st.cache_resource
+def get_calendar_store():
+    return CalendarStore(STORE_PATH)
+
+def synced_calendar_store():
+    # Every calendar file present, imported at its current version
+    store = get_calendar_store()
+    for option, file_path, _ in current_calendar_versions():
+        store.sync(option, file_path, COLUMN_MAPPINGS[option], CACHE_DIR)
+    return store
+
+@st.cache_resource
+def get_fetched_rows_cache():
+    # Rows fetched for a filter result, bounded by their in-memory size
+    return LRUCache(max_entries=32, max_size=FETCHED_ROWS_CACHE_BYTES, sizeof=memory_usage)
+
+# --- Search Indexes (built once per calendar version, shared across sessions) ---
+@st.cache_resource
+def load_search_index(file_path, activity_periods, file_version):
+    df_loaded, common_name_column, _, _ = load_data(file_path, activity_periods, file_version)
+    return get_calendar_loader().derived(
+        file_path, file_version, df_loaded, 'search_index', lambda df: SearchIndex([(file_path, df[common_name_column])]),
+        update=lambda previous, changes, df: previous if changes.names_unchanged else None
+    )
+
+def current_calendar_versions():
+    # (option, file path, data version) for every calendar file present; changes whenever any CSV is saved
+    return tuple(
+        (option, os.path.join(DATA_DIR, file_name), data_version(os.path.join(DATA_DIR, file_name)))
+        for option, file_name in FILE_OPTIONS.items() if os.path.exists(os.path.join(DATA_DIR, file_name))
+    )
+
+@st.cache_resource
+def load_all_calendars_search_index(calendar_versions):
+    # `calendar_versions` is a tuple of (option, file path, data version) for every calendar file present
+    sources = []
+    for option, file_path, file_version in calendar_versions:
+        df_loaded, common_name_column, _, _ = load_data(file_path, COLUMN_MAPPINGS[option], file_version)
+        sources.append((option, df_loaded[common_name_column]))
+    return SearchIndex(sources)
+
+def calendar_frame(option, file_path, file_version):
+    # (df, common_name_column) of a calendar for the cross-calendar structures below. With SQLite storage
+    # it is read from the store and dropped once they are built, so no calendar stays in memory
+    if STORAGE_BACKEND == 'sqlite':
+        store = get_calendar_store()
+        store.sync(option, file_path, COLUMN_MAPPINGS[option], CACHE_DIR)
+        return store.rows(option, range(store.row_count(option))), store.common_name_column(option)
+    df_loaded, common_name_column, _, _ = load_data(file_path, COLUMN_MAPPINGS[option], file_version)
+    return df_loaded, common_name_column
 
 # --- Search Plants (SECOND) ---
 st.sidebar.subheader("Search Plants")
@@ -236,21 +266,187 @@ search_query = st.sidebar.text_input("Enter plant name (e.g., 'rose', 'sweet pea
 st.session_state.search_query = search_query # Update session state
 
 
-# --- App Body (Chart Generation - needs initial df to get plant_names for selectbox) ---
-st.title(selected_option)
+# --- Cross-Calendar Catalog (built once per set of calendar versions) ---
+@st.cache_resource
+def load_catalog(calendar_versions):
+    frames = {option: calendar_frame(option, file_path, file_version) for option, file_path, file_version in calendar_versions}
+    return CalendarCatalog(frames)
+
+# --- Task Index (every calendar's activity windows by day, built once per set of calendar versions and year) ---
+@st.cache_resource
+def load_task_index(calendar_versions, year):
+    frames = {option: calendar_frame(option, file_path, file_version) for option, file_path, file_version in calendar_versions}
+    return TaskIndex(frames, year)
+
+# --- Data Quality (missing values of every calendar, computed once per set of calendar versions) ---
+@st.cache_resource
+def load_missingness_report(calendar_versions):
+    frames = {option: calendar_frame(option, file_path, file_version) for option, file_path, file_version in calendar_versions}
+    return MissingnessReport(frames)
+
+@st.cache_resource(max_entries=2 * len(FILE_OPTIONS))
+def load_ingest_report(file_path, activity_periods, file_version):
+    # The rows left out or changed when the CSV was read; the table itself usually comes from the Parquet cache
+    return ingest_calendar(file_path, activity_periods, common_name_column_for(file_path))[1]
+
+@st.cache_data
+def load_reference_diff(option, file_path, file_version, reference_path, reference_version):
+    # Cached on both files' versions, so saving either one recomputes the diff
+    df_loaded, common_name_column = calendar_frame(option, file_path, file_version)
+    return diff_against_reference(df_loaded, read_calendar_csv(reference_path, common_name_column), common_name_column)
+
+
+# --- Rerun Profiling (stage timings for the sidebar "Performance" panel) ---
+rerun_profile = RerunProfile(
+    track_memory=st.session_state.perf_track_memory,
+    cprofile=st.session_state.perf_cprofile_next,
+    calendar=selected_option,
+).start()
+st.session_state.perf_cprofile_next = False
+perf_history = st.session_state.perf_history # Session state can't be read once st.stop() is pending, so keep a reference for `finally`
+rerun_outcome = 'stopped' # st.stop()/st.rerun() unless the view is shown in full or an error occurs
 
 try:
+    # --- All Calendars View: one table of activity windows across every calendar ---
+    if selected_option == ALL_CALENDARS:
+        st.title(ALL_CALENDARS)
+        catalog = load_catalog(current_calendar_versions())
+
+        with st.sidebar.expander("Filters", expanded=True):
+            month_options = [("All Months", 0)] + [(name, i+1) for i, name in enumerate(MONTH_NAMES)]
+            _, all_calendars_month = st.selectbox(
+                "Select Month:",
+                options=month_options,
+                index=st.session_state.selected_month_num,
+                format_func=lambda x: x[0],
+                key='all_calendars_month',
+            )
+            all_calendars_activities = st.multiselect("Activities:", options=catalog.activity_names, key='all_calendars_activities')
+            all_calendars_light = st.multiselect("Sunlight Requirements:", options=catalog.light_types, key='all_calendars_light')
+            all_calendars_sources = st.multiselect("Calendars:", options=catalog.calendars, key='all_calendars_sources')
+
+        results = catalog.query(
+            month=all_calendars_month,
+            activities=all_calendars_activities,
+            light_types=all_calendars_light,
+            name=st.session_state.search_query or None,
+            calendars=all_calendars_sources,
+        )
+        if results.empty:
+            st.warning("No plants match the selected filters in any calendar.")
+            st.stop()
+
+        st.caption(f"{len(results)} activity windows for {results['plant_id'].nunique()} plants across {results['Calendar'].nunique()} calendars.")
+        st.dataframe(results.drop(columns='plant_id').sort_values(['Plant', 'Calendar'], kind='stable'), hide_index=True, use_container_width=True)
+        rerun_outcome = 'complete'
+        st.stop()
+
+    # --- Weekly Tasks View: what needs doing each week, across every calendar ---
+    if selected_option == WEEKLY_TASKS:
+        st.title(WEEKLY_TASKS)
+        calendar_versions = current_calendar_versions()
+        today = date.today()
+
+        with st.sidebar.expander("Filters", expanded=True):
+            week_start = st.date_input("Week starting:", value=today - timedelta(days=today.weekday()), key='tasks_week_start')
+            task_weeks = st.number_input("Weeks:", min_value=1, max_value=12, value=4, key='tasks_weeks')
+            task_index = load_task_index(calendar_versions, week_start.year)
+            task_activities = st.multiselect("Activities:", options=task_index.activity_names, key='tasks_activities')
+            task_calendars = st.multiselect("Calendars:", options=task_index.calendars, key='tasks_calendars')
+
+        plant_ids = None
+        if st.session_state.search_query:
+            # Plants are numbered as the catalog numbers them, so its search index picks them out
+            plant_ids, _ = load_catalog(calendar_versions).search_index.search(st.session_state.search_query)
+
+        for week_first, week_last, week_tasks in task_index.weekly(
+            week_start, int(task_weeks),
+            activities=task_activities or None, calendars=task_calendars or None, plant_ids=plant_ids,
+        ):
+            st.subheader(f"{week_first:%d %b} - {week_last:%d %b %Y}")
+            if week_tasks.empty:
+                st.caption("Nothing to do this week for the selected filters.")
+                continue
+            st.caption(f"{len(week_tasks)} activity windows for {week_tasks['Plant'].nunique()} plants.")
+            st.dataframe(week_tasks.drop(columns='position'), hide_index=True, use_container_width=True)
+        rerun_outcome = 'complete'
+        st.stop()
+
+    # --- App Body (Chart Generation - needs initial df to get plant_names for selectbox) ---
+    st.title(selected_option)
+
     # Load data and get the correct common name column
-    df, common_name_column = load_data(LOCAL_CSV_FILE)
+    LOCAL_CSV_VERSION = data_version(LOCAL_CSV_FILE) if os.path.exists(LOCAL_CSV_FILE) else None
+    filter_cache, figure_cache = get_result_caches()
+    search_positions = None # Rows matching the search query, when there is one
+    with stage('load_data'):
+        if STORAGE_BACKEND == 'sqlite':
+            # Nothing is loaded up front: every query below goes to the database and only the
+            # rows left after filtering are fetched
+            try:
+                store = synced_calendar_store()
+            except KeyError as missing_column:
+                st.error(f"Error: Expected column {missing_column} not found in '{os.path.basename(LOCAL_CSV_FILE)}'. Please check your CSV file.")
+                st.stop()
+            if store.version(selected_option) is None:
+                st.error(f"Error: CSV file not found at '{LOCAL_CSV_FILE}'. Please ensure your CSVs are in the '{DATA_DIR}' folder and correctly named.")
+                st.stop()
+            common_name_column, calendar_columns = store.common_name_column(selected_option), store.columns(selected_option)
+            duplicate_names = filter_cache.get(('duplicates', LOCAL_CSV_FILE, LOCAL_CSV_VERSION))
+            if duplicate_names is None:
+                duplicate_names = store.duplicate_names(selected_option)
+                filter_cache.put(('duplicates', LOCAL_CSV_FILE, LOCAL_CSV_VERSION), duplicate_names)
+        else:
+            df, common_name_column, name_index, duplicate_names = load_data(LOCAL_CSV_FILE, activity_periods, LOCAL_CSV_VERSION)
+            calendar_columns = list(df.columns)
+
+    # Report duplicated common names instead of silently charting only one of them
+    if duplicate_names:
+        st.sidebar.warning(
+            f"Duplicate plant names in '{os.path.basename(LOCAL_CSV_FILE)}': "
+            + ", ".join(f"{name} ({len(positions)} rows)" for name, positions in duplicate_names.items())
+            + ". Only the first matching row of each is shown."
+        )
 
     if st.session_state.search_query:
-        df = df[df[common_name_column].str.contains(st.session_state.search_query, case=False, na=False)].reset_index(drop=True)
-        if df.empty:
+        with stage('search'):
+            # Substring match on accent-folded names, falling back to ranked typo-tolerant matches
+            search_key = ('search', LOCAL_CSV_FILE, LOCAL_CSV_VERSION, st.session_state.search_query)
+            search_result = filter_cache.get(search_key)
+            if search_result is None:
+                if STORAGE_BACKEND == 'sqlite':
+                    search_result = store.search(selected_option, st.session_state.search_query)
+                else:
+                    search_index = load_search_index(LOCAL_CSV_FILE, activity_periods, LOCAL_CSV_VERSION)
+                    entries, exact_match = search_index.search(st.session_state.search_query)
+                    search_result = (np.sort(search_index.entry_position[entries]), exact_match)
+                filter_cache.put(search_key, search_result)
+            search_positions, exact_match = search_result
+
+            # Matches in the other calendars, so users know where else to look
+            other_calendars = {}
+            if STORAGE_BACKEND == 'sqlite':
+                calendar_options = [option for option, _, _ in current_calendar_versions()]
+                for option, _ in store.search_calendars(calendar_options, st.session_state.search_query)[0]:
+                    if option != selected_option:
+                        other_calendars[option] = other_calendars.get(option, 0) + 1
+            else:
+                all_calendars_index = load_all_calendars_search_index(current_calendar_versions())
+                for entry in all_calendars_index.search(st.session_state.search_query)[0]:
+                    option = all_calendars_index.catalog_of(entry)
+                    if option != selected_option:
+                        other_calendars[option] = other_calendars.get(option, 0) + 1
+            if other_calendars:
+                st.sidebar.caption("Also found in: " + ", ".join(f"{option} ({count})" for option, count in other_calendars.items()))
+
+        if len(search_positions) == 0:
             st.warning(f"No plants found matching '{st.session_state.search_query}' in this calendar type.")
             st.stop() # Exit the script early
+        if not exact_match:
+            st.info(f"No exact matches for '{st.session_state.search_query}'; showing the closest plant names.")
 
     # If df is empty after initial load or search, stop here
-    if df.empty:
+    if (store.row_count(selected_option) == 0 if STORAGE_BACKEND == 'sqlite' else df.empty):
         st.warning(f"No plants loaded from '{os.path.basename(LOCAL_CSV_FILE)}' or none found matching the search query.")
         st.stop()
 
@@ -258,13 +454,21 @@ try:
     # This ensures that filter options are relevant to the *selected calendar file*
     # and don't reset every time other filters are touched.
     if 'last_selected_option' not in st.session_state or st.session_state.last_selected_option != selected_option:
-        st.session_state.all_light_types_options = sorted(df['Light'].dropna().astype(str).unique().tolist())
+        if STORAGE_BACKEND == 'sqlite':
+            st.session_state.all_light_types_options = store.light_types(selected_option)
+        else:
+            light_values = df['Light'] if search_positions is None else df['Light'].take(search_positions)
+            st.session_state.all_light_types_options = sorted(light_values.dropna().astype(str).unique().tolist())
         st.session_state.last_selected_option = selected_option
 
 
     # --- Plant Details Expander (THIRD - relies on plant_names after initial load/search) ---
     # `plant_names` will be refined after all filters, but needs to exist here for the selectbox
-    current_plant_names_pre_filter = df[common_name_column].unique()
+    if STORAGE_BACKEND == 'sqlite':
+        current_plant_names_pre_filter = store.names(selected_option, search_positions)
+    else:
+        names = df[common_name_column]
+        current_plant_names_pre_filter = (names if search_positions is None else names.take(search_positions)).unique()
     if len(current_plant_names_pre_filter) > 0:
         with st.sidebar.expander("Plant Details", expanded=False):
             selected_plant_detail = st.selectbox(
@@ -274,41 +478,14 @@ try:
             )
             
             if selected_plant_detail:
-                plant_data = df[df[common_name_column] == selected_plant_detail].iloc[0]
-
-                def get_clean_value(row_data, col_name):
-                    value = row_data.get(col_name, None)
-                    if pd.isna(value) or (isinstance(value, str) and not value.strip()):
-                        return None
-                    return str(value).strip()
-
-                details_config = PLANT_DETAILS_MAPPING.get(selected_option, [])    
-                
-                for detail_item in details_config:
-                    label = detail_item['label']
-                    col_names = detail_item['cols']
-                    item_type = detail_item['type']
-                    unit = detail_item['unit']
-
-                    if item_type == 'range':
-                        min_val = get_clean_value(plant_data, col_names[0])
-                        max_val = get_clean_value(plant_data, col_names[1])
-                        display_text = ""
-                        if min_val is not None and max_val is not None:
-                            display_text = f"{min_val}{unit} - {max_val}{unit}"
-                        elif min_val is not None:
-                            display_text = f"Min: {min_val}{unit}"
-                        elif max_val is not None:
-                            display_text = f"Max: {max_val}{unit}"
-                        
-                        if display_text:
-                            st.markdown(f"<div class='detail-item'><p class='no-margin-p'><b>{label}</b></p><p class='no-margin-p'>{display_text}</p></div>", unsafe_allow_html=True)
-                    elif item_type == 'single':
-                        value = get_clean_value(plant_data, col_names[0])
-                        # Always display the label, show "N/A" if value is None
-                        display_value = value if value is not None else "N/A"
-                        st.markdown(f"<div class='detail-item'><p class='no-margin-p'><b>{label}</b></p><p class='no-margin-p'>{display_value}{unit}</p></div>", unsafe_allow_html=True)
-                
+                if STORAGE_BACKEND == 'sqlite':
+                    plant_data = store.lookup_row(selected_option, selected_plant_detail, search_positions)
+                else:
+                    plant_data = lookup_row(df, name_index, selected_plant_detail)
+
+                for label, display_text in plant_details(plant_data, selected_option):
+                    st.markdown(f"<div class='detail-item'><p class='no-margin-p'><b>{label}</b></p><p class='no-margin-p'>{display_text}</p></div>", unsafe_allow_html=True)
+
     else:
         st.sidebar.info("No plants available to display details for.")
 
@@ -316,8 +493,7 @@ try:
     # --- Filters Expander (FOURTH) ---
     with st.sidebar.expander("Filters", expanded=False):
         # --- Month Selection (Moved back here) ---
-        month_map = {'Jan': 1, 'Feb': 2, 'Mar': 3, 'Apr': 4, 'May': 5, 'Jun': 6, 'Jul': 7, 'Aug': 8, 'Sep': 9, 'Oct': 10, 'Nov': 11, 'Dec': 12}
-        month_names_list = ['January', 'February', 'March', 'April', 'May', 'June', 'July', 'August', 'September', 'October', 'November', 'December']
+        month_names_list = MONTH_NAMES
         
         st.subheader("Filter by Month & Activities") # Consolidated subheader
 
@@ -408,13 +584,13 @@ try:
             
             critical_columns = ['Height (cm)', 'Spread (cm)', 'Light', 'Water Need', 'Pollinator Friendly']
             
-            current_df_for_quality_check, common_name_column_qc = load_data(LOCAL_CSV_FILE) # Get common_name_column here too
+            # One missing-value bitmap for every calendar, shared by all sessions until a CSV changes
+            quality_report = load_missingness_report(current_calendar_versions())
             
             missing_data_plants = {}
             for col in critical_columns:
-                if col in current_df_for_quality_check.columns:
-                    missing_mask = current_df_for_quality_check[col].isna() | (current_df_for_quality_check[col].astype(str).str.strip() == '') # Corrected
-                    plants_with_missing = current_df_for_quality_check[missing_mask][common_name_column_qc].tolist() # Use dynamic common_name_column
+                if quality_report.has_column(selected_option, col):
+                    plants_with_missing = quality_report.missing_plants(selected_option, col)
                     
                     if plants_with_missing:
                         missing_data_plants[col] = plants_with_missing
@@ -427,65 +603,161 @@ try:
                 st.warning("⚠️ Plants with missing critical data:")
                 for col, plants in missing_data_plants.items():
                     st.markdown(f"**Missing '{col}':**")
-                    for plant_name in plants:
-                        rhs_search_url = f"https://www.rhs.org.uk/search?query={plant_name.replace(' ', '+')}"
-                        st.markdown(f"- [{plant_name}]({rhs_search_url})")
+                    # One markdown block per column rather than one element per plant
+                    st.markdown("\n".join(
+                        f"- [{plant_name}](https://www.rhs.org.uk/search?query={plant_name.replace(' ', '+')})" for plant_name in plants
+                    ))
                 st.info("Consider researching these plants on the RHS website to fill in the gaps. "
                         "Remember to save your CSV changes for the app to pick them up!")
 
-            st.markdown("---")
-            st.markdown("### Compare with Local Reference (Future Enhancement)")
-            st.markdown("This section would compare your current data against a manually curated 'golden standard' CSV "
-                        "to highlight discrepancies beyond just missing values.")
+            st.markdown("**Missing values per column, all calendars:**")
+            st.dataframe(quality_report.counts(), use_container_width=True)
 
-    # --- Apply Filters to DataFrame (this happens after all sidebar inputs are gathered) ---
-    # Helper function for month-in_range
-    def is_month_in_range(start_month_str, end_month_str, check_m_num, month_map_dict):
-        if pd.isna(start_month_str) or pd.isna(end_month_str):
-            return False
-        start_m = month_map_dict.get(str(start_month_str).strip())
-        end_m = month_map_dict.get(str(end_month_str).strip())
-        if start_m is None or end_m is None:
-            return False
-        if start_m <= end_m:
-            return start_m <= check_m_num <= end_m
-        else: # Range spans across year end (e.g., Nov-Feb)
-            return check_m_num >= start_m or check_m_num <= end_m
-
-    # Apply month/activity filters
-    # This logic block only runs if a month is selected AND at least one activity filter is checked
-    if selected_month_num != 0 and (st.session_state.filter_primary_activities or st.session_state.filter_plant_out_activity or st.session_state.filter_flower_activity):
-        combined_mask_month = pd.Series([False] * len(df)) # Initialize mask for this filter block
-
-        for activity_key, (start_col, end_col) in activity_periods.items():
-            if start_col in df.columns and end_col in df.columns:
-                # Only apply activity filter if the corresponding checkbox is true
-                if st.session_state.filter_primary_activities and activity_key in ['Sow', 'Cut', 'Division', 'Plant']:
-                    activity_mask = df.apply(lambda row: is_month_in_range(row[start_col], row[end_col], selected_month_num, month_map), axis=1)
-                    combined_mask_month = combined_mask_month | activity_mask
-                if st.session_state.filter_plant_out_activity and activity_key == 'Plant Out':
-                    activity_mask = df.apply(lambda row: is_month_in_range(row[start_col], row[end_col], selected_month_num, month_map), axis=1)
-                    combined_mask_month = combined_mask_month | activity_mask
-                if st.session_state.filter_flower_activity and activity_key == 'Flower':
-                    activity_mask = df.apply(lambda row: is_month_in_range(row[start_col], row[end_col], selected_month_num, month_map), axis=1)
-                    combined_mask_month = combined_mask_month | activity_mask
-
-        df = df[combined_mask_month].reset_index(drop=True)
-        if df.empty:
-            st.warning(f"No plants found for the selected activities in {selected_month_name} for this calendar type, after applying name search and other filters.")
-            st.stop()
+            st.markdown("---")
+            st.markdown("### Rows Rejected at Load")
+            ingest_report = load_ingest_report(LOCAL_CSV_FILE, activity_periods, LOCAL_CSV_VERSION)
+            coerced_values = sum(count for (_, _, action), count in ingest_report.counts.items() if action == 'coerced')
+            st.caption(f"{ingest_report.rows_loaded} rows loaded, {ingest_report.rows_quarantined} left out and {coerced_values} values "
+                       f"corrected, in {ingest_report.chunks} chunks at {ingest_report.megabytes_per_second:.1f} MB/s.")
+            if ingest_report.counts:
+                st.warning("⚠️ Some rows or values of this file could not be read as written:")
+                st.dataframe(ingest_report.summary(), hide_index=True, use_container_width=True)
+                st.dataframe(ingest_report.rows, hide_index=True, use_container_width=True)
+            else:
+                st.success("✅ Every row matches the expected columns and types.")
 
-    # Apply Sunlight filter (now uses selected_light_types from checkboxes)
-    if st.session_state.selected_light_types:
-        if 'Light' in df.columns:
-            # Filter where 'Light' column value is IN the list of selected checkbox types
-            df = df[df['Light'].astype(str).isin(st.session_state.selected_light_types)].reset_index(drop=True)
+            st.markdown("---")
+            st.markdown("### Compare with Local Reference")
+            reference_path = os.path.join(REFERENCE_DIR, FILE_OPTIONS[selected_option])
+            if not os.path.exists(reference_path):
+                st.info(f"Place a curated 'golden standard' copy of '{FILE_OPTIONS[selected_option]}' in the "
+                        f"'{REFERENCE_DIR}' folder to highlight discrepancies beyond just missing values.")
+            else:
+                try:
+                    reference_diff = load_reference_diff(selected_option, LOCAL_CSV_FILE, LOCAL_CSV_VERSION, reference_path, data_version(reference_path))
+                except KeyError as missing_column:
+                    st.error(f"Error: Expected column {missing_column} not found in the reference copy '{reference_path}'.")
+                else:
+                    if not (reference_diff.added or reference_diff.removed or len(reference_diff.changes)
+                            or reference_diff.added_columns or reference_diff.removed_columns):
+                        st.success("✅ Your data matches the reference copy.")
+                    if reference_diff.added_columns or reference_diff.removed_columns:
+                        st.warning(f"Columns only in your file: {', '.join(reference_diff.added_columns) or 'none'}. "
+                                   f"Columns only in the reference: {', '.join(reference_diff.removed_columns) or 'none'}.")
+                    if reference_diff.added:
+                        st.markdown(f"**Not in the reference ({len(reference_diff.added)}):** " + ", ".join(reference_diff.added))
+                    if reference_diff.removed:
+                        st.markdown(f"**Missing from your file ({len(reference_diff.removed)}):** " + ", ".join(reference_diff.removed))
+                    if len(reference_diff.changes):
+                        st.markdown(f"**Changed values ({reference_diff.changes['Plant'].nunique()} plants):**")
+                        st.dataframe(reference_diff.changes.astype(str), hide_index=True, use_container_width=True)
+
+    # --- Performance Section (SIXTH) ---
+    with st.sidebar.expander("Performance", expanded=False):
+        if perf_history:
+            previous_rerun = perf_history[-1]
+            st.caption(f"Previous rerun: {previous_rerun['total_ms']:.0f} ms ({previous_rerun['outcome']}). "
+                       f"Stage times over the last {len(perf_history)} reruns:")
+            st.dataframe(stage_table(list(perf_history)), use_container_width=True)
         else:
-            st.warning("'Light' column not found in the current dataset. Skipping sunlight filter.")
+            st.caption("Stage timings appear here from the next rerun.")
 
-        if df.empty:
-            st.warning(f"No plants found for the selected Sunlight Requirement(s): {', '.join(st.session_state.selected_light_types)}.")
-            st.stop()
+        st.checkbox(
+            "Track peak memory (tracemalloc, slows reruns down)",
+            value=st.session_state.perf_track_memory, key='check_perf_track_memory',
+            on_change=lambda: setattr(st.session_state, 'perf_track_memory', st.session_state.check_perf_track_memory)
+        )
+        st.download_button(
+            "Download timings (JSON lines)", data=to_jsonl(perf_history),
+            file_name="plant_calendar_timings.jsonl", mime="application/x-ndjson", key='perf_download'
+        )
+        warm_up_ms = calendar_loader.warm_up_ms
+        warm_up_text = f'{warm_up_ms:.0f} ms' if warm_up_ms is not None else 'still running'
+        st.caption(f"Calendar warm-up at server start: {warm_up_text if STORAGE_BACKEND == 'pandas' else f'none (SQLite storage, {STORE_PATH})'}. "
+                   "Loads per calendar file (first request = latency of the first switch to it):")
+        st.dataframe(calendar_loader.report(), use_container_width=True)
+        if st.button("Profile next rerun (cProfile)", key='perf_cprofile_button'):
+            st.session_state.perf_cprofile_next = True
+            st.rerun()
+        cprofile_report = next((record['cprofile_report'] for record in reversed(perf_history) if record['cprofile']), None)
+        if cprofile_report:
+            st.caption("cProfile of the last profiled rerun (top functions by cumulative time):")
+            st.code(cprofile_report, language=None)
+
+    # --- Apply Filters to DataFrame (this happens after all sidebar inputs are gathered) ---
+    # The month/activity filter only applies if a month is selected AND at least one activity filter is checked
+    month_filter_on = selected_month_num != 0 and (st.session_state.filter_primary_activities or st.session_state.filter_plant_out_activity or st.session_state.filter_flower_activity)
+    month_filter_activities = selected_activities(
+        activity_periods,
+        primary=st.session_state.filter_primary_activities,
+        plant_out=st.session_state.filter_plant_out_activity,
+        flower=st.session_state.filter_flower_activity,
+    ) if month_filter_on else None
+
+    if st.session_state.selected_light_types and 'Light' not in calendar_columns:
+        st.warning("'Light' column not found in the current dataset. Skipping sunlight filter.")
+
+    # Outside the UK the month filter, overview, chart and exports read the calendar shifted to the region
+    current_year = date.today().year
+    shifted = None
+    if selected_region != DEFAULT_REGION and STORAGE_BACKEND == 'pandas':
+        with stage('climate shift'):
+            shifted = load_shifted_calendar(LOCAL_CSV_FILE, activity_periods, LOCAL_CSV_VERSION, selected_option, current_year, selected_region)
+
+    # The sort widget's state is dropped on reruns that stop before it is drawn, so fall back to the default
+    sort_order = st.session_state.get('sort_order', SORT_ORDERS[0])
+
+    # Filtered, sorted row positions are memoized on the full filter state, so repeating
+    # an earlier combination of inputs (e.g. toggling a checkbox off and on) skips the work
+    filter_key = (
+        'filter', LOCAL_CSV_FILE, LOCAL_CSV_VERSION, st.session_state.search_query,
+        selected_month_num if month_filter_on else 0,
+        st.session_state.filter_primary_activities, st.session_state.filter_plant_out_activity, st.session_state.filter_flower_activity,
+        tuple(st.session_state.selected_light_types), sort_order, selected_region,
+    )
+    filter_result = filter_cache.get(filter_key)
+    if filter_result is None:
+        if STORAGE_BACKEND == 'sqlite':
+            region_month_masks = None
+            if selected_region != DEFAULT_REGION and month_filter_on: # Rows are picked by their shifted months, as the bars are drawn
+                with stage('climate shift'):
+                    region_month_masks = load_shifted_month_masks(selected_option, activity_periods, store.version(selected_option), current_year, selected_region)
+            with stage('sqlite query'):
+                filter_result = store.filter_and_sort(
+                    selected_option, search_positions,
+                    month_num=selected_month_num, activities=month_filter_activities,
+                    light_types=st.session_state.selected_light_types, sort_order=sort_order, month_masks=region_month_masks,
+                )
+        else:
+            filter_result = filter_and_sort(
+                df, common_name_column, name_index,
+                month_num=selected_month_num, activities=month_filter_activities,
+                light_types=st.session_state.selected_light_types, sort_order=sort_order, positions=search_positions,
+                month_masks=shifted.month_masks if shifted else None,
+            )
+        filter_cache.put(filter_key, filter_result)
+    empty_stage, display_positions, plant_names_sorted = filter_result
+    if STORAGE_BACKEND == 'sqlite':
+        # The rows left after filtering are the only ones fetched (for the chart, overview and exports)
+        fetched_rows_cache = get_fetched_rows_cache()
+        df = fetched_rows_cache.get(filter_key)
+        if df is None:
+            with stage('sqlite fetch'):
+                df = store.rows(selected_option, display_positions)
+            fetched_rows_cache.put(filter_key, df)
+        if selected_region != DEFAULT_REGION: # The fetched rows only
+            shifted = filter_cache.get(filter_key + ('climate',))
+            if shifted is None:
+                with stage('climate shift'):
+                    shifted = shift_calendar(df, selected_option, activity_periods, current_year, REGIONS[selected_region])
+                filter_cache.put(filter_key + ('climate',), shifted)
+
+    if empty_stage == 'month':
+        st.warning(f"No plants found for the selected activities in {selected_month_name} for this calendar type, after applying name search and other filters.")
+        st.stop()
+    if empty_stage == 'light':
+        st.warning(f"No plants found for the selected Sunlight Requirement(s): {', '.join(st.session_state.selected_light_types)}.")
+        st.stop()
 
     # If 'All Months' is selected (selected_month_num == 0) and no activity filters are active,
     # or if any month is selected but no activity filters are active, no month/activity filtering happens.
@@ -495,156 +767,151 @@ try:
     # should apply to the whole `combined_mask_month` logic, and if all checkboxes are false, it would effectively be an OR of all activities.
     # For now, I'll keep your current logic which means activity checkboxes must be selected for month filtering to apply.
 
-    # Re-evaluate plant_names after all filters for the chart
-    plant_names = df[common_name_column].unique() # Use dynamic common_name_column
-    if len(plant_names) == 0:
+    if len(plant_names_sorted) == 0:
         st.warning("No plants left after applying all filters. Adjust your filter selections.")
         st.stop()
 
-    # --- Sorting the plant_names for the Y-axis ---
-    plant_names_sorted = list(plant_names) # Start with current filtered names
-    if st.session_state.sort_order == "Alphabetical (A-Z)":
-        plant_names_sorted.sort()
-    elif st.session_state.sort_order == "Alphabetical (Z-A)":
-        plant_names_sorted.sort(reverse=True)
-    # You could add other sorting options here if needed, e.g., by first sow date etc.
-
     st.sidebar.selectbox(
         "Sort Plants By:",
-        options=["Alphabetical (A-Z)", "Alphabetical (Z-A)"],
+        options=SORT_ORDERS,
         key="sort_order",
         on_change=lambda: setattr(st.session_state, 'sort_order', st.session_state.sort_order)
     )
 
+    # --- Chart Paging: only the plants on the current page are built and sent to the browser ---
+    page_size = st.sidebar.selectbox(
+        "Plants per Page:",
+        options=PAGE_SIZES,
+        index=PAGE_SIZES.index(DEFAULT_PAGE_SIZE),
+        format_func=lambda n: "All" if n == 0 else str(n),
+        key='page_size'
+    )
+    num_pages = page_count(len(plant_names_sorted), page_size)
+    chart_page = 1
+    if num_pages > 1:
+        # Filters can shrink the list below the page that was being viewed
+        if st.session_state.get('chart_page', 1) > num_pages:
+            st.session_state.chart_page = num_pages
+        chart_page = st.sidebar.number_input(f"Page (1-{num_pages}):", min_value=1, max_value=num_pages, step=1, key='chart_page')
+    page_plants = page_slice(chart_page, page_size)
+
+    # Bars are SVG shapes; the raster renderer paints them into one image, which pans and zooms faster when dense
+    chart_backend = st.sidebar.radio("Chart Renderer:", options=list(CHART_BACKENDS), key='chart_backend')
+
+    # --- Export Section: the filtered plants as calendar events or CSV, and poster files ---
+    with st.sidebar.expander("Export", expanded=False):
+        st.caption(f"The {len(plant_names_sorted)} plants shown, in chart order.")
+        # Callables, so the files are only generated when a button is clicked
+        st.download_button(
+            "Download calendar events (.ics)",
+            data=lambda: ''.join(iter_ics(
+                df, common_name_column, selected_option, activity_periods, current_year, display_positions,
+                intervals=(shifted.intervals, shifted.legends) if shifted
+                else load_intervals(LOCAL_CSV_FILE, activity_periods, LOCAL_CSV_VERSION, selected_option, current_year)
+                if STORAGE_BACKEND == 'pandas' else None, # Otherwise computed for the fetched rows
+                duplicate_names=duplicate_names, # Of the whole calendar, so event UIDs don't depend on the filters
+            )),
+            file_name=poster_file_name(selected_option, 0, current_year, 'ics'), mime="text/calendar", key='export_ics'
+        )
+        st.download_button(
+            "Download plants (.csv)", data=lambda: ''.join(iter_csv(df, display_positions)),
+            file_name=poster_file_name(selected_option, 0, current_year, 'csv'), mime="text/csv", key='export_csv'
+        )
 
-    # --- Chart Drawing (LAST) ---
-    fig = go.Figure()
+        st.markdown("**Posters**")
+        poster_format = st.selectbox("Format:", options=image_formats(), key='export_poster_format',
+                                     help="PNG, SVG and PDF need the 'kaleido' package.")
+        poster_calendars = st.radio("Calendars:", options=["This calendar", "All calendars"], key='export_poster_calendars', horizontal=True)
+        poster_months = st.radio("Months:", options=["Whole year", "Each month"], key='export_poster_months', horizontal=True)
+        if st.button("Render posters", key='export_poster_button'):
+            start = time.perf_counter()
+            with st.spinner("Rendering posters..."), tempfile.TemporaryDirectory(prefix='plant_posters_') as out_dir:
+                tasks = poster_tasks(
+                    DATA_DIR, [selected_option] if poster_calendars == "This calendar" else list(FILE_OPTIONS),
+                    [0] if poster_months == "Whole year" else range(1, 13), current_year, poster_format, out_dir, CACHE_DIR,
+                    selected_region
+                )
+                archive = io.BytesIO()
+                with zipfile.ZipFile(archive, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+                    for path, _ in render_posters(tasks): # Worker processes, one per CPU
+                        zip_file.write(path, os.path.basename(path))
+            elapsed = time.perf_counter() - start
+            st.session_state.export_posters = (archive.getvalue(), f"{len(tasks)} posters in {elapsed:.1f} s ({len(tasks) / elapsed:.1f} posters/s).")
+        if 'export_posters' in st.session_state:
+            poster_zip, poster_caption = st.session_state.export_posters
+            st.caption(poster_caption)
+            st.download_button("Download posters (.zip)", data=poster_zip, file_name=f"plant_posters_{current_year}.zip",
+                               mime="application/zip", key='export_poster_download')
 
-    bar_width, row_spacing = 0.28, 0.88
-    num_activities = len(activity_periods)
-    if num_activities > 1: base_offsets = np.linspace(-bar_width * (num_activities - 1) / 2, bar_width * (num_activities - 1) / 2, num_activities)
-    else: base_offsets = [0]
-    offsets = {list(activity_periods.keys())[i]: offset for i, offset in enumerate(base_offsets)}
 
-    current_year = date.today().year
-    def to_day_of_year(dt): return dt.timetuple().tm_yday
-
-    all_traces = []
-
-    # Iterate through sorted plant names to draw traces
-    for i, plant_name in enumerate(plant_names_sorted): # Use plant_names_sorted here
-        row_data = df[df[common_name_column] == plant_name].iloc[0] # Use dynamic common_name_column
-        for activity, (start_col, end_col) in activity_periods.items():
-            start_month_str, end_month_str = row_data.get(start_col), row_data.get(end_col)
-            if pd.notna(start_month_str) and pd.notna(end_month_str):
-                start_month, end_month = month_map.get(str(start_month_str).strip()), month_map.get(str(end_month_str).strip())
-                if start_month is None or end_month is None: continue
-
-                bar_color, legend_name = get_bar_color_and_legend(selected_option, activity, row_data)
-
-                def create_bar_trace(start_day, end_day, legend_name_for_trace):
-                    return go.Bar(
-                        y=[(i * row_spacing) + offsets[activity]], # Use current index 'i' for y-position
-                        x=[end_day - start_day + 1],
-                        base=[start_day],
-                        orientation='h',
-                        marker_color=bar_color,
-                        name=legend_name_for_trace,
-                        width=bar_width,
-                        hoverinfo='none', # Keep this for simplicity, can be customized later
-                        marker_line_width=0,
-                        textposition='none',
-                        showlegend=True,
-                        legendgroup=legend_name_for_trace
-                    )
-
-                start_date = date(current_year, start_month, 1)
-                end_month_last_day = calendar.monthrange(current_year, end_month)[1]
-                end_date = date(current_year, end_month, end_month_last_day)
-
-                if end_month < start_month: # Activity spans across year end
-                    # Part 1: From start month to end of current year
-                    trace1 = create_bar_trace(to_day_of_year(start_date), 365, legend_name)
-                    all_traces.append((legend_name, trace1))
-                    # Part 2: From beginning of year to end month
-                    trace2 = create_bar_trace(1, to_day_of_year(date(current_year, end_month, end_month_last_day)), legend_name)
-                    all_traces.append((legend_name, trace2))
-                else: # Activity within the same year
-                    trace = create_bar_trace(to_day_of_year(start_date), to_day_of_year(end_date), legend_name)
-                    all_traces.append((legend_name, trace))
-
-    # Sort traces to ensure consistent legend order
-    sorted_traces = sorted(all_traces, key=lambda x: LEGEND_SORT_ORDER.get(x[0], 999))
-
-    # Add traces to figure, ensuring legend items appear only once
-    legend_items_added_to_figure = set()
-    for legend_name, trace in sorted_traces:
-        if legend_name not in legend_items_added_to_figure:
-            trace.showlegend = True
-            legend_items_added_to_figure.add(legend_name)
+    # --- Chart Drawing (LAST) ---
+
+    if num_pages > 1:
+        # Month-by-month activity counts for the whole filtered list, above the paged chart
+        overview_key = filter_key + ('overview',)
+        overview_spec = figure_cache.get(overview_key)
+        if overview_spec is None:
+            with stage('overview'):
+                build_start = time.perf_counter()
+                overview_fig = build_overview_figure(list(activity_periods), activity_month_counts(
+                    df, list(activity_periods), display_positions, month_masks=shifted.month_masks if shifted else None
+                ))
+                overview_spec = figure_spec(overview_fig, (time.perf_counter() - build_start) * 1000)
+            figure_cache.put(overview_key, overview_spec)
         else:
-            trace.showlegend = False # Hide duplicate legend entries
-        fig.add_trace(trace)
-
-    month_names = ['January', 'February', 'March', 'April', 'May', 'June', 'July', 'August', 'September', 'October', 'November', 'December']
-
-    # Restored bolding for month names and desktop-friendly font size for X-axis
-    bold_month_names = [f'<b>{name}</b>' for name in month_names]
-    x_tick_text = bold_month_names
-    x_tick_font_size = 10
-
-    month_midpoints = [to_day_of_year(date(current_year, m, 15)) for m in range(1, 13)]
-    month_boundaries = [to_day_of_year(date(current_year, m, 1)) for m in range(1, 13)]; month_boundaries.append(366)
-    shapes = []
-    # Calculate total y-span dynamically based on number of plants and bar height
-    total_y_span = (len(plant_names_sorted) - 1) * row_spacing + (bar_width * num_activities) if len(plant_names_sorted) > 0 else 10
-
-    for x_pos in month_boundaries:
-        shapes.append(go.layout.Shape(type="line", x0=x_pos, y0=-0.5, x1=x_pos, y1=total_y_span, line=dict(color="DimGray", width=1), layer='below'))
-
-    frost_color = 'rgba(70, 130, 180, 0.3)';
-    # Adjust frost dates for UK (approx. early Oct to end of March)
-    shapes.append(go.layout.Shape(type="rect", x0=1, y0=-0.5, x1=to_day_of_year(date(current_year, 4, 1)), y1=total_y_span, fillcolor=frost_color, line_width=0, layer='below')) # Jan 1 to Apr 1
-    # Corrected y0 parameter in the second rectangle shape (was y1=-0.5)
-    shapes.append(go.layout.Shape(type="rect", x0=to_day_of_year(date(current_year, 10, 1)), y0=-0.5, x1=366, y1=total_y_span, fillcolor=frost_color, line_width=0, layer='below')) # Oct 1 to Dec 31
-
-    # Restored bolding for plant names and desktop-friendly font size for Y-axis
-    bold_plant_names_for_axis = [f'<b>{name}</b>' for name in plant_names_sorted] # Use sorted list for axis labels
-    y_tick_text = bold_plant_names_for_axis
-    y_tick_font_size = 10
-
-    y_tick_vals = [i * row_spacing for i in range(len(plant_names_sorted))] # Use sorted list length
-
-    fig.update_layout(
-        height=max(600, len(plant_names_sorted) * 40), # Dynamic height, minimum 600, based on sorted list
-        barmode='overlay',
-        showlegend=True,
-        # Restored desktop-friendly margins
-        margin=dict(l=150, r=20, t=50, b=50),
-        xaxis=dict(
-            tickvals=month_midpoints,
-            ticktext=x_tick_text,
-            showgrid=False,
-            range=[1, 366],
-            tickfont=dict(color='black', size=x_tick_font_size),
-            side='top'
-        ),
-        yaxis=dict(
-            tickvals=y_tick_vals,
-            ticktext=y_tick_text,
-            autorange="reversed", # Puts first plant at top
-            tickfont=dict(color='black', size=y_tick_font_size)
-        ),
-        plot_bgcolor='white',
-        legend=dict(title_text='Activity'),
-        shapes=shapes
+            get_figure_savings()['ms'] += overview_spec.build_ms
+        st.plotly_chart(overview_spec.figure, use_container_width=True)
+        first_shown = (chart_page - 1) * page_size + 1
+        st.caption(f"Plants {first_shown}-{min(chart_page * page_size, len(plant_names_sorted))} of {len(plant_names_sorted)} (page {chart_page} of {num_pages}).")
+
+    # Keyed on the content of the rows on the page rather than the file version, so after an edit
+    # only pages showing an edited row are rebuilt
+    page_positions = display_positions[page_plants]
+    figure_key = (
+        'figure', LOCAL_CSV_FILE, selected_option, current_year, selected_region, chart_backend,
+        tuple(plant_names_sorted[page_plants]), df.loc[page_positions, ROW_HASH_COLUMN].to_numpy().tobytes(),
     )
+    # Cached as the built figure: a hit skips building it (st.plotly_chart still encodes it)
+    chart_spec = figure_cache.get(figure_key)
+    if chart_spec is None:
+        build_start = time.perf_counter()
+        with stage('intervals'):
+            if shifted:
+                intervals, legends = shifted.intervals, shifted.legends
+            elif STORAGE_BACKEND == 'sqlite': # Only the page's rows
+                intervals, legends = activity_intervals(df.loc[page_positions], selected_option, activity_periods, current_year)
+            else:
+                intervals, legends = load_intervals(LOCAL_CSV_FILE, activity_periods, LOCAL_CSV_VERSION, selected_option, current_year)
+        with stage('figure build'):
+            fig = CHART_BACKENDS[chart_backend](
+                intervals, legends, page_positions, plant_names_sorted[page_plants], len(activity_periods), current_year,
+                frost_bands=shifted.frost_bands if shifted else None,
+            )
+        with stage('figure size'): # Estimated size of its JSON, which the figure cache is bounded by
+            chart_spec = figure_spec(fig, (time.perf_counter() - build_start) * 1000)
+        figure_cache.put(figure_key, chart_spec)
+    else:
+        get_figure_savings()['ms'] += chart_spec.build_ms
 
     # Chart renders to fill its container width for PC optimization
-    st.plotly_chart(fig, use_container_width=True) 
+    with stage('plotly_chart'): # Figure serialization and sending it to the browser
+        st.plotly_chart(chart_spec.figure, use_container_width=True)
+
+    filter_stats, figure_stats = filter_cache.stats(), figure_cache.stats()
+    st.sidebar.caption(
+        f"Result cache: {filter_stats['hits']} hits / {filter_stats['misses']} misses · "
+        f"Figure cache: {figure_stats['hits']} hits / {figure_stats['misses']} misses "
+        f"({figure_stats['entries']} stored, {figure_stats['size'] / 2**20:.1f} MiB) · "
+        f"{get_figure_savings()['ms'] / 1000:.1f} s of figure building saved"
+    )
+    rerun_outcome = 'complete'
 
 except Exception as e:
+    rerun_outcome = 'error'
     st.error(f"An unexpected error occurred: {e}")
     st.info("Please check your CSV files and ensure they are correctly formatted and located in the specified 'data' folder.")
     import traceback
     st.text(traceback.format_exc())
+finally:
+    # Recorded even when the rerun ends early, so stopped and failed reruns show up in the history too
+    perf_history.append(rerun_profile.finish(rerun_outcome))
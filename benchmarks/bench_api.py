@@ -0,0 +1,168 @@
+"""
+Load test for the local JSON API (`plant_calendar.api`): starts the server
+in its own process over synthetic catalogs and drives it with keep-alive
+HTTP/1.1 connections from an asyncio client, reporting requests per second
+and latency percentiles for:
+
+- cold: every request a different URL (search, month/activity/light
+  filters, plant details, chart intervals, some for another climate region),
+  so each one is computed
+- cached: the same URLs again, answered from the response cache
+- revalidated: the same URLs with their ETags in If-None-Match (304s)
+- after an edit: revalidated again once one calendar's CSV has been saved,
+  so its responses are recomputed (200) and the others stay 304
+
+It also checks the answers: cached bodies equal the computed ones, and
+ETags change exactly for the edited calendar. Client and server share the
+machine, so the figures include the client's own time.
+
+Run from the repository root:
+    python -m benchmarks.bench_api [connections] [rows] [urls]
+"""
+import asyncio
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from urllib.parse import quote, urlencode
+
+import numpy as np
+
+from benchmarks.synthetic import synthetic_catalog, write_catalog
+from plant_calendar.api import CALENDAR_SLUGS
+from plant_calendar.climate import REGIONS
+from plant_calendar.config import FILE_OPTIONS, COLUMN_MAPPINGS
+from plant_calendar.data import common_name_column_for
+
+LIGHT_TYPES = ['Full Sun', 'Partial Shade', 'Shade']
+CACHE_MB = 1024 # Server response cache, large enough for every URL, so the cached passes never miss
+
+
+def request_urls(rows, count, seed=0):
+    """`count` distinct request paths spread over every calendar and endpoint."""
+    rng = random.Random(seed)
+    names = {option: list(synthetic_catalog(option, rows, index)[common_name_column_for(FILE_OPTIONS[option])].dropna())
+             for index, option in enumerate(FILE_OPTIONS)} # The catalogs main writes
+    urls = set()
+    while len(urls) < count:
+        slug = rng.choice(list(CALENDAR_SLUGS))
+        option = CALENDAR_SLUGS[slug]
+        name = rng.choice(names[option])
+        filters = {'month': rng.randint(1, 12), 'activity': rng.sample(list(COLUMN_MAPPINGS[option]), rng.randint(1, 2))}
+        if rng.random() < 0.3:
+            filters['light'] = rng.choice(LIGHT_TYPES)
+        if rng.random() < 0.2:
+            filters['region'] = rng.choice(list(REGIONS))
+        kind = rng.random()
+        if kind < 0.3:
+            urls.add(f"/calendars/{slug}/plants?" + urlencode({'q': name.split()[0][:rng.randint(3, 6)]}))
+        elif kind < 0.55:
+            urls.add(f"/calendars/{slug}/plants?" + urlencode(filters, doseq=True))
+        elif kind < 0.8:
+            urls.add(f"/calendars/{slug}/plants/{quote(name, safe='')}")
+        else:
+            urls.add(f"/calendars/{slug}/intervals?" + urlencode(filters, doseq=True))
+    return sorted(urls)
+
+
+async def fetch(reader, writer, path, etag=None):
+    """(status, headers, body) of one GET on an open keep-alive connection."""
+    request = f"GET {path} HTTP/1.1\r\nHost: localhost\r\n" + (f"If-None-Match: {etag}\r\n" if etag else "") + "\r\n"
+    writer.write(request.encode('latin-1'))
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while (line := await reader.readline()) not in (b'\r\n', b''):
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    return status, headers, await reader.readexactly(int(headers['content-length']))
+
+
+async def load(port, requests, connections):
+    """Sends (path, etag) `requests` over `connections` connections. Returns ([(status, headers, body)], latencies in ms, seconds)."""
+    results, latencies = [None] * len(requests), [0.0] * len(requests)
+    queue = iter(range(len(requests)))
+
+    async def client():
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        for i in queue:
+            start = time.perf_counter()
+            results[i] = await fetch(reader, writer, *requests[i])
+            latencies[i] = (time.perf_counter() - start) * 1000
+        writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(connections)))
+    return results, np.array(latencies), time.perf_counter() - start
+
+
+def report(label, latencies, seconds):
+    print(f"  {label:<28} {len(latencies) / seconds:8.0f} {np.percentile(latencies, 50):8.2f} "
+          f"{np.percentile(latencies, 99):8.2f} {latencies.max():8.1f}")
+
+
+def start_server(data_dir, cache_mb):
+    """Starts `python -m plant_calendar.api` on a free port; returns (process, port) once it answers."""
+    process = subprocess.Popen([sys.executable, '-m', 'plant_calendar.api', '--data-dir', data_dir, '--port', '0', '--cache-mb', str(cache_mb)],
+                               stderr=subprocess.PIPE, text=True)
+    port = int(process.stderr.readline().rsplit(':', 1)[1].split('/')[0]) # "Serving ... on http://127.0.0.1:PORT/calendars"
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/calendars", timeout=600) as response: # Waits for every calendar to load
+        assert response.status == 200
+    return process, port
+
+
+def main():
+    connections = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+    count = int(sys.argv[3]) if len(sys.argv) > 3 else 2000
+    work_dir = tempfile.mkdtemp()
+    process = None
+    try:
+        for seed, option in enumerate(FILE_OPTIONS):
+            write_catalog(option, rows, work_dir, seed)
+        process, port = start_server(work_dir, CACHE_MB)
+        urls = request_urls(rows, count)
+        print(f"{len(FILE_OPTIONS)} calendars x {rows} rows, {len(urls)} distinct URLs, {connections} connections")
+        print(f"  {'pass':<28} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+
+        cold, latencies, seconds = asyncio.run(load(port, [(url, None) for url in urls], connections))
+        report("cold (computed)", latencies, seconds)
+        assert all(status == 200 for status, _, _ in cold), {status for status, _, _ in cold}
+        assert all(headers['x-cache'] == 'miss' for _, headers, _ in cold)
+        body_mb = sum(len(body) for _, _, body in cold) / 2**20
+        assert body_mb < CACHE_MB, f"responses ({body_mb:.0f} MiB) don't fit the cache; use fewer URLs or rows"
+
+        cached, latencies, seconds = asyncio.run(load(port, [(url, None) for url in urls] * 3, connections))
+        report("cached", latencies, seconds)
+        assert all(headers['x-cache'] == 'hit' for _, headers, _ in cached)
+        assert [body for _, _, body in cached[:len(urls)]] == [body for _, _, body in cold], "cached bodies differ"
+
+        etags = [(url, headers['etag']) for url, (_, headers, _) in zip(urls, cold)]
+        revalidated, latencies, seconds = asyncio.run(load(port, etags * 3, connections))
+        report("revalidated (304)", latencies, seconds)
+        assert all(status == 304 for status, _, _ in revalidated)
+
+        edited_slug = list(CALENDAR_SLUGS)[0]
+        edited_file = os.path.join(work_dir, FILE_OPTIONS[CALENDAR_SLUGS[edited_slug]])
+        os.utime(edited_file, ns=(time.time_ns(), time.time_ns() + 10**9)) # Saved again, contents unchanged
+        after_edit, latencies, seconds = asyncio.run(load(port, etags, connections))
+        report(f"after saving {FILE_OPTIONS[CALENDAR_SLUGS[edited_slug]]}", latencies, seconds)
+        for (url, etag), (status, headers, body), (_, _, cold_body) in zip(etags, after_edit, cold):
+            if url.startswith(f"/calendars/{edited_slug}/"):
+                assert status == 200 and headers['etag'] != etag and body == cold_body, url
+            else:
+                assert status == 304, url
+        print(f"  {sum(status == 200 for status, _, _ in after_edit)} responses of the edited calendar recomputed, "
+              f"the rest still 304; {body_mb:.0f} MiB of responses cached")
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
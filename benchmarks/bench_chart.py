@@ -0,0 +1,123 @@
+"""
+Benchmark: the old chart loop (per-bar date arithmetic and one go.Bar per
+plant x activity) vs. the precomputed interval table and one batched trace
+per legend group. Checks both figures draw the same bars in the same legend
+order, then compares trace count, build time and JSON size/time.
+
+Run from the repository root:
+    python -m benchmarks.bench_chart
+"""
+import calendar
+import time
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from plant_calendar.chart import build_bar_traces
+from plant_calendar.config import LEGEND_SORT_ORDER, get_bar_color_and_legend
+from plant_calendar.filters import MONTH_MAP, add_month_codes
+from plant_calendar.geometry import activity_intervals
+
+CSV_FILE = "Perennials_Shrubs_by_Cutting.csv"
+OPTION = "Perennials & Shrubs From Cuttings"
+ACTIVITY_PERIODS = {'Cut': ('Cut Start', 'Cut End'), 'Plant Out': ('Plant Out Start', 'Plant Out End'), 'Flower': ('Flower Start', 'Flower End')}
+BAR_WIDTH, ROW_SPACING = 0.28, 0.88
+YEAR = 2025 # Not a leap year: the old code hard-coded 365 as the last day
+
+
+def read_catalog(file_path, scale):
+    df = pd.read_csv(file_path, skipinitialspace=True)
+    df.columns = df.columns.str.strip()
+    df = df.dropna(subset=['Common Name']).reset_index(drop=True)
+    copies = []
+    for n in range(scale):
+        copy = df.copy()
+        copy['Common Name'] = copy['Common Name'] + (f" #{n}" if n else "")
+        copies.append(copy)
+    return add_month_codes(pd.concat(copies, ignore_index=True), ACTIVITY_PERIODS)
+
+
+def legacy_figure(rows, offsets):
+    # The chart loop as Plant_App.py used to run it
+    def to_day_of_year(dt): return dt.timetuple().tm_yday
+    all_traces = []
+    for i, row_data in enumerate(rows):
+        for activity, (start_col, end_col) in ACTIVITY_PERIODS.items():
+            start_month_str, end_month_str = row_data.get(start_col), row_data.get(end_col)
+            if pd.isna(start_month_str) or pd.isna(end_month_str):
+                continue
+            start_month, end_month = MONTH_MAP.get(str(start_month_str).strip()), MONTH_MAP.get(str(end_month_str).strip())
+            if start_month is None or end_month is None: continue
+            bar_color, legend_name = get_bar_color_and_legend(OPTION, activity, row_data)
+
+            def create_bar_trace(start_day, end_day):
+                return legend_name, go.Bar(
+                    y=[(i * ROW_SPACING) + offsets[activity]], x=[end_day - start_day + 1], base=[start_day], orientation='h',
+                    marker_color=bar_color, name=legend_name, width=BAR_WIDTH, hoverinfo='none', marker_line_width=0,
+                    textposition='none', showlegend=True, legendgroup=legend_name)
+
+            start_day = to_day_of_year(date(YEAR, start_month, 1))
+            end_day = to_day_of_year(date(YEAR, end_month, calendar.monthrange(YEAR, end_month)[1]))
+            if end_month < start_month:
+                all_traces.append(create_bar_trace(start_day, 365))
+                all_traces.append(create_bar_trace(1, end_day))
+            else:
+                all_traces.append(create_bar_trace(start_day, end_day))
+
+    fig = go.Figure()
+    legend_items_added_to_figure = set()
+    for legend_name, trace in sorted(all_traces, key=lambda x: LEGEND_SORT_ORDER.get(x[0], 999)):
+        trace.showlegend = legend_name not in legend_items_added_to_figure
+        legend_items_added_to_figure.add(legend_name)
+        fig.add_trace(trace)
+    return fig
+
+
+def batched_figure(intervals, legends, display_positions, offsets):
+    fig = go.Figure()
+    fig.add_traces(build_bar_traces(intervals, legends, display_positions, offsets, ROW_SPACING, BAR_WIDTH))
+    return fig
+
+
+def drawn_bars(fig):
+    # (legend, colour, y, base, length) for every bar, plus legend order
+    drawn, legend_order = set(), []
+    for trace in fig.data:
+        if trace.name not in legend_order:
+            legend_order.append(trace.name)
+        for y, x, base in zip(trace.y, trace.x, trace.base):
+            drawn.add((trace.name, trace.marker.color, round(float(y), 6), int(base), int(x)))
+    return drawn, legend_order
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    base_offsets = np.linspace(-BAR_WIDTH, BAR_WIDTH, len(ACTIVITY_PERIODS))
+    offsets = dict(zip(ACTIVITY_PERIODS, base_offsets))
+    for scale in (1, 12, 36):
+        df = read_catalog(CSV_FILE, scale)
+        display_positions = df.sort_values('Common Name').index.to_numpy()
+        rows = [df.loc[position] for position in display_positions]
+
+        (intervals, legends), interval_s = timed(activity_intervals, df, OPTION, ACTIVITY_PERIODS, YEAR)
+        old_fig, old_build = timed(legacy_figure, rows, offsets)
+        new_fig, new_build = timed(batched_figure, intervals, legends, display_positions, base_offsets)
+        assert drawn_bars(old_fig) == drawn_bars(new_fig)
+
+        old_json, old_encode = timed(old_fig.to_json)
+        new_json, new_encode = timed(new_fig.to_json)
+        print(f"{len(rows):>5} plants  traces {len(old_fig.data):>6} -> {len(new_fig.data)}  "
+              f"build {old_build * 1000:8.1f} -> {new_build * 1000:5.1f} ms (+{interval_s * 1000:.1f} ms interval table, once per load)  "
+              f"to_json {old_encode * 1000:6.1f} -> {new_encode * 1000:4.1f} ms  "
+              f"payload {len(old_json) / 1024:6.0f} -> {len(new_json) / 1024:4.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark: moving a 100k-row calendar to each climate region with
+`climate.shift_calendar` (one vectorised pass over the interval table)
+vs. shifting every window row by row with `datetime` arithmetic, and the
+cached lookup the app does on later reruns.
+
+The row-by-row reference also checks the result: every shifted window,
+including those that wrap over the year end before or after the shift,
+must have the same first and last day, and every row the same months, in
+both.
+
+Run from the repository root:
+    python -m benchmarks.bench_climate [rows]
+"""
+import sys
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+from benchmarks.synthetic import synthetic_catalog
+from plant_calendar.climate import REGIONS, activity_shifts, shift_calendar
+from plant_calendar.config import COLUMN_MAPPINGS
+from plant_calendar.filters import add_month_codes, start_code_column, end_code_column
+from plant_calendar.geometry import POSITION, ACTIVITY, START_DOY, END_DOY, SEGMENT, activity_intervals
+from plant_calendar.memo import LRUCache
+
+OPTION = "Perennials & Shrubs From Cuttings"
+YEAR = 2026
+
+
+def shift_rows(df, activity_periods, year, shifts):
+    """Reference: {(row, activity): (first day, last day)} and {(row, activity): month bitmask}, one window at a time."""
+    year_start = date(year, 1, 1)
+    year_days = (date(year + 1, 1, 1) - year_start).days
+    windows, months = {}, {}
+    for activity_idx, activity in enumerate(activity_periods):
+        start_codes = df[start_code_column(activity)].to_numpy()
+        end_codes = df[end_code_column(activity)].to_numpy()
+        for row, (start_month, end_month) in enumerate(zip(start_codes, end_codes)):
+            if start_month == 0 or end_month == 0:
+                continue
+            start = date(year, start_month, 1)
+            end = (date(year, end_month + 1, 1) if end_month < 12 else date(year + 1, 1, 1)) - timedelta(days=1)
+            length = ((end - start).days % year_days) + 1 # Wraps over the year end if the end month comes first
+            shift = 0 if length == year_days else int(shifts[activity_idx])
+            first = year_start + timedelta(days=((start - year_start).days + shift) % year_days)
+            last = first + timedelta(days=length - 1) # In the next year if the window now runs over the year end
+            bits = 0
+            for month in range(first.month - 1, min(first.month + 11, (last.year - year) * 12 + last.month)):
+                bits |= 1 << (month % 12)
+            windows[row, activity_idx] = (first.timetuple().tm_yday, last.timetuple().tm_yday)
+            months[row, activity_idx] = bits
+    return windows, months
+
+
+def check(df, activity_periods, shifted, reference):
+    windows, months = reference
+    got = {}
+    for position, activity, start, end in shifted.intervals[:, [POSITION, ACTIVITY, START_DOY, END_DOY]].tolist():
+        # Segment 1 of a window over the year end comes after segment 0: keep the first start and the last end
+        got[position, activity] = (got.get((position, activity), (start,))[0], end)
+    assert got == windows, "shifted windows differ from the row-by-row reference"
+    for activity_idx, activity in enumerate(activity_periods):
+        expected = np.zeros(len(df), dtype=np.uint16)
+        for (row, idx), bits in months.items():
+            if idx == activity_idx:
+                expected[row] = bits
+        assert np.array_equal(shifted.month_masks[activity], expected), f"{activity} month masks differ"
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    activity_periods = COLUMN_MAPPINGS[OPTION]
+    df = add_month_codes(synthetic_catalog(OPTION, rows).dropna(subset=['Common Name']).reset_index(drop=True), activity_periods)
+    start = time.perf_counter()
+    intervals = activity_intervals(df, OPTION, activity_periods, YEAR)
+    print(f"{len(df)} rows, {len(intervals[0])} interval rows (built once per calendar version in "
+          f"{(time.perf_counter() - start) * 1000:.0f} ms)")
+    cache = LRUCache(max_entries=64)
+
+    print(f"  {'region':<30} {'shift (days)':>14} {'wrapping':>9} {'row by row':>11} {'vectorised':>11} {'cached':>9}")
+    for region, profile in REGIONS.items():
+        shifts = activity_shifts(profile, activity_periods, YEAR)
+        start = time.perf_counter()
+        reference = shift_rows(df, activity_periods, YEAR, shifts)
+        row_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        shifted = shift_calendar(df, OPTION, activity_periods, YEAR, profile, intervals)
+        vector_ms = (time.perf_counter() - start) * 1000
+        check(df, activity_periods, shifted, reference)
+
+        cache.put((region, OPTION, YEAR), shifted)
+        start = time.perf_counter()
+        cache.get((region, OPTION, YEAR))
+        cached_us = (time.perf_counter() - start) * 1e6
+
+        wrapping = int(np.count_nonzero(shifted.intervals[:, SEGMENT] == 1)) # Windows over the year end
+        print(f"  {region:<30} {','.join(map(str, shifts)):>14} {wrapping:>9} {row_ms:8.0f} ms {vector_ms:8.1f} ms {cached_us:6.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark: bulk exports (see `plant_calendar.export`).
+
+ICS and CSV export of a synthetic catalog, streamed to a file chunk by
+chunk vs. joined into one string first (peak Python memory from
+tracemalloc), and HTML posters for every bundled calendar x month (5 x 12
+plus the whole-year ones) rendered in-process vs. on a process pool.
+Also checks that ICS event UIDs are unique and stay the same when a row's
+notes or months are edited.
+
+Run from the repository root:
+    python -m benchmarks.bench_export [rows] [workers]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+from benchmarks.synthetic import write_catalog
+from plant_calendar.config import FILE_OPTIONS, COLUMN_MAPPINGS
+from plant_calendar.data import load_calendar
+from plant_calendar.export import filtered_plants, iter_ics, iter_csv, poster_tasks, render_posters
+from plant_calendar.geometry import activity_intervals
+
+OPTION = "Perennials & Shrubs From Cuttings"
+YEAR = 2025
+
+
+def run(write):
+    """(seconds, bytes written) of `write(out)`."""
+    with tempfile.TemporaryFile('w+', encoding='utf-8', newline='') as out:
+        start = time.perf_counter()
+        write(out)
+        return time.perf_counter() - start, out.tell()
+
+
+def peak_mib(write):
+    """Peak Python memory (tracemalloc) of `write(out)`, run again untimed since tracing slows it down."""
+    tracemalloc.start()
+    try:
+        run(write)
+        return tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        tracemalloc.stop()
+
+
+def ics_uids(csv_path):
+    """UIDs of the events `iter_ics` exports for the calendar at `csv_path`."""
+    df, common_name_column = load_calendar(csv_path, COLUMN_MAPPINGS[OPTION])
+    return [line[4:] for line in ''.join(iter_ics(df, common_name_column, OPTION, COLUMN_MAPPINGS[OPTION], YEAR)).split('\r\n')
+            if line.startswith('UID:')]
+
+
+def check_stable_uids(work_dir):
+    """Asserts that UIDs are unique (identical rows included) and survive edits of a row's notes and months."""
+    csv_path = os.path.join(work_dir, FILE_OPTIONS[OPTION])
+    rows = pd.read_csv(FILE_OPTIONS[OPTION], dtype=str, keep_default_na=False, encoding='utf-8-sig')
+    rows = pd.concat([rows, rows.iloc[[0]]], ignore_index=True) # Two identical rows
+    rows.to_csv(csv_path, index=False)
+    before = ics_uids(csv_path)
+    assert len(set(before)) == len(before), "duplicate UIDs"
+
+    rows.loc[1, 'How to Overwinter'] = 'Edited notes'
+    rows.loc[1, ['Flower Start', 'Flower End']] = ['Aug', 'Sep'] # Still within the year, so the same segments
+    rows.to_csv(csv_path, index=False)
+    after = ics_uids(csv_path)
+    assert after == before, "UIDs changed after editing a row"
+    print(f"{len(before)} ICS UIDs unique and unchanged after editing a row's notes and months")
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+    activity_periods = COLUMN_MAPPINGS[OPTION]
+    work_dir = tempfile.mkdtemp()
+    try:
+        df, common_name_column = load_calendar(write_catalog(OPTION, rows, work_dir), activity_periods)
+        display_positions, _ = filtered_plants(df, common_name_column, activity_periods)
+        intervals = activity_intervals(df, OPTION, activity_periods, YEAR)
+        events = len(intervals[0])
+        ics = lambda: iter_ics(df, common_name_column, OPTION, activity_periods, YEAR, display_positions, intervals)
+        csv_rows = lambda: iter_csv(df, display_positions)
+
+        check_stable_uids(work_dir)
+        print(f"{rows} rows, {events} events:")
+        for label, chunks, count, unit in [('ICS', ics, events, 'events'), ('CSV', csv_rows, len(display_positions), 'rows')]:
+            for mode, write in [('streamed', lambda out: out.writelines(chunks())), ('joined', lambda out: out.write(''.join(chunks())))]:
+                (seconds, size), peak = run(write), peak_mib(write)
+                print(f"  {label} {mode:<9} {seconds:6.2f} s  {count / seconds:9.0f} {unit}/s  "
+                      f"{size / 2**20:6.1f} MiB written  peak memory {peak:7.1f} MiB")
+
+        tasks = poster_tasks('.', list(FILE_OPTIONS), range(13), YEAR, 'html', os.path.join(work_dir, 'posters'))
+        print(f"{len(tasks)} HTML posters ({os.cpu_count()} CPUs):")
+        for label, pool_workers in [('in-process', 1), (f'{workers} workers', workers)]:
+            start = time.perf_counter()
+            total_bytes = sum(size for _, size in render_posters(tasks, pool_workers))
+            seconds = time.perf_counter() - start
+            print(f"  {label:<11} {seconds:6.2f} s  {len(tasks) / seconds:5.1f} posters/s  {total_bytes / 2**20:5.1f} MiB")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Benchmark: what a rerun showing the same plants costs for the chart, on a
+100k-row catalog, with no figure cache (build + encode) and with the built
+Plotly figure cached (`chart.figure_spec`, what the app keeps;
+st.plotly_chart still encodes it every rerun). Also reports the JSON size
+per page, the size `chart.figure_size` estimates for it (what the cache is
+bounded by) and how many pages fit in the app's figure cache.
+
+Run from the repository root:
+    python -m benchmarks.bench_figure_cache
+"""
+import time
+
+import plotly.io
+
+from benchmarks.synthetic import synthetic_catalog
+from plant_calendar.chart import CHART_BACKENDS, figure_spec
+from plant_calendar.config import COLUMN_MAPPINGS
+from plant_calendar.filters import add_month_codes, sort_plant_names
+from plant_calendar.geometry import activity_intervals
+from plant_calendar.lookup import build_name_index
+from plant_calendar.memo import LRUCache
+
+OPTION = "Perennials & Shrubs From Cuttings"
+YEAR = 2026
+RERUNS = 20
+FIGURE_CACHE_BYTES = 64 * 2**20 # As in Plant_App.py
+
+
+def per_rerun_ms(rerun):
+    start = time.perf_counter()
+    for _ in range(RERUNS):
+        rerun()
+    return (time.perf_counter() - start) * 1000 / RERUNS
+
+
+def main():
+    activity_periods = COLUMN_MAPPINGS[OPTION]
+    df = synthetic_catalog(OPTION, 100_000).dropna(subset=['Common Name']).reset_index(drop=True)
+    df = add_month_codes(df, activity_periods)
+    name_index, _ = build_name_index(df['Common Name'])
+    display_positions, plant_names_sorted = sort_plant_names(df, 'Common Name', name_index)
+    intervals, legends = activity_intervals(df, OPTION, activity_periods, YEAR)
+
+    print(f"{'backend':<15} {'plants':>6} {'no cache':>10} {'Figure cached':>14} {'JSON':>9} {'estimated':>10} {'pages cached':>13}")
+    for label, build in CHART_BACKENDS.items():
+        for plants in (50, 1_000, 10_000):
+            def build_figure():
+                return build(intervals, legends, display_positions[:plants], plant_names_sorted[:plants], len(activity_periods), YEAR)
+
+            def encode(fig): # What st.plotly_chart does with a figure
+                return plotly.io.to_json(fig.to_dict(), validate=False)
+
+            spec = figure_spec(build_figure())
+            json_size = len(encode(spec.figure))
+            figure_cache = LRUCache(max_entries=256, max_size=FIGURE_CACHE_BYTES, sizeof=lambda spec: spec.size)
+            figure_cache.put('page', spec)
+            uncached_ms = per_rerun_ms(lambda: encode(figure_spec(build_figure()).figure))
+            figure_cached_ms = per_rerun_ms(lambda: encode(figure_cache.get('page').figure))
+            print(f"{label:<15} {plants:>6} {uncached_ms:7.1f} ms {figure_cached_ms:11.1f} ms "
+                  f"{json_size / 1024:5.0f} KiB {spec.size / 1024:6.0f} KiB {min(256, FIGURE_CACHE_BYTES // spec.size):>13}")
+
+
+if __name__ == "__main__":
+    main()
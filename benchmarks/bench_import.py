@@ -0,0 +1,57 @@
+"""
+Benchmark: import time and peak memory of the headless `plant_calendar`
+path vs. the imports the Streamlit script pulls in. Each scenario runs in a
+fresh interpreter.
+
+Run from the repository root:
+    python -m benchmarks.bench_import
+"""
+import json
+import subprocess
+import sys
+
+SCENARIOS = {
+    "import plant_calendar": "import plant_calendar",
+    "load + filter all calendars (no plotly)": """
+from plant_calendar import FILE_OPTIONS, COLUMN_MAPPINGS, load_calendar, activity_month_mask, selected_activities
+for option, file_name in FILE_OPTIONS.items():
+    df, name_column = load_calendar(file_name, COLUMN_MAPPINGS[option])
+    activity_month_mask(df, selected_activities(COLUMN_MAPPINGS[option], primary=True, flower=True), 3)
+""",
+    "load + build one figure": """
+from plant_calendar import COLUMN_MAPPINGS, load_calendar, activity_intervals, build_calendar_figure
+option = "Perennials & Shrubs From Cuttings"
+df, name_column = load_calendar("Perennials_Shrubs_by_Cutting.csv", COLUMN_MAPPINGS[option])
+intervals, legends = activity_intervals(df, option, COLUMN_MAPPINGS[option], 2026)
+build_calendar_figure(intervals, legends, list(df.index), list(df[name_column]), len(COLUMN_MAPPINGS[option]), 2026)
+""",
+    "Streamlit script imports (streamlit, pandas, numpy, plotly)": "import streamlit, pandas, numpy, plotly.graph_objects",
+}
+
+PROBE = """
+import resource, sys, time
+start = time.perf_counter()
+exec(compile(sys.argv[1], "<scenario>", "exec"))
+elapsed = time.perf_counter() - start
+heavy = [name for name in ("pandas", "numpy", "plotly", "streamlit") if name in sys.modules]
+print(__import__("json").dumps({"seconds": elapsed, "max_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, "loaded": heavy}))
+"""
+
+
+def run(code, repeats=3):
+    results = [json.loads(subprocess.run([sys.executable, "-c", PROBE, code], check=True, capture_output=True, text=True).stdout)
+               for _ in range(repeats)]
+    return min(results, key=lambda result: result["seconds"])
+
+
+def main():
+    baseline = run("pass")
+    print(f"bare interpreter: {baseline['max_rss_kib'] / 1024:.0f} MiB peak RSS")
+    for label, code in SCENARIOS.items():
+        result = run(code)
+        print(f"{label:<60} {result['seconds'] * 1000:8.1f} ms  peak RSS {result['max_rss_kib'] / 1024:6.0f} MiB  "
+              f"loaded: {', '.join(result['loaded']) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Benchmark: reading multi-hundred-MB calendar CSVs with the chunked,
+schema-validated `ingest.ingest_calendar` vs. reading the whole file with
+pandas guessing the column types (`data.read_calendar_csv`) and then
+`schema.compact_calendar`, the load path before it.
+
+The synthetic files are shaped like the cuttings calendar, with a few
+problems mixed in per 10,000 rows: unknown month values, month names
+spelled out, non-numeric heights and rows with an extra field (which
+`read_calendar_csv` raises on, so the whole-file read skips them). Each read
+runs in a fresh interpreter; its peak memory is how far the read raised the
+interpreter's peak RSS (Linux VmHWM) above what it was after the imports.
+
+Run from the repository root:
+    python -m benchmarks.bench_ingest [MB ...]
+"""
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+from benchmarks.synthetic import synthetic_catalog
+
+OPTION = "Perennials & Shrubs From Cuttings"
+BLOCK_ROWS = 100_000 # Rows generated at a time
+PROBLEMS_PER_10K = 5 # Of each kind
+
+METHODS = {
+    "whole file, types guessed": """
+import pandas as pd
+from plant_calendar.schema import compact_calendar
+# data.read_calendar_csv, except that pandas drops the over-long lines it would raise on
+df = pd.read_csv(path, skipinitialspace=True, on_bad_lines='skip')
+df.columns = df.columns.str.strip()
+df = compact_calendar(df.dropna(subset=['Common Name']).reset_index(drop=True), activity_periods)
+result = {'rows': len(df)}
+""",
+    "ingest, 20k-row chunks": """
+from plant_calendar.ingest import ingest_calendar
+df, report = ingest_calendar(path, activity_periods, 'Common Name', chunk_rows=20_000)
+result = {'rows': len(df), 'quarantined': report.rows_quarantined,
+          'coerced': sum(count for (_, _, action), count in report.counts.items() if action == 'coerced')}
+""",
+    "ingest, 100k-row chunks": """
+from plant_calendar.ingest import ingest_calendar
+df, report = ingest_calendar(path, activity_periods, 'Common Name', chunk_rows=100_000)
+result = {'rows': len(df), 'quarantined': report.rows_quarantined,
+          'coerced': sum(count for (_, _, action), count in report.counts.items() if action == 'coerced')}
+""",
+}
+
+PROBE = """
+import json, sys, time
+import pandas
+from plant_calendar.config import COLUMN_MAPPINGS
+from plant_calendar import ingest, schema
+def peak_rss_kib(): # VmHWM: unlike ru_maxrss, not carried over from the parent process
+    return int(next(line for line in open('/proc/self/status') if line.startswith('VmHWM:')).split()[1])
+path, activity_periods = sys.argv[2], COLUMN_MAPPINGS[sys.argv[3]]
+rss_before = peak_rss_kib()
+start = time.perf_counter()
+exec(compile(sys.argv[1], "<method>", "exec"))
+result.update(seconds=time.perf_counter() - start, peak_kib=peak_rss_kib() - rss_before)
+print(json.dumps(result))
+"""
+
+
+def with_problems(df, rng):
+    """`df` with PROBLEMS_PER_10K unknown months, spelled-out months and non-numeric heights per 10,000 rows."""
+    df = df.astype({'Cut Start': object, 'Flower End': object, 'Height (cm)': object})
+    count = max(1, len(df) * PROBLEMS_PER_10K // 10_000)
+    for column, value in (('Cut Start', 'Sometime'), ('Flower End', 'September'), ('Height (cm)', 'tall')):
+        df.loc[rng.choice(len(df), count, replace=False), column] = value
+    return df
+
+
+def write_csv(path, megabytes):
+    """Writes synthetic blocks to `path` until it holds `megabytes` MB, with some over-long lines. Returns its rows."""
+    rng = np.random.default_rng(0)
+    rows, seed = 0, 0
+    with open(path, 'w', encoding='utf-8') as f:
+        while f.tell() < megabytes * 1e6:
+            lines = with_problems(synthetic_catalog(OPTION, BLOCK_ROWS, seed), rng).to_csv(index=False, header=seed == 0).splitlines()
+            for i in rng.choice(np.arange(1 if seed == 0 else 0, len(lines)), PROBLEMS_PER_10K * BLOCK_ROWS // 10_000, replace=False):
+                lines[i] += ',extra field'
+            f.write('\n'.join(lines) + '\n')
+            rows, seed = rows + BLOCK_ROWS, seed + 1
+    return rows
+
+
+def main():
+    sizes = [int(size) for size in sys.argv[1:]] or [100, 300]
+    work_dir = tempfile.mkdtemp()
+    try:
+        for megabytes in sizes:
+            path = os.path.join(work_dir, f"calendar_{megabytes}mb.csv")
+            rows = write_csv(path, megabytes)
+            size_mb = os.path.getsize(path) / 2**20
+            print(f"{size_mb:.0f} MiB, {rows} rows:")
+            results = {}
+            for label, method in METHODS.items():
+                out = subprocess.run([sys.executable, "-c", PROBE, method, path, OPTION], capture_output=True, text=True, check=True)
+                results[label] = json.loads(out.stdout)
+            print(f"  {'method':<28} {'seconds':>8} {'MiB/s':>7} {'peak memory':>12} {'rows kept':>10} {'left out':>9} {'corrected':>10}")
+            for label, result in results.items():
+                print(f"  {label:<28} {result['seconds']:8.1f} {size_mb / result['seconds']:7.1f} "
+                      f"{result['peak_kib'] / 1024:8.0f} MiB {result['rows']:>10} "
+                      f"{result.get('quarantined', '-'):>9} {result.get('coerced', '-'):>10}")
+            os.remove(path)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
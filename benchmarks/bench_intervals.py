@@ -0,0 +1,81 @@
+"""
+Benchmark: `tasks.DayIntervalIndex` (centred interval tree) vs. a linear
+NumPy scan of every range, for point ("what is active on 10 March") and
+range ("between 10 March and 25 April") queries over ~100k intervals.
+
+Two interval sets: the activity windows of synthetic calendars (month
+long, so a query matches a large share of them) and short day-level ranges
+of 1-14 days (few matches, where the logarithmic search shows most). Both
+methods return the same ranges for every query.
+
+Run from the repository root:
+    python -m benchmarks.bench_intervals [intervals]
+"""
+import sys
+import time
+from datetime import date
+
+import numpy as np
+
+from benchmarks.synthetic import synthetic_catalog
+from plant_calendar.config import FILE_OPTIONS, COLUMN_MAPPINGS
+from plant_calendar.filters import add_month_codes
+from plant_calendar.tasks import DayIntervalIndex, TaskIndex
+
+YEAR = 2026
+QUERIES = [
+    ("stab 10 Mar", 69, 69),
+    ("week 9-15 Mar", 68, 74),
+    ("10 Mar - 25 Apr", 69, 115),
+    ("20 Dec - 10 Jan (wraps)", 354, 10),
+]
+
+
+def linear_scan(starts, ends, first_day, last_day):
+    if first_day > last_day:
+        return np.flatnonzero((ends >= first_day) | (starts <= last_day))
+    return np.flatnonzero((starts <= last_day) & (ends >= first_day))
+
+
+def best_us(func, repeat=200):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1e6
+
+
+def compare(label, starts, ends):
+    start = time.perf_counter()
+    index = DayIntervalIndex(starts, ends)
+    build_ms = (time.perf_counter() - start) * 1000
+    print(f"{label}: {len(index)} intervals, tree built in {build_ms:.1f} ms")
+    print(f"  {'query':<25} {'matches':>8} {'linear scan':>12} {'interval tree':>14} {'speed-up':>9}")
+    for query, first_day, last_day in QUERIES:
+        expected = linear_scan(starts, ends, first_day, last_day)
+        assert np.array_equal(np.sort(index.overlapping(first_day, last_day)), expected), query
+        scan_us = best_us(lambda: linear_scan(starts, ends, first_day, last_day))
+        tree_us = best_us(lambda: index.overlapping(first_day, last_day))
+        print(f"  {query:<25} {len(expected):>8} {scan_us:9.1f} us {tree_us:11.1f} us {scan_us / tree_us:8.1f}x")
+
+
+def main():
+    target = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    frames, rows = {}, target // (2 * len(FILE_OPTIONS)) # Each synthetic row has a couple of activity windows
+    for option in FILE_OPTIONS:
+        df = synthetic_catalog(option, rows).dropna(subset=['Common Name']).reset_index(drop=True)
+        frames[option] = (add_month_codes(df, COLUMN_MAPPINGS[option]), 'Common Name')
+    start = time.perf_counter()
+    tasks = TaskIndex(frames, YEAR)
+    print(f"TaskIndex over {len(FILE_OPTIONS)} synthetic calendars built in {(time.perf_counter() - start) * 1000:.0f} ms; "
+          f"4 weekly task lists: {best_us(lambda: tasks.weekly(date(YEAR, 3, 9), 4), repeat=5) / 1000:.1f} ms")
+    compare("Calendar activity windows", tasks.index.starts, tasks.index.ends)
+
+    rng = np.random.default_rng(0)
+    starts = rng.integers(1, 366, target).astype(np.int32)
+    compare("Short ranges (1-14 days)", starts, np.minimum(365, starts + rng.integers(0, 14, target)).astype(np.int32))
+
+
+if __name__ == "__main__":
+    main()
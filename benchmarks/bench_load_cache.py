@@ -0,0 +1,66 @@
+"""
+Benchmark: cold vs. warm start of the Parquet calendar cache.
+
+cold     - no cache entry: CSV parse + Parquet write
+warm     - size/mtime unchanged: Parquet read only
+touched  - mtime changed, content identical: hash check + Parquet read
+edited   - content changed: CSV parse + Parquet rewrite
+
+Run from the repository root:
+    python -m benchmarks.bench_load_cache
+"""
+import os
+import shutil
+import tempfile
+import time
+
+import pandas as pd
+
+from plant_calendar.data import read_calendar_csv
+from plant_calendar.disk_cache import load_table
+
+CSV_FILE = "Perennials_Shrubs_by_Cutting.csv"
+
+
+def timed_load(csv_path, cache_dir, expected_status):
+    start = time.perf_counter()
+    table, status = load_table(csv_path, lambda path: read_calendar_csv(path, 'Common Name'), cache_dir)
+    elapsed = time.perf_counter() - start
+    assert status == expected_status, (status, expected_status)
+    return table, elapsed
+
+
+def main():
+    base = read_calendar_csv(CSV_FILE, 'Common Name')
+    work_dir = tempfile.mkdtemp()
+    try:
+        for scale in (1, 100, 1000):
+            csv_path = os.path.join(work_dir, f"catalog_{scale}.csv")
+            cache_dir = os.path.join(work_dir, "cache")
+            pd.concat([base] * scale, ignore_index=True).to_csv(csv_path, index=False)
+
+            parse_start = time.perf_counter()
+            parsed = read_calendar_csv(csv_path, 'Common Name')
+            parse_s = time.perf_counter() - parse_start
+
+            _, cold_s = timed_load(csv_path, cache_dir, 'miss')
+            cached, warm_s = min((timed_load(csv_path, cache_dir, 'hit') for _ in range(3)), key=lambda result: result[1])
+            pd.testing.assert_frame_equal(parsed, cached)
+
+            os.utime(csv_path)
+            _, touched_s = timed_load(csv_path, cache_dir, 'rehashed')
+
+            with open(csv_path, 'a', encoding='utf-8') as f:
+                f.write("Zz Extra Plant,Softwood,Easy,May,Jun,Jul,Aug,Jun,Aug,18,21,14,28,50,50,50,Full Sun,Moderate,Evergreen,Yes,\n")
+            edited, edited_s = timed_load(csv_path, cache_dir, 'miss')
+            assert len(edited) == len(parsed) + 1
+
+            print(f"{len(parsed):>7} rows  csv {os.path.getsize(csv_path) / 1e6:6.1f} MB  plain parse {parse_s * 1000:8.1f} ms  "
+                  f"cold {cold_s * 1000:8.1f} ms  warm {warm_s * 1000:7.1f} ms  touched {touched_s * 1000:7.1f} ms  "
+                  f"edited {edited_s * 1000:8.1f} ms")
+    finally:
+        shutil.rmtree(work_dir)
+
+
+if __name__ == "__main__":
+    main()
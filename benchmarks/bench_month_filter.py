@@ -0,0 +1,66 @@
+"""
+Benchmark: per-row `df.apply` month filter vs. the precomputed month bitmasks.
+
+Run from the repository root:
+    python -m benchmarks.bench_month_filter
+"""
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from plant_calendar.filters import MONTH_MAP, is_month_in_range, add_month_codes, selected_activities, activity_month_mask
+
+CSV_FILE = "Perennials_Shrubs_by_Cutting.csv"
+ACTIVITY_PERIODS = {'Cut': ('Cut Start', 'Cut End'), 'Plant Out': ('Plant Out Start', 'Plant Out End'), 'Flower': ('Flower Start', 'Flower End')}
+
+
+def read_catalog(file_path):
+    df = pd.read_csv(file_path, skipinitialspace=True)
+    df.columns = df.columns.str.strip()
+    return df.dropna(subset=['Common Name']).reset_index(drop=True)
+
+
+def apply_filter(df, activities, month_num):
+    # The filter as Plant_App.py used to run it: one df.apply per ticked activity
+    combined_mask_month = pd.Series([False] * len(df))
+    for activity_key, (start_col, end_col) in ACTIVITY_PERIODS.items():
+        if activity_key in activities:
+            activity_mask = df.apply(lambda row: is_month_in_range(row[start_col], row[end_col], month_num, MONTH_MAP), axis=1)
+            combined_mask_month = combined_mask_month | activity_mask
+    return combined_mask_month.to_numpy(dtype=bool)
+
+
+def bitmask_filter(df, activities, month_num):
+    return activity_month_mask(df, activities, month_num)
+
+
+def main():
+    base = read_catalog(CSV_FILE)
+    # Scramble a few rows with blanks and unknown abbreviations so the edge cases are covered
+    base.loc[::7, 'Cut End'] = np.nan
+    base.loc[::11, 'Flower Start'] = 'Sept'
+
+    for scale in (1, 10, 100):
+        df = pd.concat([base] * scale, ignore_index=True)
+        df = add_month_codes(df, ACTIVITY_PERIODS)
+
+        activity_sets = [
+            selected_activities(ACTIVITY_PERIODS, primary=p, plant_out=o, flower=f)
+            for p in (False, True) for o in (False, True) for f in (False, True)
+        ]
+        for activities in activity_sets:
+            for month_num in range(1, 13):
+                assert np.array_equal(apply_filter(df, activities, month_num), bitmask_filter(df, activities, month_num)), (activities, month_num)
+
+        activities = selected_activities(ACTIVITY_PERIODS, primary=True, plant_out=True, flower=True)
+        repeats = 3 if scale < 100 else 1
+        apply_s = min(timeit.repeat(lambda: apply_filter(df, activities, 6), number=1, repeat=repeats))
+        bitmask_s = min(timeit.repeat(lambda: bitmask_filter(df, activities, 6), number=20, repeat=5)) / 20
+        parse_s = min(timeit.repeat(lambda: add_month_codes(df.copy(), ACTIVITY_PERIODS), number=1, repeat=3))
+        print(f"{len(df):>7} rows  df.apply: {apply_s * 1000:9.2f} ms  bitmask: {bitmask_s * 1000:7.3f} ms  "
+              f"speedup: {apply_s / bitmask_s:8.0f}x  (one-off parse in load_data: {parse_s * 1000:.2f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Benchmark: one chart page vs. the whole plant list as the catalog grows.
+Time-to-first-render is approximated by figure build + JSON serialization
+(what st.plotly_chart sends); the overview strip is included for pages.
+
+Run from the repository root:
+    python -m benchmarks.bench_paging
+"""
+import time
+
+from benchmarks.synthetic import synthetic_catalog
+from plant_calendar.chart import DEFAULT_PAGE_SIZE, build_calendar_figure, build_overview_figure, page_slice
+from plant_calendar.config import COLUMN_MAPPINGS
+from plant_calendar.filters import activity_month_counts, add_month_codes, sort_plant_names
+from plant_calendar.geometry import activity_intervals
+from plant_calendar.lookup import build_name_index
+
+OPTION = "Perennials & Shrubs From Cuttings"
+YEAR = 2026
+
+
+def render(build):
+    start = time.perf_counter()
+    payload = "".join(fig.to_json() for fig in build())
+    return (time.perf_counter() - start) * 1000, len(payload)
+
+
+def main():
+    activity_periods = COLUMN_MAPPINGS[OPTION]
+    build_overview_figure([], []) # Import Plotly before timing anything
+    for rows in (1_000, 10_000, 100_000):
+        df = synthetic_catalog(OPTION, rows).dropna(subset=['Common Name']).reset_index(drop=True)
+        df = add_month_codes(df, activity_periods)
+        name_index, _ = build_name_index(df['Common Name'])
+        display_positions, plant_names_sorted = sort_plant_names(df, 'Common Name', name_index)
+        intervals, legends = activity_intervals(df, OPTION, activity_periods, YEAR)
+
+        first_page = page_slice(1, DEFAULT_PAGE_SIZE)
+        page_ms, page_bytes = render(lambda: [
+            build_overview_figure(list(activity_periods), activity_month_counts(df, list(activity_periods), display_positions)),
+            build_calendar_figure(intervals, legends, display_positions[first_page], plant_names_sorted[first_page], len(activity_periods), YEAR),
+        ])
+        full_ms, full_bytes = render(lambda: [
+            build_calendar_figure(intervals, legends, display_positions, plant_names_sorted, len(activity_periods), YEAR),
+        ])
+        print(f"{len(plant_names_sorted):>7} plants  page of {DEFAULT_PAGE_SIZE} + overview {page_ms:7.1f} ms {page_bytes / 1024:8.0f} KiB   "
+              f"whole list {full_ms:8.1f} ms {full_bytes / 1024:8.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
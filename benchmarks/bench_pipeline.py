@@ -0,0 +1,169 @@
+"""
+Benchmark: every stage of a page render, on synthetic catalogs shaped like
+each bundled calendar at 1k, 10k and 100k rows (see benchmarks/synthetic.py).
+
+Stages are timed separately, each on the full catalog (the default page with
+no filters is the largest render):
+
+load_data (csv)       CSV parse, month codes and the name index
+load_data (cache)     the same through a warm Parquet cache
+search index          building the trigram index
+search query          one substring/fuzzy search (median of a query batch)
+month filter          primary activities in April
+light filter          'Full Sun' only
+sort                  A-Z sort and display positions
+intervals             the day-of-year interval table
+figure build          the Plotly figure for every plant
+figure serialization  the figure's JSON, as sent to the browser
+
+Results are written as JSON (one record per calendar/size/stage) so runs
+from different versions can be compared:
+
+    python -m benchmarks.bench_pipeline --sizes 1000 10000
+    python -m benchmarks.bench_pipeline --compare benchmarks/results/pipeline-<old>.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from benchmarks.synthetic import write_catalog
+from plant_calendar.chart import build_calendar_figure
+from plant_calendar.config import COLUMN_MAPPINGS, FILE_OPTIONS
+from plant_calendar.data import load_calendar
+from plant_calendar.filters import activity_month_mask, light_mask, selected_activities, sort_plant_names
+from plant_calendar.geometry import activity_intervals
+from plant_calendar.lookup import build_name_index
+from plant_calendar.search import SearchIndex
+
+YEAR = 2026
+SEARCH_QUERIES = 20
+REGRESSION_RATIO = 1.2 # --compare flags stages at least this much slower
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], check=True, capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def timed(func, repeats):
+    """Runs `func` `repeats` times; returns (last result, list of seconds)."""
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        samples.append(time.perf_counter() - start)
+    return result, samples
+
+
+def bench_calendar(option, csv_path, cache_dir, repeats):
+    """Times every stage for one calendar file; returns {stage: (samples, extra)}."""
+    activity_periods = COLUMN_MAPPINGS[option]
+    stages = {}
+
+    def load(cache):
+        df, common_name_column = load_calendar(csv_path, activity_periods, cache)
+        return df, common_name_column, build_name_index(df[common_name_column])[0]
+
+    (df, common_name_column, name_index), stages['load_data (csv)'] = timed(lambda: load(None), repeats)
+    load(cache_dir) # Fill the cache
+    _, stages['load_data (cache)'] = timed(lambda: load(cache_dir), repeats)
+
+    names = df[common_name_column]
+    search_index, stages['search index'] = timed(lambda: SearchIndex([(csv_path, names)]), repeats)
+    rng = random.Random(0)
+    queries = [name[:rng.randint(2, 6)] for name in rng.sample(list(names), min(SEARCH_QUERIES, len(names)))]
+    query_samples = [timed(lambda: search_index.search(query), 1)[1][0] for query in queries]
+    stages['search query'] = [statistics.median(query_samples)]
+
+    activities = selected_activities(activity_periods, primary=True)
+    _, stages['month filter'] = timed(lambda: df[activity_month_mask(df, activities, 4)], repeats)
+    _, stages['light filter'] = timed(lambda: df[light_mask(df, ['Full Sun'])], repeats)
+    (display_positions, plant_names_sorted), stages['sort'] = timed(
+        lambda: sort_plant_names(df, common_name_column, name_index), repeats)
+
+    (intervals, legends), stages['intervals'] = timed(lambda: activity_intervals(df, option, activity_periods, YEAR), repeats)
+    fig, stages['figure build'] = timed(lambda: build_calendar_figure(
+        intervals, legends, display_positions, plant_names_sorted, len(activity_periods), YEAR), repeats)
+    payload, stages['figure serialization'] = timed(fig.to_json, repeats)
+    return stages, {'plants': len(df), 'bars': len(intervals), 'figure_json_bytes': len(payload)}
+
+
+def run(sizes, calendars, repeats):
+    records = []
+    work_dir = tempfile.mkdtemp()
+    try:
+        for rows in sizes:
+            for option in calendars:
+                csv_path = write_catalog(option, rows, os.path.join(work_dir, str(rows)))
+                stages, counts = bench_calendar(option, csv_path, os.path.join(work_dir, 'cache'), repeats)
+                for stage, samples in stages.items():
+                    records.append({'calendar': option, 'rows': rows, 'stage': stage, 'median_s': statistics.median(samples),
+                                    'min_s': min(samples), 'repeats': len(samples), **counts})
+                total = sum(statistics.median(samples) for samples in stages.values())
+                print(f"{rows:>7} rows  {option:<36} {total * 1000:9.1f} ms over all stages")
+    finally:
+        shutil.rmtree(work_dir)
+    return records
+
+
+def summary(records):
+    """Median ms per stage (rows) and data size (columns), taken across calendars."""
+    frame = pd.DataFrame(records)
+    table = frame.pivot_table(index='stage', columns='rows', values='median_s', aggfunc='median', sort=False) * 1000
+    return table.round(2).to_string()
+
+
+def compare(records, baseline_path):
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = {(r['calendar'], r['rows'], r['stage']): r['median_s'] for r in json.load(f)['results']}
+    print(f"vs. {baseline_path} (flagging stages >= {REGRESSION_RATIO}x slower)")
+    ratios = {}
+    for record in records:
+        before = baseline.get((record['calendar'], record['rows'], record['stage']))
+        if not before:
+            continue
+        ratio = record['median_s'] / before
+        ratios.setdefault(record['stage'], []).append(ratio)
+        if ratio >= REGRESSION_RATIO:
+            print(f"  SLOWER {ratio:5.2f}x  {record['rows']:>7} rows  {record['calendar']:<36} {record['stage']}")
+    for stage, stage_ratios in ratios.items():
+        print(f"  {stage:<22} median {statistics.median(stage_ratios):5.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--calendars', nargs='+', choices=list(FILE_OPTIONS), default=list(FILE_OPTIONS))
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--output', help="JSON results file (default benchmarks/results/pipeline-<git revision>.json)")
+    parser.add_argument('--compare', help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    records = run(args.sizes, args.calendars, args.repeats)
+    print(f"\nmedian ms per stage across calendars\n{summary(records)}\n")
+    revision = git_revision()
+    output = args.output or os.path.join(os.path.dirname(__file__), 'results', f"pipeline-{revision}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({'revision': revision, 'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                   'python': platform.python_version(), 'pandas': pd.__version__, 'year': YEAR,
+                   'results': records}, f, indent=1)
+    print(f"results written to {output}")
+    if args.compare:
+        compare(records, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Benchmark: the SVG bar backend vs. the raster (PNG image) backend, for a
+page of plants up to a whole 100k-row catalog. Reports build and JSON
+serialization time, payload size, and how many rectangles the browser would
+have to draw as SVG (the raster backend draws one image whatever the size).
+
+Run from the repository root:
+    python -m benchmarks.bench_raster
+"""
+import time
+
+from benchmarks.synthetic import synthetic_catalog
+from plant_calendar.chart import CHART_BACKENDS, shown_intervals
+from plant_calendar.config import COLUMN_MAPPINGS
+from plant_calendar.filters import add_month_codes, sort_plant_names
+from plant_calendar.geometry import activity_intervals
+from plant_calendar.lookup import build_name_index
+
+OPTION = "Perennials & Shrubs From Cuttings"
+YEAR = 2026
+
+
+def timed_ms(func):
+    start = time.perf_counter()
+    result = func()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    activity_periods = COLUMN_MAPPINGS[OPTION]
+    df = synthetic_catalog(OPTION, 100_000).dropna(subset=['Common Name']).reset_index(drop=True)
+    df = add_month_codes(df, activity_periods)
+    name_index, _ = build_name_index(df['Common Name'])
+    display_positions, plant_names_sorted = sort_plant_names(df, 'Common Name', name_index)
+    intervals, legends = activity_intervals(df, OPTION, activity_periods, YEAR)
+    for build in CHART_BACKENDS.values(): # Import Plotly/Pillow before timing anything
+        build(intervals, legends, display_positions[:10], plant_names_sorted[:10], len(activity_periods), YEAR)
+
+    for plants in (100, 1_000, 10_000, len(plant_names_sorted)):
+        bars = len(shown_intervals(intervals, display_positions[:plants])[0])
+        for backend, build in CHART_BACKENDS.items():
+            fig, build_ms = timed_ms(lambda: build(intervals, legends, display_positions[:plants], plant_names_sorted[:plants],
+                                                   len(activity_periods), YEAR))
+            payload, json_ms = timed_ms(fig.to_json)
+            svg_rects = bars if backend.startswith("Bars") else 0
+            print(f"{plants:>7} plants  {backend:<15} build {build_ms:7.1f} ms  json {json_ms:7.1f} ms  "
+                  f"payload {len(payload) / 1024:8.0f} KiB  SVG bars {svg_rects:>7}")
+
+
+if __name__ == "__main__":
+    main()
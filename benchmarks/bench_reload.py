@@ -0,0 +1,78 @@
+"""
+Benchmark: hot reload of an edited calendar, full rebuild vs. row-level update.
+
+A synthetic catalog is loaded with everything the app derives from it (name
+index, chart intervals, search index), then a few rows of the CSV are edited
+and it is loaded again. "full" rebuilds every derived structure; "incremental"
+matches rows by content hash, keeps the name and search indexes (no names
+changed) and recomputes intervals only for the edited rows. Both produce
+the same intervals.
+
+Run from the repository root:
+    python -m benchmarks.bench_reload [rows] [edited rows]
+"""
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import write_catalog
+from plant_calendar.config import COLUMN_MAPPINGS
+from plant_calendar.data import load_calendar
+from plant_calendar.geometry import activity_intervals
+from plant_calendar.lookup import build_name_index
+from plant_calendar.reload import match_rows, update_intervals
+from plant_calendar.search import SearchIndex
+
+OPTION = "Perennials & Shrubs From Cuttings"
+YEAR = 2025
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    edited_rows = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    activity_periods = COLUMN_MAPPINGS[OPTION]
+    work_dir = tempfile.mkdtemp()
+    try:
+        path = write_catalog(OPTION, rows, work_dir)
+        previous, common_name_column = load_calendar(path, activity_periods)
+        previous_intervals = activity_intervals(previous, OPTION, activity_periods, YEAR)
+
+        raw = pd.read_csv(path, encoding='utf-8-sig')
+        edited = np.random.default_rng(0).choice(len(raw), edited_rows, replace=False)
+        raw.loc[edited, 'Flower Start'] = 'Feb'
+        raw.loc[edited, 'Cutting Type'] = 'Hardwood'
+        raw.to_csv(path, index=False, encoding='utf-8-sig')
+
+        (df, _), load_ms = timed(lambda: load_calendar(path, activity_periods))
+        _, name_index_ms = timed(lambda: build_name_index(df[common_name_column]))
+        full, intervals_ms = timed(lambda: activity_intervals(df, OPTION, activity_periods, YEAR))
+        _, search_index_ms = timed(lambda: SearchIndex([(path, df[common_name_column])]))
+
+        changes, match_ms = timed(lambda: match_rows(previous, df, common_name_column))
+        incremental, update_ms = timed(lambda: update_intervals(previous_intervals, changes, df, OPTION, activity_periods, YEAR))
+        assert changes.names_unchanged
+        decode = lambda pair: [tuple(row[:5]) + (pair[1][row[5]],) for row in pair[0]]
+        assert decode(incremental) == decode(full)
+
+        full_ms = load_ms + name_index_ms + intervals_ms + search_index_ms
+        incremental_ms = load_ms + match_ms + update_ms
+        print(f"{rows} rows, {edited_rows} edited ({len(changes.changed)} changed after matching):")
+        print(f"  parse + normalise   {load_ms:8.1f} ms (both)")
+        print(f"  full rebuild        {full_ms:8.1f} ms   name index {name_index_ms:.1f}, intervals {intervals_ms:.1f}, search index {search_index_ms:.1f}")
+        print(f"  incremental         {incremental_ms:8.1f} ms   match rows {match_ms:.1f}, update intervals {update_ms:.1f}, indexes kept")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark: memory of loaded calendars before and after `compact_calendar`.
+
+For the bundled CSVs and synthetic 100k-row catalogs, reports the in-memory
+size (deep) of a loaded table with the dtypes pandas guesses and with the
+compact schema, the pickled size (what every `st.cache_data` hit copies
+into a session), and the light filter on strings vs. on category codes.
+
+Run from the repository root:
+    python -m benchmarks.bench_schema
+"""
+import pickle
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import synthetic_catalog
+from plant_calendar.config import FILE_OPTIONS, COLUMN_MAPPINGS
+from plant_calendar.data import read_calendar_csv, common_name_column_for
+from plant_calendar.filters import add_month_codes, light_mask
+from plant_calendar.schema import compact_calendar, memory_usage
+
+SYNTHETIC_ROWS = 100_000
+LIGHT_TYPES = ['Full Sun', 'Partial Shade']
+
+
+def best_ms(func, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+    return min(times)
+
+
+def report(label, raw, option):
+    activity_periods = COLUMN_MAPPINGS[option]
+    start = time.perf_counter()
+    compact = add_month_codes(compact_calendar(raw.copy(), activity_periods), activity_periods)
+    compact_ms = (time.perf_counter() - start) * 1000
+    raw = add_month_codes(raw, activity_periods)
+    assert np.array_equal(light_mask(raw, LIGHT_TYPES), light_mask(compact, LIGHT_TYPES))
+
+    raw_bytes, compact_bytes = memory_usage(raw), memory_usage(compact)
+    raw_pickle, compact_pickle = len(pickle.dumps(raw)), len(pickle.dumps(compact))
+    raw_light = best_ms(lambda: raw['Light'].astype(str).isin(LIGHT_TYPES).to_numpy())
+    compact_light = best_ms(lambda: light_mask(compact, LIGHT_TYPES))
+    print(f"{label:<46} memory {raw_bytes / 1024:9.0f} -> {compact_bytes / 1024:8.0f} KiB ({compact_bytes / raw_bytes:4.0%})"
+          f"   pickle {raw_pickle / 1024:9.0f} -> {compact_pickle / 1024:8.0f} KiB"
+          f"   light filter {raw_light:6.2f} -> {compact_light:5.2f} ms   compact {compact_ms:6.1f} ms")
+
+
+def main():
+    for option, file_name in FILE_OPTIONS.items():
+        report(f"{option} (bundled)", read_calendar_csv(file_name, common_name_column_for(file_name)), option)
+    for option, file_name in FILE_OPTIONS.items():
+        raw = synthetic_catalog(option, SYNTHETIC_ROWS)
+        raw = raw.dropna(subset=[common_name_column_for(file_name)]).reset_index(drop=True)
+        report(f"{option} ({SYNTHETIC_ROWS} rows)", raw, option)
+
+
+if __name__ == "__main__":
+    main()
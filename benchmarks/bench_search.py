@@ -0,0 +1,76 @@
+"""
+Benchmark: plant-name search index on a synthetic 100k-name catalog,
+compared with the old `str.contains` scan.
+
+Run from the repository root:
+    python -m benchmarks.bench_search
+"""
+import random
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import synthetic_names
+from plant_calendar.search import SearchIndex, fold
+
+INTERACTIVE_MS = 50
+
+
+def misspell(text, rng):
+    position = rng.randrange(len(text))
+    return text[:position] + rng.choice('aeiourst') + text[position + 1:]
+
+
+def percentiles(samples_ms):
+    return f"p50 {np.percentile(samples_ms, 50):6.2f} ms  p95 {np.percentile(samples_ms, 95):6.2f} ms  max {max(samples_ms):6.2f} ms"
+
+
+def timed_ms(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    rng = random.Random(1)
+    names = pd.Series(synthetic_names(100_000))
+
+    index, build_ms = timed_ms(SearchIndex, [("synthetic", names)])
+    print(f"index build: {len(index)} names in {build_ms:.0f} ms")
+
+    queries = {length: [] for length in (2, 4, 8)}
+    for length in queries:
+        while len(queries[length]) < 100:
+            name = rng.choice(names)
+            if len(name) > length + 1:
+                start = rng.randrange(len(name) - length)
+                queries[length].append(name[start:start + length])
+
+    for length, batch in queries.items():
+        index_ms, scan_ms = [], []
+        for query in batch:
+            found, elapsed = timed_ms(index.substring, query)
+            index_ms.append(elapsed)
+            expected, elapsed = timed_ms(lambda: names.str.contains(query, case=False, regex=False))
+            scan_ms.append(elapsed)
+            # The index finds at least everything the plain scan found (it also ignores accents/spacing)
+            assert set(np.flatnonzero(expected.to_numpy())) <= set(found.tolist()), query
+        print(f"substring len {length}:  index {percentiles(index_ms)}   str.contains {percentiles(scan_ms)}")
+
+    fuzzy_ms, top_hits = [], 0
+    for _ in range(100):
+        target = rng.choice(names)
+        word = max(target.replace('(', ' ').replace(')', ' ').split(), key=len)
+        typo = misspell(word, rng)
+        matches, elapsed = timed_ms(index.fuzzy, typo, 10)
+        fuzzy_ms.append(elapsed)
+        top_hits += any(fold(word) in fold(index.name_of(entry)) for entry, _ in matches[:10])
+    print(f"fuzzy (one typo):  {percentiles(fuzzy_ms)}   intended word in top 10: {top_hits}/100")
+
+    worst = max(max(fuzzy_ms), *(np.percentile([timed_ms(index.substring, q)[1] for q in batch], 95) for batch in queries.values()))
+    print(f"worst p95/max latency {worst:.1f} ms ({'within' if worst < INTERACTIVE_MS else 'OVER'} the {INTERACTIVE_MS} ms interactive budget)")
+
+
+if __name__ == "__main__":
+    main()
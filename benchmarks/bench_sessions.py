@@ -0,0 +1,106 @@
+"""
+Benchmark: many concurrent sessions on one server process. Runs the app
+(Plant_App.py, or another revision of it given as a path, to compare) with
+Streamlit's AppTest for simulated sessions over synthetic catalogs; each
+session opens one calendar, searches, picks a month and clears the search.
+
+Reports the time per rerun and memory: the Python memory a rerun allocates
+on top of what is already held (tracemalloc peak, which includes any copy
+of the calendar handed to the session), and what each live session keeps.
+The memory pass runs separately from the timed one, since tracing slows
+reruns down.
+
+Run from the repository root:
+    python -m benchmarks.bench_sessions [sessions] [rows] [app.py]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.synthetic import write_catalog
+from plant_calendar.config import FILE_OPTIONS, MONTH_NAMES
+
+QUERIES = ['ro', 'lav', 'sweet', 'an']
+
+
+def session_steps(session):
+    """The reruns of simulated session number `session`, as functions of its AppTest."""
+    option = list(FILE_OPTIONS)[session % len(FILE_OPTIONS)]
+    return [
+        lambda at: at.run(),
+        lambda at: at.sidebar.selectbox[0].set_value(option).run(),
+        lambda at: at.text_input(key='search_input').set_value(QUERIES[session % len(QUERIES)]).run(),
+        lambda at: select_month(at, 1 + session % 12).run(),
+        lambda at: at.text_input(key='search_input').set_value('').run(),
+    ]
+
+
+def select_month(at, month_num):
+    # Through session state: AppTest can't set a selectbox whose options are (name, number) tuples
+    at.session_state['month_selector_filter_in_expander'] = (MONTH_NAMES[month_num - 1], month_num)
+    at.session_state['selected_month_num'] = month_num
+    return at
+
+
+def run_sessions(app_path, sessions, on_rerun):
+    """Runs every session's steps (interleaved, as concurrent users would), calling `on_rerun(step)` around each."""
+    apps = [AppTest.from_file(app_path, default_timeout=300) for _ in range(sessions)]
+    steps = [session_steps(session) for session in range(sessions)]
+    for step in range(len(steps[0])):
+        for at, session_steps_ in zip(apps, steps):
+            on_rerun(lambda: session_steps_[step](at))
+            if at.exception:
+                raise RuntimeError(at.exception[0].value)
+    return apps
+
+
+def main():
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+    app_source = os.path.abspath(sys.argv[3] if len(sys.argv) > 3 else 'Plant_App.py')
+    sys.path.insert(0, os.getcwd()) # plant_calendar, once the app runs from the work directory
+    work_dir, cwd = tempfile.mkdtemp(), os.getcwd()
+    try:
+        for option in FILE_OPTIONS:
+            write_catalog(option, rows, work_dir)
+        app_path = shutil.copy(app_source, os.path.join(work_dir, 'Plant_App.py'))
+        os.chdir(work_dir) # DATA_DIR = '.'
+        run_sessions(app_path, len(FILE_OPTIONS), lambda rerun: rerun()) # Load every calendar and fill the shared caches
+
+        rerun_ms = []
+        def timed(rerun):
+            start = time.perf_counter()
+            rerun()
+            rerun_ms.append((time.perf_counter() - start) * 1000)
+        run_sessions(app_path, sessions, timed)
+
+        rerun_peaks = []
+        def traced(rerun):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            rerun()
+            rerun_peaks.append(tracemalloc.get_traced_memory()[1] - before)
+        tracemalloc.start()
+        held_before = tracemalloc.get_traced_memory()[0]
+        apps = run_sessions(app_path, sessions, traced)
+        held_per_session = (tracemalloc.get_traced_memory()[0] - held_before) / len(apps)
+        tracemalloc.stop()
+
+        print(f"{os.path.relpath(app_source, cwd)}: {sessions} sessions x {len(rerun_ms) // sessions} reruns, "
+              f"{len(FILE_OPTIONS)} calendars x {rows} rows")
+        print(f"  time per rerun     mean {np.mean(rerun_ms):7.1f} ms   p95 {np.percentile(rerun_ms, 95):7.1f} ms")
+        print(f"  allocated per rerun mean {np.mean(rerun_peaks) / 2**20:6.1f} MiB   max {np.max(rerun_peaks) / 2**20:6.1f} MiB")
+        print(f"  held per session   {held_per_session / 2**20:6.2f} MiB")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Benchmark: the pandas path (whole calendar in memory, masked per query) vs.
+the SQLite backend (`plant_calendar.store`, indexed queries, only matching
+rows fetched).
+
+For synthetic catalogs of 10k and 100k rows, reports the one-off costs
+(pandas: loading the table from the Parquet cache, as a new server process
+does, and its memory; SQLite: the import and the database size) and then,
+per query, the pandas time on the loaded table vs. the SQLite query time
+plus fetching the first chart page of matching rows. Both paths return the
+same plants for every query.
+
+Run from the repository root:
+    python -m benchmarks.bench_store [rows ...]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import write_catalog
+from plant_calendar.chart import DEFAULT_PAGE_SIZE
+from plant_calendar.config import COLUMN_MAPPINGS
+from plant_calendar.data import load_calendar
+from plant_calendar.filters import filter_and_sort
+from plant_calendar.lookup import build_name_index, lookup_row
+from plant_calendar.schema import memory_usage
+from plant_calendar.search import SearchIndex
+from plant_calendar.store import CalendarStore
+
+OPTION = "Perennials & Shrubs From Cuttings"
+
+
+def best_ms(func, repeat=3):
+    times, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append((time.perf_counter() - start) * 1000)
+    return min(times), result
+
+
+def run(rows, work_dir):
+    activity_periods = COLUMN_MAPPINGS[OPTION]
+    path = write_catalog(OPTION, rows, work_dir)
+    cache_dir = os.path.join(work_dir, 'cache')
+    load_calendar(path, activity_periods, cache_dir) # Prime the Parquet cache
+
+    load_ms, (df, common_name_column) = best_ms(lambda: load_calendar(path, activity_periods, cache_dir))
+    index_ms, (name_index, _) = best_ms(lambda: build_name_index(df[common_name_column]))
+    search_index_ms, search_index = best_ms(lambda: SearchIndex([(path, df[common_name_column])]), repeat=1)
+    store = CalendarStore(os.path.join(work_dir, f'calendars-{rows}.sqlite'))
+    import_ms, _ = best_ms(lambda: store.sync(OPTION, path, activity_periods, cache_dir), repeat=1)
+
+    print(f"{rows} rows:")
+    print(f"  pandas  load {load_ms:7.1f} ms + indexes {index_ms + search_index_ms:7.1f} ms per server process, "
+          f"{memory_usage(df) / 2**20:6.1f} MiB held in memory")
+    print(f"  sqlite  import {import_ms:7.1f} ms once per CSV version, "
+          f"{os.path.getsize(store.db_path) / 2**20:6.1f} MiB on disk, nothing held in memory")
+
+    def pandas_search(query):
+        entries, exact = search_index.search(query)
+        return list(np.sort(search_index.entry_position[entries])), exact
+
+    def sqlite_search(query):
+        positions, exact = store.search(OPTION, query)
+        return list(positions), exact
+
+    def pandas_filter(**filters):
+        return filter_and_sort(df, common_name_column, name_index, **filters)[1]
+
+    def sqlite_filter(**filters):
+        return store.filter_and_sort(OPTION, **filters)[1]
+
+    plant_name = df[common_name_column].iloc[len(df) // 2]
+    queries = [
+        ("search 'rose'", lambda: pandas_search('rose'), lambda: sqlite_search('rose')),
+        ("search 'lavendr' (fuzzy)", lambda: pandas_search('lavendr'), lambda: sqlite_search('lavendr')),
+        ("March, all activities", lambda: pandas_filter(month_num=3, activities=list(activity_periods)),
+         lambda: sqlite_filter(month_num=3, activities=list(activity_periods))),
+        ("March, Cut, Shade", lambda: pandas_filter(month_num=3, activities=['Cut'], light_types=['Shade']),
+         lambda: sqlite_filter(month_num=3, activities=['Cut'], light_types=['Shade'])),
+        ("light Full Sun", lambda: pandas_filter(light_types=['Full Sun']), lambda: sqlite_filter(light_types=['Full Sun'])),
+        ("details lookup", lambda: [list(lookup_row(df, name_index, plant_name).astype(str))],
+         lambda: [list(store.lookup_row(OPTION, plant_name).astype(str))]),
+    ]
+    print(f"  {'query':<26} {'matches':>8} {'pandas':>10} {'sqlite':>10} {'+ fetch page':>13}")
+    for label, pandas_query, sqlite_query in queries:
+        pandas_ms, expected = best_ms(pandas_query)
+        sqlite_ms, result = best_ms(sqlite_query)
+        assert result == expected, label
+        positions = result[0] if isinstance(result, tuple) else result
+        fetch_ms = best_ms(lambda: store.rows(OPTION, positions[:DEFAULT_PAGE_SIZE]))[0] if label != "details lookup" else 0.0
+        print(f"  {label:<26} {len(positions):>8} {pandas_ms:7.1f} ms {sqlite_ms:7.1f} ms {fetch_ms:10.1f} ms")
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000]
+    work_dir = tempfile.mkdtemp()
+    try:
+        for rows in sizes:
+            run(rows, work_dir)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
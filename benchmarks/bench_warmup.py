@@ -0,0 +1,100 @@
+"""
+Benchmark: server-start warm-up of every calendar file.
+
+sequential    each of the five files loaded one after another (what the
+              first switch to every calendar paid before)
+warm-up       all five loaded by CalendarLoader.warm_up on its thread pool
+first switch  latency of the first request for a calendar, cold vs. after
+              the warm-up
+single-flight 16 threads asking for the same cold file at once; all must get
+              the very same table (one load)
+
+Each scenario is run with an empty Parquet cache (CSV parsing) and a warm one.
+The warm-up only beats the sequential loads with more than one CPU core.
+
+Run from the repository root:
+    python -m benchmarks.bench_warmup [rows]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.synthetic import write_catalog
+from plant_calendar.config import FILE_OPTIONS, COLUMN_MAPPINGS
+from plant_calendar.data import load_calendar
+from plant_calendar.warmup import CalendarLoader
+
+THREADS = 16
+
+
+def wait_for_warm_up(loader):
+    while loader.warm_up_ms is None:
+        time.sleep(0.001)
+    return loader.warm_up_ms
+
+
+def reset_cache(cache_dir, cache_state):
+    if cache_state == 'empty':
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    work_dir = tempfile.mkdtemp()
+    try:
+        files = [(write_catalog(option, rows, work_dir), COLUMN_MAPPINGS[option]) for option in FILE_OPTIONS]
+        cache_dir = os.path.join(work_dir, 'cache')
+        for cache_state in ('empty', 'warm'):
+            for path, periods in files if cache_state == 'warm' else []:
+                load_calendar(path, periods, cache_dir) # Every file's Parquet entry in place
+            reset_cache(cache_dir, cache_state)
+            start = time.perf_counter()
+            for path, periods in files:
+                load_calendar(path, periods, cache_dir)
+            sequential_ms = (time.perf_counter() - start) * 1000
+
+            reset_cache(cache_dir, cache_state)
+            loader = CalendarLoader(cache_dir)
+            loader.warm_up(files)
+            warm_up_ms = wait_for_warm_up(loader)
+            start = time.perf_counter()
+            loader.get(*files[-1])
+            warm_switch_ms = (time.perf_counter() - start) * 1000
+
+            reset_cache(cache_dir, cache_state)
+            cold_loader = CalendarLoader(cache_dir)
+            start = time.perf_counter()
+            cold_loader.get(*files[-1])
+            cold_switch_ms = (time.perf_counter() - start) * 1000
+
+            reset_cache(cache_dir, cache_state)
+            shared_loader, results = CalendarLoader(cache_dir), [None] * THREADS
+            barrier = threading.Barrier(THREADS)
+
+            def request(n):
+                barrier.wait()
+                results[n] = shared_loader.get(*files[0])[0]
+
+            threads = [threading.Thread(target=request, args=(n,)) for n in range(THREADS)]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            concurrent_ms = (time.perf_counter() - start) * 1000
+            assert all(result is results[0] for result in results)
+
+            print(f"{rows} rows x {len(files)} files, Parquet cache {cache_state}:")
+            print(f"  sequential loads    {sequential_ms:8.1f} ms")
+            print(f"  parallel warm-up    {warm_up_ms:8.1f} ms")
+            print(f"  first switch        {cold_switch_ms:8.1f} ms cold   {warm_switch_ms:6.2f} ms after warm-up")
+            print(f"  {THREADS} concurrent requests, one file: {concurrent_ms:8.1f} ms, 1 load")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Synthetic calendar catalogs for benchmarks.
+
+`synthetic_catalog` builds a DataFrame with exactly the columns of a bundled
+calendar CSV (including its empty trailing columns), at any number of rows:
+
+- plant names are made-up genus names with optional cultivar suffixes and
+  accented words, so the search index sees realistic text;
+- every activity gets a random 1-6 month range, roughly a fifth of which wrap
+  the year end (e.g. Nov-Feb), and a few percent are blank or half-blank;
+- every other column is sampled from the values the bundled file actually
+  uses (all cutting types, light, water need, ...) with some blanks;
+- a few rows are entirely blank, as in the bundled cutting/division files.
+
+Run from the repository root to write CSVs for manual testing:
+    python -m benchmarks.synthetic 10000 /tmp/synthetic
+"""
+import os
+import random
+import sys
+
+import numpy as np
+import pandas as pd
+
+from plant_calendar.config import COLUMN_MAPPINGS, FILE_OPTIONS
+from plant_calendar.data import common_name_column_for
+
+SYLLABLES = ['la', 'ven', 'der', 'ro', 'sa', 'gal', 'an', 'thus', 'hel', 'le', 'bor', 'us', 'pri', 'mu', 'ca', 'mel', 'li',
+             'a', 'sal', 'vi', 'ge', 'ra', 'ni', 'um', 'dah', 'zin', 'ne', 'ph', 'lox', 'ir', 'is', 'tu', 'lip', 'cro', 'cus']
+WORDS = ['Rose', 'Sweet', 'Pea', 'Evening', 'Primrose', 'Bear’s', 'Breeches', 'Crème', 'Brûlée', 'Dwarf', 'Giant', 'Blue']
+MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+BLANK_ROW_RATE = 0.01 # Rows with every column empty
+MISSING_RANGE_RATE = 0.03 # Activity ranges with both months empty
+HALF_RANGE_RATE = 0.01 # ... or only the end month empty
+MISSING_VALUE_RATE = 0.05 # Empty cells in the other columns
+MAX_RANGE_MONTHS = 6 # Ranges cover 1-6 months, so about a fifth wrap the year end
+
+
+def synthetic_names(count, seed=0):
+    rng = random.Random(seed)
+    names = []
+    for _ in range(count):
+        genus = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+        name = f"{genus} {rng.choice(WORDS)}" if rng.random() < 0.5 else genus
+        if rng.random() < 0.6:
+            name += f" ({' '.join(rng.sample(WORDS, rng.randint(1, 2)))})"
+        names.append(name)
+    return names
+
+
+def month_ranges(count, rng):
+    """Start/end month abbreviations (object arrays, NaN when missing) for `count` rows."""
+    starts = rng.integers(0, 12, count)
+    ends = (starts + rng.integers(0, MAX_RANGE_MONTHS, count)) % 12 # Past December wraps to January
+    start_names = np.array(MONTHS, dtype=object)[starts]
+    end_names = np.array(MONTHS, dtype=object)[ends]
+
+    missing = rng.random(count)
+    start_names[missing < MISSING_RANGE_RATE] = np.nan
+    end_names[missing < MISSING_RANGE_RATE + HALF_RANGE_RATE] = np.nan
+    return start_names, end_names
+
+
+def synthetic_catalog(option, rows, seed=0):
+    """A `rows`-row DataFrame shaped like the bundled CSV for calendar `option`."""
+    rng = np.random.default_rng(seed)
+    file_path = FILE_OPTIONS[option]
+    reference = pd.read_csv(file_path, encoding='utf-8-sig')
+    name_column = common_name_column_for(file_path)
+    month_columns = {column for period in COLUMN_MAPPINGS[option].values() for column in period}
+
+    columns = {}
+    for column in reference.columns:
+        if column == name_column:
+            columns[column] = np.array(synthetic_names(rows, seed), dtype=object)
+        elif column in month_columns:
+            continue
+        else:
+            pool = reference[column].dropna().unique()
+            if len(pool) == 0: # Empty trailing columns stay empty
+                columns[column] = np.full(rows, np.nan, dtype=object)
+                continue
+            values = pool[rng.integers(0, len(pool), rows)].astype(object)
+            values[rng.random(rows) < MISSING_VALUE_RATE] = np.nan
+            columns[column] = values
+
+    for start_col, end_col in COLUMN_MAPPINGS[option].values():
+        columns[start_col], columns[end_col] = month_ranges(rows, rng)
+
+    df = pd.DataFrame(columns)[list(reference.columns)]
+    df.loc[rng.random(rows) < BLANK_ROW_RATE, :] = np.nan
+    return df
+
+
+def write_catalog(option, rows, directory, seed=0):
+    """Writes `synthetic_catalog` as a CSV named like the bundled file and returns its path."""
+    os.makedirs(directory, exist_ok=True)
+    file_path = os.path.join(directory, FILE_OPTIONS[option])
+    synthetic_catalog(option, rows, seed).to_csv(file_path, index=False, encoding='utf-8-sig')
+    return file_path
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    directory = sys.argv[2] if len(sys.argv) > 2 else 'synthetic_calendars'
+    for option in FILE_OPTIONS:
+        file_path = write_catalog(option, rows, directory)
+        print(f"{option:<36} {rows:>8} rows  {os.path.getsize(file_path) / 1e6:6.1f} MB  {file_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Core data and charting helpers for the Garden Plant Calendar app, usable
+without Streamlit (batch jobs, benchmarks, other services).
+
+Importing the package is cheap: each name below is imported from its
+submodule on first use, so pandas/NumPy load only with the data layer and
+Plotly only when a figure is built.
+
+    from plant_calendar import COLUMN_MAPPINGS, load_calendar, build_calendar_figure
+"""
+import importlib
+
+_EXPORTS = {
+    # Calendar definitions and colours
+    'FILE_OPTIONS': 'config',
+    'COLUMN_MAPPINGS': 'config',
+    'PLANT_DETAILS_MAPPING': 'config',
+    'LEGEND_SORT_ORDER': 'config',
+    'MONTH_NAMES': 'config',
+    'get_bar_color_and_legend': 'config',
+    # Loading
+    'data_version': 'data',
+    'read_calendar_csv': 'data',
+    'load_calendar': 'data',
+    'ingest_calendar': 'ingest',
+    'QuarantineReport': 'ingest',
+    'CalendarLoader': 'warmup',
+    'CalendarStore': 'store',
+    'build_name_index': 'lookup',
+    'lookup_row': 'lookup',
+    # Filtering and search
+    'MONTH_MAP': 'filters',
+    'is_month_in_range': 'filters',
+    'selected_activities': 'filters',
+    'activity_month_mask': 'filters',
+    'light_mask': 'filters',
+    'sort_plant_names': 'filters',
+    'filter_and_sort': 'filters',
+    'SearchIndex': 'search',
+    'CalendarCatalog': 'catalog',
+    'DayIntervalIndex': 'tasks',
+    'TaskIndex': 'tasks',
+    'plant_details': 'details',
+    # Chart
+    'activity_intervals': 'geometry',
+    'calendar_geometry': 'geometry',
+    'build_calendar_figure': 'chart',
+    # Climate regions
+    'REGIONS': 'climate',
+    'ClimateProfile': 'climate',
+    'shift_calendar': 'climate',
+    'shifted_month_masks': 'climate',
+    # Export
+    'iter_ics': 'export',
+    'iter_csv': 'export',
+    'render_posters': 'export',
+    # Local JSON API
+    'CalendarAPI': 'api',
+    'serve_in_thread': 'api',
+    # Instrumentation
+    'RerunProfile': 'profiling',
+    'stage': 'profiling',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{_EXPORTS[name]}"), name)
+    globals()[name] = value # Later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return __all__
@@ -0,0 +1,452 @@
+"""
+Local HTTP JSON API over the calendars, for tools that need the page's
+search, filters, plant details and chart data without rendering the page.
+
+It runs on asyncio streams (no web framework) over the same data layer as
+the app: calendars come from a `warmup.CalendarLoader` (the app's own when
+Plant_App.py starts it with API_PORT set, so both share one copy of every
+table), names are matched with `search.SearchIndex`, rows are filtered by
+`filters.filter_and_sort`, details are formatted by `details.plant_details`
+and bars are taken from `geometry.activity_intervals`. Every endpoint is GET
+and returns JSON:
+
+    GET /calendars                          calendars, their activities and light types
+    GET /calendars/{calendar}/plants        plant names in chart order, filtered by
+        ?q=&month=&activity=&light=&sort=&region=   (activity and light may repeat)
+    GET /calendars/{calendar}/plants/{name} one plant's details and activity months
+    GET /calendars/{calendar}/intervals     chart bars of the same filtered plants,
+        ?<filters as above>&year=                   as day-of-year columns
+
+`{calendar}` is a slug of the calendar name ('annuals-from-seed', see
+CALENDAR_SLUGS). Responses are kept encoded in an LRU cache keyed on the
+request and the calendar's data version, and carry an ETag made from the
+same key, so a client sending it back in If-None-Match gets 304 Not Modified
+until the CSV is saved. Concurrent requests for an uncached response wait
+for one computation; pandas work runs on a thread pool, and a cached
+response never leaves the event loop.
+
+Command line (run from the folder holding the CSVs):
+
+    python -m plant_calendar.api --port 8765
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import numpy as np
+
+from plant_calendar.climate import DEFAULT_REGION, REGIONS, shift_calendar
+from plant_calendar.config import FILE_OPTIONS, COLUMN_MAPPINGS
+from plant_calendar.data import data_version
+from plant_calendar.details import get_clean_value, plant_details
+from plant_calendar.filters import SORT_ORDERS, filter_and_sort
+from plant_calendar.geometry import POSITION, ACTIVITY, START_DOY, END_DOY, LEGEND, activity_intervals, calendar_geometry
+from plant_calendar.lookup import build_name_index, lookup_row
+from plant_calendar.memo import LRUCache
+from plant_calendar.reload import update_intervals
+from plant_calendar.search import SearchIndex
+from plant_calendar.warmup import CalendarLoader
+
+DEFAULT_PORT = 8765
+API_WORKERS = 4 # Threads computing uncached responses
+RESPONSE_CACHE_ENTRIES = 4096
+RESPONSE_CACHE_BYTES = 64 * 2**20 # Encoded bodies
+
+# URL slug -> calendar name ('Perennials & Shrubs From Cuttings' -> 'perennials-shrubs-from-cuttings')
+CALENDAR_SLUGS = {re.sub(r'[^0-9a-z]+', '-', option.lower()).strip('-'): option for option in FILE_OPTIONS}
+SORT_PARAMS = {'asc': SORT_ORDERS[0], 'desc': SORT_ORDERS[1]}
+
+STATUS_REASONS = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+                  500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+
+class APIError(Exception):
+    """A request that can't be answered: its HTTP status and a message for the JSON error body."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def encode_json(value):
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def make_etag(key):
+    """Strong ETag for the response cached under `key` (which holds the data versions it was built from)."""
+    return '"' + hashlib.sha1(repr(key).encode('utf-8')).hexdigest()[:20] + '"'
+
+
+def _same_names(previous, changes, df):
+    # A name-keyed structure of the previous version of a reloaded file, kept if no name changed (as the app does)
+    return previous if changes.names_unchanged else None
+
+
+def _one(params, name, default=None):
+    values = params.get(name)
+    return values[-1] if values else default
+
+
+def _int_param(params, name, default, low, high):
+    value = _one(params, name)
+    if value is None or value == '':
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise APIError(400, f"'{name}' must be a whole number, not '{value}'") from None
+    if not low <= number <= high:
+        raise APIError(400, f"'{name}' must be between {low} and {high}")
+    return number
+
+
+class CalendarAPI:
+    """
+    The API's request handling, independent of the transport: `respond`
+    turns (method, target, headers) into (status, headers, body). Calendars
+    are read from `data_dir` through `loader` (a new CalendarLoader over
+    `cache_dir` if not given).
+    """
+
+    def __init__(self, data_dir='.', loader=None, cache_dir=None, workers=API_WORKERS,
+                 cache_entries=RESPONSE_CACHE_ENTRIES, cache_bytes=RESPONSE_CACHE_BYTES):
+        self.data_dir = data_dir
+        self.loader = loader if loader is not None else CalendarLoader(cache_dir)
+        self.responses = LRUCache(max_entries=cache_entries, max_size=cache_bytes, sizeof=len)
+        self.not_modified = 0 # 304 responses
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='calendar-api')
+        self._pending = {} # Cache key -> asyncio.Future of a response being computed
+
+    # --- Calendars (shared with the app through the loader's derived structures) ---
+    def file_path(self, option):
+        return os.path.join(self.data_dir, FILE_OPTIONS[option])
+
+    def version(self, option):
+        try:
+            return data_version(self.file_path(option))
+        except FileNotFoundError:
+            raise APIError(503, f"Calendar file '{FILE_OPTIONS[option]}' not found") from None
+
+    def calendar(self, option, version):
+        """(df, common_name_column, name_index) of calendar `option`."""
+        file_path = self.file_path(option)
+        try:
+            df, common_name_column = self.loader.get(file_path, COLUMN_MAPPINGS[option])
+        except FileNotFoundError:
+            raise APIError(503, f"Calendar file '{FILE_OPTIONS[option]}' not found") from None
+        except KeyError as missing_column:
+            raise APIError(503, f"Expected column {missing_column} not found in '{FILE_OPTIONS[option]}'") from None
+        name_index, _ = self.loader.derived(
+            file_path, version, df, 'name_index', lambda df: build_name_index(df[common_name_column]), update=_same_names
+        )
+        return df, common_name_column, name_index
+
+    def _search_index(self, option, version, df, common_name_column):
+        return self.loader.derived(
+            self.file_path(option), version, df, 'search_index', lambda df: SearchIndex([(self.file_path(option), df[common_name_column])]),
+            update=_same_names
+        )
+
+    def _intervals(self, option, version, df, year):
+        return self.loader.derived(
+            self.file_path(option), version, df, ('intervals', option, year),
+            lambda df: activity_intervals(df, option, COLUMN_MAPPINGS[option], year),
+            update=lambda previous, changes, df: update_intervals(previous, changes, df, option, COLUMN_MAPPINGS[option], year)
+        )
+
+    def _shifted(self, option, version, df, year, region):
+        return self.loader.derived(
+            self.file_path(option), version, df, ('shifted', option, year, region),
+            lambda df: shift_calendar(df, option, COLUMN_MAPPINGS[option], year, REGIONS[region],
+                                      intervals=self._intervals(option, version, df, year))
+        )
+
+    def warm_up(self):
+        """
+        Builds every calendar's name and search indexes and this year's
+        intervals on the thread pool, so first requests don't wait for
+        them. Returns the futures; calendars that fail to load are skipped.
+        """
+        def build(option):
+            try:
+                version = self.version(option)
+                df, common_name_column, _ = self.calendar(option, version)
+            except APIError:
+                return
+            self._search_index(option, version, df, common_name_column)
+            self._intervals(option, version, df, date.today().year)
+        return [self._pool.submit(build, option) for option in FILE_OPTIONS]
+
+    # --- Endpoints (run on the thread pool) ---
+    def list_calendars(self, versions):
+        calendars = []
+        for slug, option in CALENDAR_SLUGS.items():
+            df, _, _ = self.calendar(option, versions[option])
+            light_types = sorted(str(light) for light in df['Light'].dropna().unique()) if 'Light' in df.columns else []
+            calendars.append({'slug': slug, 'name': option, 'file': FILE_OPTIONS[option], 'version': versions[option],
+                              'plants': len(df), 'activities': list(COLUMN_MAPPINGS[option]), 'light_types': light_types})
+        return {'calendars': calendars, 'regions': list(REGIONS)}
+
+    def _filter(self, option, version, params, year):
+        """
+        (df, display_positions, plant_names, shifted, exact) for the filter
+        query parameters, as the page's search and sidebar filters compute
+        them; `shifted` is the ShiftedCalendar of a region other than the
+        default, else None.
+        """
+        df, common_name_column, name_index = self.calendar(option, version)
+        activity_periods = COLUMN_MAPPINGS[option]
+        month = _int_param(params, 'month', 0, 0, 12)
+        activities = params.get('activity') or (list(activity_periods) if month else None)
+        unknown = [activity for activity in activities or [] if activity not in activity_periods]
+        if unknown:
+            raise APIError(400, f"Unknown activities for {option}: {', '.join(unknown)}")
+        sort = _one(params, 'sort', 'asc')
+        if sort not in SORT_PARAMS:
+            raise APIError(400, f"'sort' must be one of: {', '.join(SORT_PARAMS)}")
+        region = _one(params, 'region', DEFAULT_REGION)
+        if region not in REGIONS:
+            raise APIError(400, f"Unknown region '{region}'")
+        shifted = self._shifted(option, version, df, year, region) if region != DEFAULT_REGION else None
+
+        positions, exact = None, None
+        query = _one(params, 'q', '').strip()
+        if query:
+            search_index = self._search_index(option, version, df, common_name_column)
+            entries, exact = search_index.search(query)
+            positions = np.sort(search_index.entry_position[entries])
+            if len(positions) == 0:
+                return df, [], [], shifted, exact
+
+        _, display_positions, plant_names = filter_and_sort(
+            df, common_name_column, name_index, month_num=month, activities=activities if month else None,
+            light_types=params.get('light', []), sort_order=SORT_PARAMS[sort], positions=positions,
+            month_masks=shifted.month_masks if shifted else None,
+        )
+        return df, display_positions, plant_names, shifted, exact
+
+    def plants(self, option, version, params):
+        year = _int_param(params, 'year', date.today().year, 1900, 2999)
+        _, _, plant_names, _, exact = self._filter(option, version, params, year)
+        return {'calendar': option, 'count': len(plant_names), 'exact_match': exact, 'plants': plant_names}
+
+    def plant(self, option, version, plant_name):
+        df, _, name_index = self.calendar(option, version)
+        try:
+            row = lookup_row(df, name_index, plant_name)
+        except KeyError:
+            raise APIError(404, f"No plant named '{plant_name}' in {option}") from None
+        activities = {activity: {'start': get_clean_value(row, start_col), 'end': get_clean_value(row, end_col)}
+                      for activity, (start_col, end_col) in COLUMN_MAPPINGS[option].items()}
+        details = [{'label': label, 'value': text} for label, text in plant_details(row, option)]
+        return {'calendar': option, 'name': plant_name, 'activities': activities, 'details': details}
+
+    def intervals(self, option, version, params):
+        """
+        The chart's bars for the filtered plants, in chart order: columns of
+        plant (index into 'plants'), activity, first and last day of the
+        year (inclusive; a window over the year end is two bars) and legend
+        (index into 'legends'), with the frost bands of the calendar or
+        region.
+        """
+        year = _int_param(params, 'year', date.today().year, 1900, 2999)
+        df, display_positions, plant_names, shifted, _ = self._filter(option, version, params, year)
+        if shifted is not None:
+            intervals, legends, frost_bands = shifted.intervals, shifted.legends, shifted.frost_bands
+        else:
+            (intervals, legends), frost_bands = self._intervals(option, version, df, year), calendar_geometry(year)['frost_bands']
+        plant_order = np.full(len(df), -1, dtype=np.int64)
+        plant_order[np.asarray(display_positions, dtype=np.intp)] = np.arange(len(display_positions))
+        rows = plant_order[df.index.get_indexer(intervals[:, POSITION])]
+        shown = np.flatnonzero(rows >= 0)
+        shown = shown[np.argsort(rows[shown], kind='stable')]
+        activity_names = list(COLUMN_MAPPINGS[option])
+        return {
+            'calendar': option, 'year': year, 'plants': plant_names, 'activities': activity_names,
+            'legends': [{'name': name, 'color': color} for name, color in legends],
+            'frost_bands': [list(band) for band in frost_bands], # (first day, day after the last) ranges
+            'bars': {
+                'plant': rows[shown].tolist(),
+                'activity': intervals[shown, ACTIVITY].tolist(),
+                'start_day': intervals[shown, START_DOY].tolist(),
+                'end_day': intervals[shown, END_DOY].tolist(),
+                'legend': intervals[shown, LEGEND].tolist(),
+            },
+        }
+
+    # --- Routing and caching ---
+    def route(self, path, params):
+        """(cache key, function computing the response body) for a request, checking the calendar exists."""
+        parts = [unquote(part) for part in path.strip('/').split('/')]
+        query = tuple(sorted((name, tuple(values)) for name, values in params.items()))
+        if parts == ['calendars']:
+            versions = {option: self.version(option) for option in FILE_OPTIONS}
+            return (path, tuple(versions.values())), lambda: self.list_calendars(versions)
+        if len(parts) >= 3 and parts[0] == 'calendars':
+            option = CALENDAR_SLUGS.get(parts[1])
+            if option is None:
+                raise APIError(404, f"Unknown calendar '{parts[1]}'; calendars: {', '.join(CALENDAR_SLUGS)}")
+            version = self.version(option)
+            this_year = date.today().year # The default 'year', so filtered responses change with it
+            if parts[2:] == ['plants']:
+                return ('plants', option, version, query, this_year), lambda: self.plants(option, version, params)
+            if len(parts) == 4 and parts[2] == 'plants':
+                return ('plant', option, version, parts[3]), lambda: self.plant(option, version, parts[3])
+            if parts[2:] == ['intervals']:
+                return ('intervals', option, version, query, this_year), lambda: self.intervals(option, version, params)
+        raise APIError(404, f"No endpoint at '{path}'")
+
+    async def respond(self, method, target, headers):
+        """(status, headers, body) for one request; `headers` has lower-case names."""
+        try:
+            if method not in ('GET', 'HEAD'):
+                raise APIError(405, "Only GET requests are supported")
+            url = urlsplit(target)
+            key, compute = self.route(url.path, parse_qs(url.query, keep_blank_values=True))
+            etag = make_etag(key)
+            response_headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+            if etag in [tag.strip() for tag in headers.get('if-none-match', '').split(',')]:
+                self.not_modified += 1
+                return 304, response_headers, b''
+
+            body = self.responses.get(key)
+            response_headers['X-Cache'] = 'hit' if body is not None else 'miss'
+            if body is None:
+                body = await self._compute(key, compute)
+            return 200, response_headers, body
+        except APIError as error:
+            return error.status, {}, encode_json({'error': str(error)})
+        except Exception as error: # Reported to the client; the server keeps running
+            return 500, {}, encode_json({'error': f"{type(error).__name__}: {error}"})
+
+    async def _compute(self, key, compute):
+        """The encoded response for `key`, computed once on the thread pool however many requests wait for it."""
+        pending = self._pending.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        pending = self._pending[key] = asyncio.get_running_loop().create_future()
+        try:
+            body = encode_json(await asyncio.get_running_loop().run_in_executor(self._pool, compute))
+            self.responses.put(key, body)
+            pending.set_result(body)
+            return body
+        except BaseException as error:
+            pending.set_exception(error)
+            pending.exception() # Retrieved, so a future nobody else awaited doesn't log it
+            raise
+        finally:
+            del self._pending[key]
+
+    # --- HTTP/1.1 over asyncio streams ---
+    async def handle_connection(self, reader, writer):
+        """Serves the requests of one connection, kept alive until the client closes it or asks to."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    method, target, http_version = request_line.decode('latin-1').split()
+                except ValueError:
+                    method, target, http_version = None, '/', 'HTTP/1.0'
+                content_length = int(headers.get('content-length') or 0)
+                if content_length:
+                    await reader.readexactly(content_length) # Not used: every endpoint is GET
+
+                status, response_headers, body = await self.respond(method, target, headers)
+                keep_alive = http_version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                head = [f"HTTP/1.1 {status} {STATUS_REASONS[status]}",
+                        "Content-Type: application/json; charset=utf-8",
+                        f"Content-Length: {len(body)}",
+                        f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+                head += [f"{name}: {value}" for name, value in response_headers.items()]
+                writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + (body if method != 'HEAD' else b''))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            pass # Client went away or sent something unreadable: drop the connection
+        finally:
+            writer.close()
+
+    async def serve(self, host='127.0.0.1', port=DEFAULT_PORT, started=None):
+        """Serves until cancelled; calls `started(server)` once listening."""
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        if started is not None:
+            started(server)
+        async with server:
+            await server.serve_forever()
+
+
+def serve_in_thread(api, host='127.0.0.1', port=DEFAULT_PORT):
+    """
+    Starts serving `api` on its own event loop in a daemon thread (as
+    Plant_App.py does next to Streamlit's) and returns the (host, port) it
+    listens on. Raises OSError if the port can't be bound.
+    """
+    ready, bound = threading.Event(), {}
+
+    def started(server):
+        bound['address'] = server.sockets[0].getsockname()[:2]
+        ready.set()
+
+    def run():
+        try:
+            asyncio.run(api.serve(host, port, started))
+        except BaseException as error:
+            bound['error'] = error
+            ready.set()
+
+    threading.Thread(target=run, name='calendar-api', daemon=True).start()
+    ready.wait()
+    if 'error' in bound:
+        raise bound['error']
+    return bound['address']
+
+
+# --- Command line ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m plant_calendar.api', description="Serve the plant calendars as a local JSON API.")
+    parser.add_argument('--data-dir', default='.', help="folder holding the calendar CSVs (default: current folder)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f"default {DEFAULT_PORT}; 0 picks a free port")
+    parser.add_argument('--workers', type=int, default=API_WORKERS, help="threads computing uncached responses")
+    parser.add_argument('--cache-mb', type=int, default=RESPONSE_CACHE_BYTES // 2**20, help="memory for cached responses, in MiB")
+    args = parser.parse_args(argv)
+
+    loader = CalendarLoader(os.path.join(args.data_dir, '.calendar_cache'))
+    calendar_files = [(os.path.join(args.data_dir, file_name), COLUMN_MAPPINGS[option]) for option, file_name in FILE_OPTIONS.items()]
+    loader.warm_up(calendar_files)
+    loader.watch(calendar_files)
+    api = CalendarAPI(args.data_dir, loader, workers=args.workers, cache_bytes=args.cache_mb * 2**20)
+    for future in api.warm_up(): # Before listening, so no request waits for an index
+        future.result()
+
+    def started(server):
+        host, port = server.sockets[0].getsockname()[:2]
+        print(f"Serving {len(FILE_OPTIONS)} calendars on http://{host}:{port}/calendars", file=sys.stderr, flush=True)
+
+    try:
+        asyncio.run(api.serve(args.host, args.port, started))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+"""
+Unified, in-memory query engine over every calendar in FILE_OPTIONS.
+
+All calendars are normalized into two tables built once:
+
+- `plants`: one row per plant per source calendar (plant_id, calendar,
+  position in that calendar, name and the shared attribute columns)
+- `activities`: a long table of (plant_id, activity, start_month, end_month,
+  months) rows, one per activity window, with `months` the 12-bit month mask
+
+so questions like "everything I can sow, cut, divide or plant in March" are
+answered in a single vectorised pass instead of one page load per calendar.
+
+    catalog = CalendarCatalog.load('.')
+    catalog.query(month=3, activities=['Sow', 'Cut', 'Division', 'Plant'])
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from plant_calendar.config import FILE_OPTIONS, COLUMN_MAPPINGS, MONTH_NAMES
+from plant_calendar.data import load_calendar
+from plant_calendar.filters import start_code_column, end_code_column, month_mask_column
+from plant_calendar.search import SearchIndex
+
+# Plant attributes kept in the shared table (missing columns are left empty)
+ATTRIBUTE_COLUMNS = ['Difficulty', 'Light', 'Water Need', 'Pollinator Friendly', 'Evergreen/ Deciduous', 'Cutting Type',
+                     'Height (cm)', 'Spread (cm)', 'Spacing (cm)', 'How to Overwinter', 'Notes']
+
+# Month codes 0-12 -> short month names, for query results
+_MONTH_LABELS = np.array([''] + [name[:3] for name in MONTH_NAMES], dtype=object)
+
+
+class CalendarCatalog:
+    """
+    Query engine over several loaded calendars. `frames` maps each calendar
+    option to the (df, common_name_column) pair returned by
+    `data.load_calendar`.
+    """
+
+    def __init__(self, frames):
+        plant_parts, activity_parts = [], []
+        next_id = 0
+        for option, (df, common_name_column) in frames.items():
+            plant_ids = np.arange(next_id, next_id + len(df), dtype=np.int32)
+            next_id += len(df)
+
+            plants = pd.DataFrame({
+                'plant_id': plant_ids,
+                'calendar': option,
+                'position': df.index.to_numpy(),
+                'name': df[common_name_column].to_numpy(dtype=object),
+            })
+            for column in ATTRIBUTE_COLUMNS:
+                plants[column] = df[column].to_numpy() if column in df.columns else None
+            plant_parts.append(plants)
+
+            for activity in COLUMN_MAPPINGS[option]:
+                if month_mask_column(activity) not in df.columns:
+                    continue
+                months = df[month_mask_column(activity)].to_numpy()
+                has_window = months != 0
+                activity_parts.append(pd.DataFrame({
+                    'plant_id': plant_ids[has_window],
+                    'activity': activity,
+                    'start_month': df[start_code_column(activity)].to_numpy()[has_window],
+                    'end_month': df[end_code_column(activity)].to_numpy()[has_window],
+                    'months': months[has_window],
+                }))
+
+        self.plants = pd.concat(plant_parts, ignore_index=True)
+        self.plants['calendar'] = pd.Categorical(self.plants['calendar'], categories=list(frames))
+        self.plants['Light'] = self.plants['Light'].astype('category')
+        self.activities = pd.concat(activity_parts, ignore_index=True)
+        self.activities['activity'] = self.activities['activity'].astype('category')
+
+        # Plain NumPy views for the query hot path
+        self._activity_plant = self.activities['plant_id'].to_numpy()
+        self._activity_code = self.activities['activity'].cat.codes.to_numpy()
+        self._activity_months = self.activities['months'].to_numpy(dtype=np.uint16)
+        self._plant_light = self.plants['Light'].cat.codes.to_numpy()
+        self._plant_calendar = self.plants['calendar'].cat.codes.to_numpy()
+
+        # Entry ids of the search index coincide with plant ids (same order)
+        self.search_index = SearchIndex([
+            (option, self.plants.loc[self._plant_calendar == idx, 'name'])
+            for idx, option in enumerate(frames)
+        ])
+
+    @classmethod
+    def load(cls, data_dir='.', cache_dir=None, options=None):
+        """Loads every calendar in `options` (default: all of FILE_OPTIONS) that exists in `data_dir`."""
+        frames = {}
+        for option in options or FILE_OPTIONS:
+            file_path = os.path.join(data_dir, FILE_OPTIONS[option])
+            if os.path.exists(file_path):
+                frames[option] = load_calendar(file_path, COLUMN_MAPPINGS[option], cache_dir)
+        return cls(frames)
+
+    @property
+    def calendars(self): return list(self.plants['calendar'].cat.categories)
+
+    @property
+    def activity_names(self): return list(self.activities['activity'].cat.categories)
+
+    @property
+    def light_types(self): return sorted(str(light) for light in self.plants['Light'].cat.categories)
+
+    def plant_mask(self, light_types=None, name=None, calendars=None):
+        """Boolean mask over `plants` for the light, name (search) and calendar filters."""
+        mask = np.ones(len(self.plants), dtype=bool)
+        if light_types:
+            mask &= np.isin(self._plant_light, self.plants['Light'].cat.categories.get_indexer(list(light_types)))
+        if calendars:
+            mask &= np.isin(self._plant_calendar, self.plants['calendar'].cat.categories.get_indexer(list(calendars)))
+        if name:
+            matches = np.zeros(len(self.plants), dtype=bool)
+            matches[self.search_index.search(name)[0]] = True
+            mask &= matches
+        return mask
+
+    def query(self, month=None, activities=None, light_types=None, name=None, calendars=None):
+        """
+        Activity windows matching every given filter, across all calendars:
+        `month` (1-12, active that month), `activities` (e.g. ['Sow', 'Cut']),
+        `light_types`, `name` (search query) and `calendars`. Returns a
+        DataFrame with one row per matching plant x activity window.
+        """
+        mask = self.plant_mask(light_types, name, calendars)[self._activity_plant]
+        if month:
+            mask &= (self._activity_months & (1 << (month - 1))) != 0
+        if activities:
+            mask &= np.isin(self._activity_code, self.activities['activity'].cat.categories.get_indexer(list(activities)))
+
+        matched = self.activities[mask]
+        plants = self.plants.iloc[matched['plant_id'].to_numpy()]
+        return pd.DataFrame({
+            'Plant': plants['name'].to_numpy(),
+            'Calendar': plants['calendar'].to_numpy(),
+            'Activity': matched['activity'].to_numpy(),
+            'From': _MONTH_LABELS[matched['start_month'].to_numpy()],
+            'To': _MONTH_LABELS[matched['end_month'].to_numpy()],
+            'Light': plants['Light'].to_numpy(),
+            'plant_id': matched['plant_id'].to_numpy(),
+        })
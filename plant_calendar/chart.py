@@ -0,0 +1,358 @@
+"""
+Gantt chart building blocks: batched Plotly bar traces and background shapes.
+
+Bars come from the interval table in `plant_calendar.geometry` and are
+emitted as one array-backed trace per legend group, instead of one `go.Bar`
+per plant x activity (two for year-wrapping ranges). Plotly is imported only
+when a figure is actually built.
+
+Long plant lists are drawn a page at a time (see `page_slice`), so the
+figure sent to the browser stays the same size however big the catalog is;
+`build_overview_figure` summarises the whole filtered list by month.
+
+`build_raster_figure` is an alternative backend that paints the same bars
+into one PNG image layer, which browsers pan and zoom far more smoothly than
+thousands of SVG rectangles.
+
+`figure_spec` wraps a built figure with an estimate of its encoded size and
+its build time, so the app can cache it (bounded by size) and skip building
+it on reruns; showing it still encodes it.
+"""
+import base64
+import io
+import time
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+from plant_calendar.config import LEGEND_SORT_ORDER, MONTH_NAMES
+from plant_calendar.geometry import POSITION, ACTIVITY, START_DOY, END_DOY, LEGEND, calendar_geometry
+
+FROST_COLOR = 'rgba(70, 130, 180, 0.3)'
+
+
+def shown_intervals(intervals, display_positions):
+    """
+    Rows of `intervals` for the plants at `display_positions`, with each
+    row's display rank (0 = top plant). Returns (rows, ranks).
+    """
+    display_positions = np.asarray(display_positions, dtype=np.int64)
+    if len(intervals) == 0 or len(display_positions) == 0:
+        return intervals[:0], np.zeros(0, dtype=np.int64)
+
+    # Display rank of every row position (-1 = not shown)
+    rank = np.full(max(int(intervals[:, POSITION].max()), int(display_positions.max())) + 1, -1, dtype=np.int64)
+    rank[display_positions] = np.arange(len(display_positions))
+    shown = intervals[rank[intervals[:, POSITION]] >= 0]
+    return shown, rank[shown[:, POSITION]]
+
+
+def legend_order(legends, legend_indices):
+    """The distinct `legend_indices` in LEGEND_SORT_ORDER."""
+    return sorted(np.unique(legend_indices), key=lambda idx: LEGEND_SORT_ORDER.get(legends[idx][0], 999))
+
+
+def build_bar_traces(intervals, legends, display_positions, activity_offsets, row_spacing, bar_width):
+    """
+    One horizontal `go.Bar` per legend group, ordered by LEGEND_SORT_ORDER.
+
+    `display_positions` lists the row positions to draw, top to bottom; rows
+    of `intervals` for any other position are skipped. `activity_offsets`
+    holds the y offset of each activity index within a plant's row.
+    """
+    import plotly.graph_objects as go
+
+    shown, shown_rank = shown_intervals(intervals, display_positions)
+    if len(shown) == 0:
+        return []
+
+    y = shown_rank * row_spacing + np.asarray(activity_offsets, dtype=float)[shown[:, ACTIVITY]]
+    length = shown[:, END_DOY] - shown[:, START_DOY] + 1
+
+    traces = []
+    for legend_idx in legend_order(legends, shown[:, LEGEND]):
+        legend_name, color = legends[legend_idx]
+        in_group = shown[:, LEGEND] == legend_idx
+        traces.append(go.Bar(
+            y=y[in_group],
+            x=length[in_group],
+            base=shown[in_group, START_DOY],
+            orientation='h',
+            marker_color=color,
+            name=legend_name,
+            width=bar_width,
+            hoverinfo='none',
+            marker_line_width=0,
+            textposition='none',
+            showlegend=True,
+            legendgroup=legend_name
+        ))
+    return traces
+
+
+@lru_cache(maxsize=32)
+def calendar_shapes(year, total_y_span, frost_bands=None):
+    """
+    Month boundary lines and frost bands for `year`, as Plotly shape dicts.
+    `frost_bands` replaces the UK bands (see `climate.frost_bands`).
+    """
+    geometry = calendar_geometry(year)
+    shapes = []
+    for x_pos in geometry['month_boundaries']:
+        shapes.append(dict(type="line", x0=x_pos, y0=-0.5, x1=x_pos, y1=total_y_span, line=dict(color="DimGray", width=1), layer='below'))
+    for x0, x1 in frost_bands or geometry['frost_bands']:
+        shapes.append(dict(type="rect", x0=x0, y0=-0.5, x1=x1, y1=total_y_span, fillcolor=FROST_COLOR, line_width=0, layer='below'))
+    return tuple(shapes)
+
+
+BAR_WIDTH, ROW_SPACING = 0.28, 0.88
+
+# Plants per chart page; 0 draws every plant on one page
+PAGE_SIZES = [25, 50, 100, 250, 500, 0]
+DEFAULT_PAGE_SIZE = 100
+
+
+def page_count(num_plants, page_size):
+    """Number of chart pages needed for `num_plants` (at least one)."""
+    if page_size == 0:
+        return 1
+    return max(1, -(-num_plants // page_size))
+
+
+def page_slice(page, page_size):
+    """Slice of the sorted plant list drawn on 1-based `page`."""
+    if page_size == 0:
+        return slice(None)
+    return slice((page - 1) * page_size, page * page_size)
+
+
+def activity_offsets(num_activities, bar_width=BAR_WIDTH):
+    """Y offset of each activity's bar within a plant's row, centred on the row."""
+    if num_activities > 1:
+        return np.linspace(-bar_width * (num_activities - 1) / 2, bar_width * (num_activities - 1) / 2, num_activities)
+    return np.zeros(1)
+
+
+def calendar_layout(plant_names_sorted, num_activities, year, frost_bands=None):
+    """Layout shared by the calendar backends: size, month axis, plant axis and background shapes."""
+    geometry = calendar_geometry(year)
+
+    # Calculate total y-span dynamically based on number of plants and bar height
+    total_y_span = (len(plant_names_sorted) - 1) * ROW_SPACING + (BAR_WIDTH * num_activities) if len(plant_names_sorted) > 0 else 10
+
+    return dict(
+        height=max(600, len(plant_names_sorted) * 40), # Dynamic height, minimum 600
+        barmode='overlay',
+        showlegend=True,
+        # Desktop-friendly margins
+        margin=dict(l=150, r=20, t=50, b=50),
+        xaxis=dict(
+            tickvals=geometry['month_midpoints'],
+            ticktext=[f'<b>{name}</b>' for name in MONTH_NAMES],
+            showgrid=False,
+            range=list(geometry['x_range']),
+            tickfont=dict(color='black', size=10),
+            side='top'
+        ),
+        yaxis=dict(
+            tickvals=[i * ROW_SPACING for i in range(len(plant_names_sorted))],
+            ticktext=[f'<b>{name}</b>' for name in plant_names_sorted],
+            autorange="reversed", # Puts first plant at top
+            tickfont=dict(color='black', size=10)
+        ),
+        plot_bgcolor='white',
+        legend=dict(title_text='Activity'),
+        # Month boundary lines and frost bands
+        shapes=list(calendar_shapes(year, total_y_span, frost_bands))
+    )
+
+
+def build_calendar_figure(intervals, legends, display_positions, plant_names_sorted, num_activities, year, frost_bands=None):
+    """
+    Builds the Gantt calendar figure for the plants at `display_positions`
+    (top to bottom, labelled with `plant_names_sorted`) from the interval
+    table of `geometry.activity_intervals`, shading `frost_bands` (default:
+    the UK's).
+    """
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+
+    # One batched trace per legend group, read straight from the precomputed interval table
+    fig.add_traces(build_bar_traces(intervals, legends, display_positions, activity_offsets(num_activities), ROW_SPACING, BAR_WIDTH))
+    fig.update_layout(**calendar_layout(plant_names_sorted, num_activities, year, frost_bands))
+    return fig
+
+
+# --- Raster backend ---
+RASTER_DY = 0.02 # Y-axis units per image row; bar widths and offsets are whole rows at this step
+MAX_RASTER_ROWS = 32768 # Longer plant lists are painted at a coarser vertical step
+
+
+def raster_codes(intervals, display_positions, num_activities, year, dy=RASTER_DY):
+    """
+    Paints the bars of the plants at `display_positions` into a uint8 array
+    with one column per day of `year` and one row per `dy` of the y axis,
+    starting at the top of the first plant's row. Each cell holds the bar's
+    legend index + 1, or 0 where there is no bar.
+    """
+    num_plants = len(display_positions)
+    offsets = activity_offsets(num_activities)
+
+    # Which plant/activity bar (if any) covers the centre of each image row
+    row_centres = -ROW_SPACING / 2 + (np.arange(int(np.ceil(num_plants * ROW_SPACING / dy))) + 0.5) * dy
+    plant = np.floor(row_centres / ROW_SPACING + 0.5).astype(np.int64)
+    distance = (row_centres - plant * ROW_SPACING)[:, None] - offsets[None, :]
+    in_bar = (distance >= -BAR_WIDTH / 2) & (distance < BAR_WIDTH / 2)
+    blank_row = num_plants * num_activities
+    bar_row = np.where(in_bar.any(axis=1), plant * num_activities + in_bar.argmax(axis=1), blank_row)
+
+    # One row per plant x activity, plus a blank row, filled a day at a time from the interval table
+    codes = np.zeros((blank_row + 1, int(calendar_geometry(year)['x_range'][1] - 1)), dtype=np.uint8)
+    shown, shown_rank = shown_intervals(intervals, display_positions)
+    if len(shown):
+        lengths = shown[:, END_DOY] - shown[:, START_DOY] + 1
+        firsts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+        days = np.arange(int(lengths.sum())) - firsts + np.repeat(shown[:, START_DOY] - 1, lengths)
+        rows = np.repeat(shown_rank * num_activities + shown[:, ACTIVITY], lengths)
+        codes[rows, days] = np.repeat(shown[:, LEGEND] + 1, lengths)
+    return codes[bar_row]
+
+
+def png_data_uri(codes, colors):
+    """Palette PNG (code 0 transparent, code n drawn in colors[n - 1]) as a data URI."""
+    from PIL import Image, ImageColor
+
+    image = Image.fromarray(codes, mode='P')
+    palette = [255, 255, 255]
+    for color in colors:
+        palette.extend(ImageColor.getrgb(color)[:3])
+    image.putpalette(palette)
+    out = io.BytesIO()
+    image.save(out, format='PNG', transparency=0) # optimize=True is ~3x slower for ~20% less
+    return 'data:image/png;base64,' + base64.b64encode(out.getvalue()).decode('ascii')
+
+
+def build_raster_figure(intervals, legends, display_positions, plant_names_sorted, num_activities, year, frost_bands=None):
+    """
+    Same calendar as `build_calendar_figure`, with the bars painted into a
+    single image layer (one pixel column per day). Colours, frost bands and
+    axes are unchanged; the legend comes from marker-only placeholder traces.
+    """
+    import plotly.graph_objects as go
+
+    dy = max(RASTER_DY, len(display_positions) * ROW_SPACING / MAX_RASTER_ROWS)
+    codes = raster_codes(intervals, display_positions, num_activities, year, dy)
+
+    fig = go.Figure(go.Image(
+        source=png_data_uri(codes, [color for _, color in legends]),
+        x0=1.5, dx=1, # Pixel n covers day n + 1 from its left edge, like a bar based at that day
+        y0=-ROW_SPACING / 2 + dy / 2, dy=dy,
+        hoverinfo='skip'
+    ))
+    shown, _ = shown_intervals(intervals, display_positions)
+    for legend_idx in legend_order(legends, shown[:, LEGEND]):
+        legend_name, color = legends[legend_idx]
+        fig.add_trace(go.Scatter(
+            x=[None], y=[None], mode='markers',
+            marker=dict(color=color, symbol='square', size=12),
+            name=legend_name, showlegend=True, legendgroup=legend_name
+        ))
+
+    layout = calendar_layout(plant_names_sorted, num_activities, year, frost_bands)
+    layout['yaxis']['scaleanchor'] = False # Image traces otherwise force square pixels
+    fig.update_layout(**layout)
+    return fig
+
+
+# Chart renderers selectable in the sidebar; all take the same arguments
+CHART_BACKENDS = {
+    "Bars (SVG)": build_calendar_figure,
+    "Raster (image)": build_raster_figure,
+}
+
+
+def build_overview_figure(activities, counts):
+    """
+    Compact heatmap of how many plants have each activity in each month,
+    from `filters.activity_month_counts`, to show where a long (paged) plant
+    list is busy across the year.
+    """
+    import plotly.graph_objects as go
+
+    fig = go.Figure(go.Heatmap(
+        z=counts,
+        x=[f'<b>{name}</b>' for name in MONTH_NAMES],
+        y=list(activities),
+        text=counts,
+        texttemplate='%{text}',
+        colorscale='Greens',
+        showscale=False,
+        xgap=1,
+        ygap=1,
+        hovertemplate='%{y} in %{x}: %{z} plants<extra></extra>'
+    ))
+    fig.update_layout(
+        height=60 + 30 * len(activities),
+        # Same left margin as the calendar, so the months line up
+        margin=dict(l=150, r=20, t=30, b=10),
+        xaxis=dict(side='top', tickfont=dict(color='black', size=10)),
+        yaxis=dict(autorange="reversed", tickfont=dict(color='black', size=10)),
+        plot_bgcolor='white'
+    )
+    return fig
+
+
+# --- Cached figures ---
+# A built figure kept for reruns: the figure, an estimate of the size of its JSON as st.plotly_chart
+# encodes it (what a cache of figures is bounded by) and the milliseconds building it took, i.e. what
+# reusing it saves. st.plotly_chart still encodes the figure each time it is shown.
+FigureSpec = namedtuple('FigureSpec', ['figure', 'size', 'build_ms'])
+
+FIGURE_DATA_PROPERTIES = ('x', 'y', 'base', 'z', 'text', 'source') # Where the figures here keep their data
+
+
+@lru_cache(maxsize=1)
+def _empty_figure_size():
+    # JSON of a figure with no data: the default template and layout
+    import plotly.graph_objects as go
+    import plotly.io
+
+    return len(plotly.io.to_json(go.Figure().to_dict(), validate=False))
+
+
+def _text_size(text):
+    # Quoted, with '<', '>' and '&' escaped as \u003c etc. (as plotly.io.to_json does)
+    return len(text) + 2 + 5 * (text.count('<') + text.count('>') + text.count('&'))
+
+
+def _encoded_size(value):
+    if isinstance(value, np.ndarray) and value.dtype.kind in 'iuf':
+        return value.nbytes * 4 // 3 + 40 # Base64 'bdata' with its dtype
+    if isinstance(value, str):
+        return _text_size(value)
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return sum(_text_size(item) if isinstance(item, str) else len(str(item)) for item in value) + len(value)
+    return 0
+
+
+def figure_size(fig):
+    """
+    Estimate of the length of `fig`'s JSON, from its data arrays, labels and
+    shapes, without encoding it.
+    """
+    size = _empty_figure_size()
+    for trace in fig.data:
+        size += 300 # Names, colours and other per-trace settings
+        for name in FIGURE_DATA_PROPERTIES:
+            if name in trace:
+                size += _encoded_size(trace[name])
+    for axis in (fig.layout.xaxis, fig.layout.yaxis):
+        size += _encoded_size(axis.tickvals) + _encoded_size(axis.ticktext)
+    return size + 200 * len(fig.layout.shapes)
+
+
+def figure_spec(fig, build_ms=0.0):
+    """`fig` with its estimated JSON size; `build_ms` is the time building it took."""
+    return FigureSpec(fig, figure_size(fig), build_ms)
@@ -0,0 +1,147 @@
+"""
+Regional climate profiles: the calendars' activity windows and frost bands
+moved from the UK dates the CSVs are written for to another region's.
+
+A profile gives the region's last spring frost and first autumn frost, and
+extra per-activity offsets in days. Every activity moves by the change in
+the last frost date from the UK's, plus its own offset (e.g. a shorter
+season brings flowering in less). `shift_calendar` moves all of a
+calendar's windows at once on the interval table of
+`geometry.activity_intervals`, re-splitting windows that now run over the
+year end, and rebuilds the month bitmasks the month filter reads:
+
+    shifted = shift_calendar(df, option, activity_periods, 2026, REGIONS["US Midwest (zone 5)"])
+    filter_and_sort(df, common_name_column, name_index, 5, ['Sow'], month_masks=shifted.month_masks)
+    build_calendar_figure(shifted.intervals, shifted.legends, ..., frost_bands=shifted.frost_bands)
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from plant_calendar.filters import RANGE_MASKS
+from plant_calendar.geometry import POSITION, ACTIVITY, START_DOY, END_DOY, SEGMENT, activity_intervals, days_in_year, day_of_year, month_day_bounds
+
+ClimateProfile = namedtuple('ClimateProfile', ['last_frost', 'first_frost', 'activity_offsets'])
+ClimateProfile.__doc__ = """
+A region's average last spring frost and first autumn frost, as (month,
+day), and extra days added to the shift of the activities in
+`activity_offsets`.
+"""
+
+ShiftedCalendar = namedtuple('ShiftedCalendar', ['intervals', 'legends', 'month_masks', 'frost_bands'])
+ShiftedCalendar.__doc__ = """
+A calendar moved to a region: its interval table and legends (as from
+`activity_intervals`), the month bitmask of each activity per row of the
+table it came from ({activity: uint16 array}, read in place of the
+`filters.month_mask_column` columns) and the region's frost bands.
+"""
+
+# The calendars' own dates: frost bands 1 Jan - 31 Mar and 1 Oct - 31 Dec, as geometry.FROST_BANDS
+DEFAULT_REGION = "UK & Ireland"
+
+REGIONS = {
+    DEFAULT_REGION: ClimateProfile((3, 31), (10, 1), {}),
+    "Scotland & Northern England": ClimateProfile((4, 20), (9, 25), {'Flower': -10}),
+    "Mediterranean": ClimateProfile((2, 15), (12, 1), {'Flower': 14}),
+    "US Pacific Northwest (zone 8)": ClimateProfile((4, 5), (11, 10), {}),
+    "US Midwest (zone 5)": ClimateProfile((5, 10), (10, 5), {'Flower': -20}),
+    "New Zealand (Canterbury)": ClimateProfile((10, 15), (4, 25), {}), # Seasons six months on
+}
+
+
+def activity_shifts(profile, activity_periods, year):
+    """Days each activity of `activity_periods` moves by in the region of `profile`."""
+    frost_shift = day_of_year(year, *profile.last_frost) - day_of_year(year, *REGIONS[DEFAULT_REGION].last_frost)
+    return np.array([frost_shift + profile.activity_offsets.get(activity, 0) for activity in activity_periods], dtype=np.int32)
+
+
+def frost_bands(profile, year):
+    """The region's frost season in `year` as chart bands ((x0, x1) day ranges, end exclusive), like calendar_geometry's."""
+    last_frost = day_of_year(year, *profile.last_frost)
+    first_frost = day_of_year(year, *profile.first_frost)
+    if first_frost > last_frost: # Frosts over the year end, as in the northern hemisphere
+        return ((1, last_frost + 1), (first_frost, days_in_year(year) + 1))
+    return ((first_frost, last_frost + 1),)
+
+
+def shift_intervals(intervals, shifts, year):
+    """
+    The interval table `intervals` with each activity's windows moved by
+    `shifts[activity]` days (any sign), wrapping around `year`. Windows
+    that now run over the year end are split into segments 0 and 1, and
+    wrapped ones that no longer do are joined, as `activity_intervals`
+    would build them. Unmoved and year-long windows keep their rows.
+    """
+    year_days = days_in_year(year)
+    shifts = np.asarray(shifts, dtype=np.int32)[intervals[:, ACTIVITY]] % year_days
+    starts, ends, segment = intervals[:, START_DOY], intervals[:, END_DOY], intervals[:, SEGMENT]
+
+    # A window over the year end is its segment 0 row followed by its segment 1 row: give the
+    # segment 0 row the whole window's length
+    tails = np.flatnonzero(segment == 1)
+    lengths = ends - starts + 1
+    lengths[tails - 1] += lengths[tails]
+    has_tail = np.zeros(len(intervals), dtype=bool)
+    has_tail[tails - 1] = True
+
+    heads = np.flatnonzero((segment == 0) & (shifts != 0) & (lengths < year_days))
+    if len(heads) == 0:
+        return intervals
+    keep = np.ones(len(intervals), dtype=bool)
+    keep[heads] = False
+    keep[heads[has_tail[heads]] + 1] = False
+
+    new_starts = (starts[heads] - 1 + shifts[heads]) % year_days + 1
+    new_ends = new_starts + lengths[heads] - 1
+    wraps = new_ends > year_days
+    moved = intervals[heads].copy()
+    moved[:, START_DOY], moved[:, END_DOY] = new_starts, np.minimum(new_ends, year_days)
+    wrapped = intervals[heads[wraps]].copy()
+    wrapped[:, START_DOY], wrapped[:, END_DOY], wrapped[:, SEGMENT] = 1, new_ends[wraps] - year_days, 1
+
+    shifted = np.concatenate([intervals[keep], moved, wrapped])
+    shifted = shifted[np.lexsort((shifted[:, SEGMENT], shifted[:, ACTIVITY], shifted[:, POSITION]))]
+    shifted.flags.writeable = False
+    return shifted
+
+
+def interval_month_masks(intervals, rows, num_rows, num_activities, year):
+    """
+    (num_activities, num_rows) uint16 array of the months (bit 0 = January)
+    each activity's windows touch, per row; `rows[i]` is the row of
+    interval i.
+    """
+    first_day, _ = month_day_bounds(year)
+    months = np.searchsorted(first_day[1:], intervals[:, [START_DOY, END_DOY]], side='right')
+    masks = np.zeros((num_activities, num_rows), dtype=np.uint16)
+    # Segments never wrap, so each is the month range from its start month to its end month
+    np.bitwise_or.at(masks, (intervals[:, ACTIVITY], rows), RANGE_MASKS[months[:, 0], months[:, 1]])
+    return masks
+
+
+def shift_calendar(df, option, activity_periods, year, profile, intervals=None):
+    """
+    `df` (with the month code columns of `filters.add_month_codes`) moved to
+    the region of `profile` in `year`, as a ShiftedCalendar. `intervals` may
+    pass the (intervals, legends) of `activity_intervals` already built for
+    `df`.
+    """
+    intervals, legends = intervals if intervals is not None else activity_intervals(df, option, activity_periods, year)
+    shifted = shift_intervals(intervals, activity_shifts(profile, activity_periods, year), year)
+    return ShiftedCalendar(shifted, legends, _shifted_masks(df, shifted, activity_periods, year), frost_bands(profile, year))
+
+
+def shifted_month_masks(df, activity_periods, year, profile):
+    """
+    The `month_masks` of `shift_calendar` alone, without resolving the bars'
+    legends: `df` needs only the month code columns (e.g. from
+    `CalendarStore.month_codes`).
+    """
+    intervals, _ = activity_intervals(df, None, activity_periods, year, with_legends=False)
+    shifted = shift_intervals(intervals, activity_shifts(profile, activity_periods, year), year)
+    return _shifted_masks(df, shifted, activity_periods, year)
+
+
+def _shifted_masks(df, shifted, activity_periods, year):
+    masks = interval_month_masks(shifted, df.index.get_indexer(shifted[:, POSITION]), len(df), len(activity_periods), year)
+    return dict(zip(activity_periods, masks))
@@ -0,0 +1,149 @@
+"""
+Calendar definitions and display settings shared by the app, the data layer
+and the chart.
+"""
+
+# --- File and Column Mapping Configuration ---
+FILE_OPTIONS = {
+    "Annuals From Seed": "Annuals_by_Seed.csv",
+    "Perennials From Seed": "Perennials_by_Seed.csv",
+    "Perennials & Shrubs From Cuttings": "Perennials_Shrubs_by_Cutting.csv",
+    "Perennials by Division": "Perennials_by_Division.csv",
+    "Bulbs Corms & Tubers": "Bulbs_Corms_Tubers.csv"
+}
+
+COLUMN_MAPPINGS = {
+    "Annuals From Seed": {'Sow': ('Sow Start', 'Sow End'), 'Plant Out': ('Plant Out Start', 'Plant Out End'), 'Flower': ('Flower Start', 'Flower End')},
+    "Perennials From Seed": {'Sow': ('Sow Start', 'Sow End'), 'Plant Out': ('Plant Out Start', 'Plant Out End'), 'Flower': ('Flower Start', 'Flower End')}, # CORRECTED Column Names to match simpler CSV headers
+    "Perennials & Shrubs From Cuttings": {'Cut': ('Cut Start', 'Cut End'), 'Plant Out': ('Plant Out Start', 'Plant Out End'), 'Flower': ('Flower Start', 'Flower End')},
+    "Perennials by Division": {'Division': ('Division Start', 'Division End'), 'Flower': ('Flower Start', 'Flower End')},
+    "Bulbs Corms & Tubers": {'Plant': ('Plant Start', 'Plant End'), 'Flower': ('Flower Start', 'Flower End')}
+}
+
+# --- Plant Details Configuration Mapping ---
+PLANT_DETAILS_MAPPING = {
+    "Annuals From Seed": [
+        {'label': 'Germination Temperature Range', 'cols': ['Germ Temp Min (°C)', 'Germ Temp Max (°C)'], 'type': 'range', 'unit': '°C'},
+        {'label': 'Germination Days Range', 'cols': ['Germ Days Min', 'Germ Days Max'], 'type': 'range', 'unit': ' days'},
+        {'label': 'Height', 'cols': ['Height (cm)'], 'type': 'single', 'unit': ' cm'},
+        {'label': 'Spread', 'cols': ['Spread (cm)'], 'type': 'single', 'unit': ' cm'},
+        {'label': 'Spacing', 'cols': ['Spacing (cm)'], 'type': 'single', 'unit': ' cm'},
+        {'label': 'Light', 'cols': ['Light'], 'type': 'single', 'unit': ''},
+        {'label': 'Water Need', 'cols': ['Water Need'], 'type': 'single', 'unit': ''},
+        {'label': 'Pollinator Friendly', 'cols': ['Pollinator Friendly'], 'type': 'single', 'unit': ''},
+        {'label': 'How to Overwinter', 'cols': ['How to Overwinter'], 'type': 'single', 'unit': ''},
+        {'label': 'Notes', 'cols': ['Notes'], 'type': 'single', 'unit': ''},
+    ],
+    "Perennials & Shrubs From Cuttings": [
+        {'label': 'Root Temperature Range', 'cols': ['Root Temp Min (°C)', 'Root Temp Max (°C)'], 'type': 'range', 'unit': '°C'},
+        {'label': 'Days to Root', 'cols': ['Root Days Min', 'Root Days Max'], 'type': 'range', 'unit': ' days'},
+        {'label': 'Height', 'cols': ['Height (cm)'], 'type': 'single', 'unit': ' cm'},
+        {'label': 'Spread', 'cols': ['Spread (cm)'], 'type': 'single', 'unit': ' cm'},
+        {'label': 'Spacing', 'cols': ['Spacing (cm)'], 'type': 'single', 'unit': ' cm'},
+        {'label': 'Light', 'cols': ['Light'], 'type': 'single', 'unit': ''},
+        {'label': 'Water Need', 'cols': ['Water Need'], 'type': 'single', 'unit': ''},
+        {'label': 'Pollinator Friendly', 'cols': ['Pollinator Friendly'], 'type': 'single', 'unit': ''},
+        {'label': 'How to Overwinter', 'cols': ['How to Overwinter'], 'type': 'single', 'unit': ''},
+        {'label': 'Notes', 'cols': ['Notes'], 'type': 'single', 'unit': ''}, # Added Notes
+    ],
+    # MODIFIED: Added germination details for Perennials From Seed
+    "Perennials From Seed": [
+        {'label': 'Germination Temperature Range', 'cols': ['Germ Temp Min (°C)', 'Germ Temp Max (°C)'], 'type': 'range', 'unit': '°C'},
+        {'label': 'Germination Days Range', 'cols': ['Germ Days Min', 'Germ Days Max'], 'type': 'range', 'unit': ' days'},
+        {'label': 'Height', 'cols': ['Height (cm)'], 'type': 'single', 'unit': ' cm'},
+        {'label': 'Spread', 'cols': ['Spread (cm)'], 'type': 'single', 'unit': ' cm'},
+        {'label': 'Spacing', 'cols': ['Spacing (cm)'], 'type': 'single', 'unit': ' cm'},
+        {'label': 'Light', 'cols': ['Light'], 'type': 'single', 'unit': ''},
+        {'label': 'Water Need', 'cols': ['Water Need'], 'type': 'single', 'unit': ''},
+        {'label': 'Pollinator Friendly', 'cols': ['Pollinator Friendly'], 'type': 'single', 'unit': ''},
+        {'label': 'How to Overwinter', 'cols': ['How to Overwinter'], 'type': 'single', 'unit': ''},
+        {'label': 'Notes', 'cols': ['Notes'], 'type': 'single', 'unit': ''},
+    ],
+    "Perennials by Division": [
+        {'label': 'Height', 'cols': ['Height (cm)'], 'type': 'single', 'unit': ' cm'},
+        {'label': 'Spread', 'cols': ['Spread (cm)'], 'type': 'single', 'unit': ' cm'},
+        {'label': 'Spacing', 'cols': ['Spacing (cm)'], 'type': 'single', 'unit': ' cm'},
+        {'label': 'Light', 'cols': ['Light'], 'type': 'single', 'unit': ''},
+        {'label': 'Water Need', 'cols': ['Water Need'], 'type': 'single', 'unit': ''},
+        {'label': 'Pollinator Friendly', 'cols': ['Pollinator Friendly'], 'type': 'single', 'unit': ''},
+        {'label': 'How to Overwinter', 'cols': ['How to Overwinter'], 'type': 'single', 'unit': ''},
+        {'label': 'Notes', 'cols': ['Notes'], 'type': 'single', 'unit': ''},
+    ],
+    "Bulbs Corms & Tubers": [
+        {'label': 'Height', 'cols': ['Height (cm)'], 'type': 'single', 'unit': ' cm'},
+        {'label': 'Spread', 'cols': ['Spread (cm)'], 'type': 'single', 'unit': ' cm'},
+        {'label': 'Spacing', 'cols': ['Spacing (cm)'], 'type': 'single', 'unit': ''},
+        {'label': 'Light', 'cols': ['Light'], 'type': 'single', 'unit': ''},
+        {'label': 'Water Need', 'cols': ['Water Need'], 'type': 'single', 'unit': ''},
+        {'label': 'Pollinator Friendly', 'cols': ['Pollinator Friendly'], 'type': 'single', 'unit': ''},
+        {'label': 'How to Overwinter', 'cols': ['How to Overwinter'], 'type': 'single', 'unit': ''}, # CORRECTED: Changed back to 'How to Overwinter'
+        {'label': 'Notes', 'cols': ['Notes'], 'type': 'single', 'unit': ''},
+    ],
+}
+
+# 'Common Name' column of each file (all files currently use the same header)
+COMMON_NAME_COLUMNS = {
+    "Annuals_by_Seed.csv": "Common Name",  # CORRECTED: Changed from "Common Name (Scientific)"
+    "Bulbs_Corms_Tubers.csv": "Common Name",
+    "Perennials_by_Division.csv": "Common Name",
+    "Perennials_by_Seed.csv": "Common Name",
+    "Perennials_Shrubs_by_Cutting.csv": "Common Name"
+}
+
+MONTH_NAMES = ['January', 'February', 'March', 'April', 'May', 'June', 'July', 'August', 'September', 'October', 'November', 'December']
+
+LEGEND_SORT_ORDER = {
+    'Sow': 1,
+    'Cut': 2,
+    'Softwood Cutting': 3,
+    'Semi-Ripe Cutting': 4,
+    'Hardwood Cutting': 5,
+    'Division': 6,
+    'Plant': 7,
+    'Plant Out': 8,
+    'Flower': 9
+}
+
+# --- Advanced Color Logic Function ---
+def get_bar_color_and_legend(option, activity, row_data):
+    """
+    Determines the bar color and legend text based on the selected option,
+    the activity, and data from the row (for cutting types).
+    """
+    if option == "Perennials & Shrubs From Cuttings":
+        if activity == 'Cut':
+            cutting_type = str(row_data.get('Cutting Type', '')).lower() # Blank cells come through as NaN
+            if 'softwood' in cutting_type:
+                return 'limegreen', 'Softwood Cutting'
+            elif 'semi-ripe' in cutting_type:
+                return 'darkgreen', 'Semi-Ripe Cutting'
+            elif 'hardwood' in cutting_type:
+                return 'saddlebrown', 'Hardwood Cutting'
+            else:
+                return 'purple', 'Cut'
+        elif activity == 'Plant Out':
+            return 'blue', 'Plant Out'
+        elif activity == 'Flower':
+            return 'yellow', 'Flower'
+
+    elif option == "Perennials by Division":
+        if activity == 'Division':
+            return 'blue', 'Division'
+        elif activity == 'Flower':
+            return 'yellow', 'Flower'
+
+    elif option == "Bulbs Corms & Tubers":
+        if activity == 'Plant':
+            return 'green', 'Plant'
+        elif activity == 'Flower':
+            return 'yellow', 'Flower'
+
+    else: # Default rules for Seed files
+        if activity == 'Sow':
+            return 'blue', 'Sow'
+        elif activity == 'Plant Out':
+            return 'green', 'Plant Out'
+        elif activity == 'Flower':
+            return 'yellow', 'Flower'
+
+    return 'grey', activity # Fallback color
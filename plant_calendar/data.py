@@ -0,0 +1,65 @@
+"""
+Headless CSV reading for the calendar files (no Streamlit calls), shared by
+the app's `load_data` and the on-disk cache.
+"""
+import os
+
+import pandas as pd
+
+from plant_calendar.config import COMMON_NAME_COLUMNS
+from plant_calendar.disk_cache import load_table
+from plant_calendar.filters import add_month_codes
+from plant_calendar.ingest import ingest_calendar, parser_inputs
+from plant_calendar.reload import add_row_hashes
+
+
+def data_version(file_path):
+    """
+    Cheap version tag for a calendar file, taken from its size and mtime.
+    Changes whenever the file is saved, so it can be used as a cache key.
+    """
+    stat = os.stat(file_path)
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def read_calendar_csv(file_path, common_name_column):
+    """
+    Parses a calendar CSV, strips the column names and drops rows without a
+    common name. Raises KeyError if `common_name_column` is missing.
+    """
+    df_loaded = pd.read_csv(file_path, skipinitialspace=True)
+    df_loaded.columns = df_loaded.columns.str.strip()
+
+    if common_name_column not in df_loaded.columns:
+        raise KeyError(common_name_column)
+
+    # Drop rows where the 'Common Name' column is missing or empty, then reset index
+    df_loaded.dropna(subset=[common_name_column], inplace=True)
+    return df_loaded[df_loaded[common_name_column] != ''].reset_index(drop=True)
+
+
+def common_name_column_for(file_path):
+    return COMMON_NAME_COLUMNS.get(os.path.basename(file_path), "Common Name") # Default to 'Common Name'
+
+
+def load_calendar(file_path, activity_periods, cache_dir=None):
+    """
+    Loads a calendar file, through the Parquet cache in `cache_dir` if given,
+    with the compact column types of `schema.compact_calendar` and a content
+    hash per row (`reload.ROW_HASH_COLUMN`), and adds the month code/bitmask
+    columns for `activity_periods`. The CSV is read in chunks by
+    `ingest.ingest_calendar`, which leaves out malformed rows (see its
+    QuarantineReport).
+    Returns (df, common_name_column). Raises FileNotFoundError if the file is
+    missing and KeyError if it has no common name column.
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(file_path)
+    common_name_column = common_name_column_for(file_path)
+
+    def parse(path): return add_row_hashes(ingest_calendar(path, activity_periods, common_name_column)[0])
+    if cache_dir is not None:
+        df_loaded, _ = load_table(file_path, parse, cache_dir, parser_inputs(activity_periods, common_name_column))
+    else:
+        df_loaded = parse(file_path)
+    return add_month_codes(df_loaded, activity_periods), common_name_column
@@ -0,0 +1,47 @@
+"""
+Plant Details formatting, driven by PLANT_DETAILS_MAPPING.
+"""
+import pandas as pd
+
+from plant_calendar.config import PLANT_DETAILS_MAPPING
+
+
+def get_clean_value(row_data, col_name):
+    """The stripped value of `col_name` as a string, or None if missing or blank."""
+    value = row_data.get(col_name, None)
+    if pd.isna(value) or (isinstance(value, str) and not value.strip()):
+        return None
+    return str(value).strip()
+
+
+def plant_details(row_data, option):
+    """
+    (label, text) pairs for a plant row of calendar `option`. Range items
+    with neither value are left out; single items always appear, with "N/A"
+    when the value is missing.
+    """
+    details = []
+    for detail_item in PLANT_DETAILS_MAPPING.get(option, []):
+        label = detail_item['label']
+        col_names = detail_item['cols']
+        unit = detail_item['unit']
+
+        if detail_item['type'] == 'range':
+            min_val = get_clean_value(row_data, col_names[0])
+            max_val = get_clean_value(row_data, col_names[1])
+            display_text = ""
+            if min_val is not None and max_val is not None:
+                display_text = f"{min_val}{unit} - {max_val}{unit}"
+            elif min_val is not None:
+                display_text = f"Min: {min_val}{unit}"
+            elif max_val is not None:
+                display_text = f"Max: {max_val}{unit}"
+
+            if display_text:
+                details.append((label, display_text))
+        elif detail_item['type'] == 'single':
+            value = get_clean_value(row_data, col_names[0])
+            # Always display the label, show "N/A" if value is None
+            display_value = value if value is not None else "N/A"
+            details.append((label, f"{display_value}{unit}"))
+    return details
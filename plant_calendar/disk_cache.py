@@ -0,0 +1,117 @@
+"""
+Persistent Parquet cache of parsed, normalized calendar tables.
+
+Each CSV gets a `<name>.parquet` file plus a `<name>.json` sidecar recording
+the source path, size, mtime and SHA-256 of the CSV it was built from, and a
+hash of the parser inputs (e.g. `ingest.parser_inputs`: column mapping and
+schema). A matching size/mtime reuses the Parquet file without touching the
+CSV; if only the mtime moved, the content hash decides; otherwise, or if the
+parser inputs changed, the CSV is parsed again and the entry rewritten.
+Without pyarrow the cache is skipped and the CSV is parsed every time.
+"""
+import hashlib
+import json
+import os
+import tempfile
+
+import pandas as pd
+
+CACHE_FORMAT_VERSION = 4 # Bumped whenever the parsing code changes in a way its inputs don't show
+
+
+def inputs_hash(parser_inputs):
+    """SHA-256 of `parser_inputs` (JSON-serialisable) as JSON with sorted keys."""
+    return hashlib.sha256(json.dumps(parser_inputs, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def file_sha256(file_path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _cache_paths(file_path, cache_dir):
+    abs_path = os.path.abspath(file_path)
+    stem = f"{os.path.splitext(os.path.basename(abs_path))[0]}-{hashlib.sha1(abs_path.encode()).hexdigest()[:10]}"
+    return abs_path, os.path.join(cache_dir, stem + '.parquet'), os.path.join(cache_dir, stem + '.json')
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_meta(path, meta):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+
+
+def _write_atomic(path, write):
+    # A temporary file of its own per call, so threads writing the same entry never share one
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + '.', suffix='.tmp')
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def load_table(file_path, parse, cache_dir, parser_inputs=None):
+    """
+    Returns the table for `file_path`, from the Parquet cache in `cache_dir`
+    when it is still valid, otherwise by calling `parse(file_path)` and
+    storing the result. `parser_inputs` describes what else `parse` depends
+    on; an entry stored with different inputs is not valid. The second
+    return value is 'hit', 'rehashed' (mtime changed but content didn't) or
+    'miss'.
+    """
+    abs_path, table_path, meta_path = _cache_paths(file_path, cache_dir)
+    stat = os.stat(abs_path)
+    meta = _read_meta(meta_path)
+    parser = inputs_hash(parser_inputs)
+    valid = (meta is not None and meta.get('format') == CACHE_FORMAT_VERSION and meta.get('parser') == parser
+             and meta.get('path') == abs_path and os.path.exists(table_path))
+
+    content_hash = None
+    if valid and meta['size'] == stat.st_size and meta['mtime_ns'] == stat.st_mtime_ns:
+        status = 'hit'
+    elif valid and meta['size'] == stat.st_size and meta['sha256'] == (content_hash := file_sha256(abs_path)):
+        status = 'rehashed'
+    else:
+        status = 'miss'
+
+    if status != 'miss':
+        try:
+            table = pd.read_parquet(table_path)
+        except (ImportError, OSError, ValueError):
+            status = 'miss'
+
+    if status == 'miss':
+        table = parse(file_path)
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            _write_atomic(table_path, lambda path: table.to_parquet(path, index=False))
+        except (ImportError, OSError, ValueError):
+            return table, status
+
+    new_meta = {
+        'format': CACHE_FORMAT_VERSION,
+        'parser': parser,
+        'path': abs_path,
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': content_hash or (meta['sha256'] if status == 'hit' else file_sha256(abs_path)),
+    }
+    if new_meta != meta:
+        try:
+            _write_atomic(meta_path, lambda path: _write_meta(path, new_meta))
+        except OSError:
+            pass
+    return table, status
@@ -0,0 +1,342 @@
+"""
+Exports of a (filtered) calendar for use outside the app:
+
+- `iter_ics`: iCalendar events, one per plant x activity window (a window
+  over the year end gives two), recurring yearly
+- `iter_csv`: the calendar's rows, in chart order
+- `render_posters`: the calendar chart as poster files for many calendar x
+  month combinations, on a process pool
+
+ICS and CSV output is produced by generators, a chunk at a time, so an
+export is written out as it is generated instead of being built in memory.
+Posters are written as HTML (always available) or, with the optional
+`kaleido` package installed, as PNG, SVG or PDF.
+
+Command line (run from the folder holding the CSVs):
+
+    python -m plant_calendar.export ics "Annuals From Seed" --month 3 -o sow_in_march.ics
+    python -m plant_calendar.export csv "Bulbs Corms & Tubers" -o bulbs.csv
+    python -m plant_calendar.export posters --months all --format html -o posters
+"""
+import argparse
+import csv
+import hashlib
+import importlib.util
+import io
+import os
+import re
+import sys
+import time
+from collections import namedtuple
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+
+from plant_calendar.climate import DEFAULT_REGION, REGIONS, shift_calendar
+from plant_calendar.config import FILE_OPTIONS, COLUMN_MAPPINGS, MONTH_NAMES
+from plant_calendar.data import data_version, load_calendar
+from plant_calendar.filters import filter_and_sort
+from plant_calendar.geometry import POSITION, ACTIVITY, START_DOY, END_DOY, SEGMENT, LEGEND, activity_intervals
+from plant_calendar.lookup import build_name_index
+
+ICS_PRODID = '-//Garden Plant Calendar//Plant Calendar Export//EN'
+ICS_BLOCK_EVENTS = 10_000 # Events converted to Python objects at a time by iter_ics
+CSV_CHUNK_ROWS = 1000 # Rows per chunk yielded by iter_csv
+POSTER_WIDTH = 1400 # Pixels, for image formats
+IMAGE_FORMATS = ['png', 'svg', 'pdf'] # Need kaleido
+
+
+# --- Filtering shared by all exports ---
+def filtered_plants(df, common_name_column, activity_periods, month=0, name_index=None, month_masks=None):
+    """
+    (display_positions, plant_names) of the plants shown for `month` (1-12:
+    plants with any activity that month; 0: all plants), alphabetically, as
+    on the chart. `month_masks` are a region's shifted masks (see
+    `climate.shift_calendar`).
+    """
+    if name_index is None:
+        name_index, _ = build_name_index(df[common_name_column])
+    _, display_positions, plant_names = filter_and_sort(
+        df, common_name_column, name_index, month_num=month, activities=list(activity_periods) if month else None,
+        month_masks=month_masks
+    )
+    return display_positions, plant_names
+
+
+# --- iCalendar ---
+def ics_escape(text):
+    """Escapes a TEXT value (RFC 5545 section 3.3.11)."""
+    return str(text).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\n', '\\n')
+
+
+def ics_line(line):
+    """A content line folded at 75 octets, with its CRLF."""
+    if len(line) <= 75 and line.isascii():
+        return line + '\r\n'
+    data, folded, start, width = line.encode('utf-8'), [], 0, 75
+    while len(data) - start > width:
+        end = start + width
+        while data[end] & 0xC0 == 0x80: # Don't split a UTF-8 sequence
+            end -= 1
+        folded.append(data[start:end])
+        start, width = end, 74 # Continuation lines start with a space
+    folded.append(data[start:])
+    return b'\r\n '.join(folded).decode('utf-8') + '\r\n'
+
+
+def iter_ics(df, common_name_column, option, activity_periods, year, display_positions=None, intervals=None, stamp=None,
+             duplicate_names=None):
+    """
+    Yields an iCalendar file, one event at a time: an all-day event for every
+    activity window of the plants at `display_positions` (default: all rows)
+    in `year`, repeating yearly. `intervals` may pass the (intervals,
+    legends) pair of `geometry.activity_intervals` if it is already at hand.
+    Event UIDs come from each event's identity (calendar, common name, the
+    row's place among rows of that name, activity and segment), not from
+    the row's values, so re-importing an export after an edit updates
+    events rather than duplicating them. `duplicate_names` ({name: row
+    positions} of the whole calendar, as from `lookup.build_name_index`)
+    gives that place when `df` holds only some of the calendar's rows; by
+    default it is counted in `df`.
+    """
+    from plant_calendar.chart import shown_intervals
+
+    if display_positions is None:
+        display_positions = df.index.to_numpy()
+    intervals, legends = intervals if intervals is not None else activity_intervals(df, option, activity_periods, year)
+    stamp = (stamp or datetime.now(timezone.utc)).strftime('%Y%m%dT%H%M%SZ')
+    activities = list(activity_periods)
+    calendar_slug = re.sub(r'[^a-z0-9]+', '-', option.lower()).strip('-')
+    activity_slugs = [re.sub(r'[^a-z0-9]+', '-', activity.lower()).strip('-') for activity in activities]
+    if duplicate_names is None:
+        names_column = df[common_name_column]
+        repeated = names_column[names_column.duplicated(keep=False)]
+        duplicate_names = {name: list(positions) for name, positions in repeated.groupby(repeated, sort=False).groups.items()}
+    # Position -> 1 for a name's second row, 2 for its third, ...; a name's first (or only) row is 0
+    occurrences = {int(position): occurrence for positions in duplicate_names.values() for occurrence, position in enumerate(positions)}
+    year_start = date(year, 1, 1)
+    day_dates = [f'{year_start + timedelta(days=day):%Y%m%d}' for day in range(367)] # Day of year - 1 -> 'YYYYMMDD'
+
+    yield ics_line('BEGIN:VCALENDAR')
+    yield ics_line('VERSION:2.0')
+    yield ics_line(f'PRODID:{ICS_PRODID}')
+    yield ics_line('CALSCALE:GREGORIAN')
+    yield ics_line(f'X-WR-CALNAME:{ics_escape(option)}')
+
+    # Events are generated a block at a time, so only one block's rows are held as Python objects
+    shown, _ = shown_intervals(intervals, display_positions)
+    for block_start in range(0, len(shown), ICS_BLOCK_EVENTS):
+        block = shown[block_start:block_start + ICS_BLOCK_EVENTS]
+        names = df.loc[block[:, POSITION], common_name_column].to_numpy(dtype=object)
+        name_keys = {}
+        for row, name in zip(block.tolist(), names):
+            activity = activities[row[ACTIVITY]]
+            occurrence = occurrences.get(row[POSITION], 0)
+            name_key = name_keys.get(name)
+            if name_key is None:
+                name_key = name_keys[name] = hashlib.sha1(str(name).encode('utf-8')).hexdigest()[:16]
+            yield ''.join([ # One event per chunk
+                'BEGIN:VEVENT\r\n',
+                ics_line(f'UID:{name_key}-{occurrence}-{activity_slugs[row[ACTIVITY]]}-{row[SEGMENT]}@{calendar_slug}'),
+                f'DTSTAMP:{stamp}\r\n',
+                f'DTSTART;VALUE=DATE:{day_dates[row[START_DOY] - 1]}\r\n',
+                f'DTEND;VALUE=DATE:{day_dates[row[END_DOY]]}\r\n', # Exclusive: the day after the window
+                'RRULE:FREQ=YEARLY\r\n',
+                ics_line(f'SUMMARY:{ics_escape(f"{activity}: {name}")}'),
+                ics_line(f'DESCRIPTION:{ics_escape(f"{legends[row[LEGEND]][0]} ({option})")}'),
+                ics_line(f'CATEGORIES:{ics_escape(activity)}'),
+                'TRANSP:TRANSPARENT\r\n',
+                'END:VEVENT\r\n',
+            ])
+    yield ics_line('END:VCALENDAR')
+
+
+# --- CSV ---
+def iter_csv(df, display_positions=None, chunk_rows=CSV_CHUNK_ROWS):
+    """
+    Yields the rows at `display_positions` (default: all) as CSV text, the
+    header first and then `chunk_rows` rows at a time. Only the columns
+    read from the calendar file are written, not the derived ones.
+    """
+    columns = [column for column in df.columns if not column.startswith('_')]
+    rows = df if display_positions is None else df.loc[display_positions]
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator='\n')
+    writer.writerow(columns)
+    for start in range(0, len(rows), chunk_rows):
+        writer.writerows(rows.iloc[start:start + chunk_rows][columns].itertuples(index=False, name=None))
+        yield out.getvalue()
+        out.seek(0)
+        out.truncate()
+    if out.tell():
+        yield out.getvalue() # Header of an empty export
+
+
+# --- Posters ---
+PosterTask = namedtuple('PosterTask', ['file_path', 'option', 'month', 'year', 'fmt', 'out_dir', 'cache_dir', 'region'])
+PosterTask.__doc__ = "One poster to render: calendar file and option, month (0 = whole year), year, file format, output folder and climate region."
+
+
+def image_formats():
+    """Poster formats that can be written here: HTML, plus PNG/SVG/PDF if kaleido is installed."""
+    return ['html'] + (IMAGE_FORMATS if importlib.util.find_spec('kaleido') is not None else [])
+
+
+def poster_file_name(option, month, year, fmt, region=DEFAULT_REGION):
+    slug = re.sub(r'[^A-Za-z0-9]+', '_', option if region == DEFAULT_REGION else f"{option} {region}").strip('_')
+    return f"{slug}_{MONTH_NAMES[month - 1] if month else 'Year'}_{year}.{fmt}"
+
+
+@lru_cache(maxsize=8)
+def _poster_calendar(file_path, file_version, option, cache_dir, year, region):
+    # Loaded once per worker process, file version and region, then reused for every month
+    activity_periods = COLUMN_MAPPINGS[option]
+    df, common_name_column = load_calendar(file_path, activity_periods, cache_dir)
+    name_index, _ = build_name_index(df[common_name_column])
+    intervals = activity_intervals(df, option, activity_periods, year)
+    shifted = shift_calendar(df, option, activity_periods, year, REGIONS[region], intervals) if region != DEFAULT_REGION else None
+    return df, common_name_column, name_index, intervals, shifted
+
+
+def poster_figure(df, common_name_column, name_index, intervals, option, month, year, shifted=None, region=DEFAULT_REGION):
+    """
+    The calendar figure of `option` for `month` (0 = whole year), titled for
+    printing. `shifted` is the ShiftedCalendar of `region` if it isn't the
+    default: its bars, month filter and frost bands are used instead.
+    """
+    from plant_calendar.chart import build_calendar_figure
+
+    activity_periods = COLUMN_MAPPINGS[option]
+    month_masks = shifted.month_masks if shifted is not None else None
+    display_positions, plant_names = filtered_plants(df, common_name_column, activity_periods, month, name_index, month_masks)
+    if shifted is not None:
+        fig = build_calendar_figure(shifted.intervals, shifted.legends, display_positions, plant_names, len(activity_periods), year,
+                                    frost_bands=shifted.frost_bands)
+    else:
+        fig = build_calendar_figure(*intervals, display_positions, plant_names, len(activity_periods), year)
+    period = f"{MONTH_NAMES[month - 1]} {year}" if month else str(year)
+    if region != DEFAULT_REGION:
+        period += f", {region}"
+    fig.update_layout(title=dict(text=f"{option}: {period} ({len(plant_names)} plants)", x=0.5), margin=dict(t=110))
+    return fig
+
+
+def render_poster(task):
+    """Renders one PosterTask. Returns (output path, bytes written)."""
+    df, common_name_column, name_index, intervals, shifted = _poster_calendar(
+        task.file_path, data_version(task.file_path), task.option, task.cache_dir, task.year, task.region
+    )
+    fig = poster_figure(df, common_name_column, name_index, intervals, task.option, task.month, task.year, shifted, task.region)
+    path = os.path.join(task.out_dir, poster_file_name(task.option, task.month, task.year, task.fmt, task.region))
+    if task.fmt == 'html':
+        fig.write_html(path, include_plotlyjs='cdn') # Loads plotly.js from its CDN when opened, instead of 3.5 MB per file
+    else:
+        fig.write_image(path, format=task.fmt, width=POSTER_WIDTH, height=fig.layout.height)
+    return path, os.path.getsize(path)
+
+
+def poster_tasks(data_dir, options, months, year, fmt, out_dir, cache_dir=None, region=DEFAULT_REGION):
+    """PosterTasks for every option in `options` whose file exists in `data_dir`, for every month in `months`, in `region`."""
+    tasks = []
+    for option in options:
+        file_path = os.path.join(data_dir, FILE_OPTIONS[option])
+        if os.path.exists(file_path):
+            tasks.extend(PosterTask(file_path, option, month, year, fmt, out_dir, cache_dir, region) for month in months)
+    return tasks
+
+
+def render_posters(tasks, workers=None):
+    """
+    Renders `tasks` and yields (output path, bytes written) as each poster is
+    done, in completion order. With `workers` > 1 (default: one per CPU)
+    they are rendered on a process pool; each worker loads a calendar once
+    and reuses it for all of that calendar's posters. Raises ValueError for
+    a format that can't be written here (see `image_formats`).
+    """
+    unsupported = {task.fmt for task in tasks} - set(image_formats())
+    if unsupported:
+        raise ValueError(f"Can't write {', '.join(sorted(unsupported))} posters without the 'kaleido' package")
+    for out_dir in {task.out_dir for task in tasks}:
+        os.makedirs(out_dir, exist_ok=True)
+
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    if workers <= 1:
+        for task in tasks:
+            yield render_poster(task)
+        return
+
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    # Group each calendar's posters so a worker loads a calendar once; 'spawn' because the app's
+    # server process runs threads that a forked child must not inherit
+    tasks = sorted(tasks, key=lambda task: (task.option, task.month))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        for future in as_completed([pool.submit(render_poster, task) for task in tasks]):
+            yield future.result()
+
+
+# --- Command line ---
+def _write_stream(chunks, output):
+    count = 0
+    with (open(output, 'w', encoding='utf-8', newline='') if output != '-' else sys.stdout) as out:
+        for chunk in chunks:
+            out.write(chunk)
+            count += 1
+    return count
+
+
+def main(argv=None):
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--data-dir', default='.', help="folder holding the calendar CSVs (default: current folder)")
+    common.add_argument('--year', type=int, default=date.today().year)
+    parser = argparse.ArgumentParser(prog='python -m plant_calendar.export', description="Export plant calendars as ICS, CSV or posters.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    for command in ('ics', 'csv'):
+        sub = commands.add_parser(command, parents=[common], help=f"one calendar as {command.upper()}")
+        sub.add_argument('calendar', choices=list(FILE_OPTIONS))
+        sub.add_argument('--month', type=int, default=0, choices=range(13), help="only plants with an activity this month (1-12)")
+        sub.add_argument('-o', '--output', default='-', help="output file (default: standard output)")
+    sub = commands.add_parser('posters', parents=[common], help="poster files for many calendars and months")
+    sub.add_argument('--calendars', nargs='+', choices=list(FILE_OPTIONS), default=list(FILE_OPTIONS))
+    sub.add_argument('--months', default='0', help="'all' (1-12), or comma-separated months, 0 = whole year (default)")
+    sub.add_argument('--format', default='html', choices=['html'] + IMAGE_FORMATS)
+    sub.add_argument('--region', default=DEFAULT_REGION, choices=list(REGIONS), help=f"climate region to shift the calendars to (default: {DEFAULT_REGION})")
+    sub.add_argument('--workers', type=int, default=None, help="processes to render with (default: one per CPU)")
+    sub.add_argument('-o', '--output', default='posters', help="output folder (default: ./posters)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    if args.command in ('ics', 'csv'):
+        file_path = os.path.join(args.data_dir, FILE_OPTIONS[args.calendar])
+        activity_periods = COLUMN_MAPPINGS[args.calendar]
+        try:
+            df, common_name_column = load_calendar(file_path, activity_periods)
+        except (FileNotFoundError, KeyError) as error:
+            print(f"Can't load '{file_path}': {error}", file=sys.stderr)
+            return 2
+        display_positions, plant_names = filtered_plants(df, common_name_column, activity_periods, args.month)
+        if args.command == 'ics':
+            chunks = iter_ics(df, common_name_column, args.calendar, activity_periods, args.year, display_positions)
+        else:
+            chunks = iter_csv(df, display_positions)
+        _write_stream(chunks, args.output)
+        print(f"{len(plant_names)} plants exported in {time.perf_counter() - start:.2f} s", file=sys.stderr)
+        return 0
+
+    months = range(1, 13) if args.months == 'all' else [int(month) for month in args.months.split(',')]
+    tasks = poster_tasks(args.data_dir, args.calendars, months, args.year, args.format, args.output, region=args.region)
+    try:
+        total_bytes = 0
+        for path, size in render_posters(tasks, args.workers):
+            total_bytes += size
+            print(path, file=sys.stderr)
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return 2
+    elapsed = time.perf_counter() - start
+    print(f"{len(tasks)} posters ({total_bytes / 1e6:.1f} MB) in {elapsed:.1f} s: {len(tasks) / elapsed:.1f} posters/s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+"""
+Month/activity filter engine.
+
+Each activity's start/end month strings are parsed once (when a calendar is
+loaded) into integer month codes and a 12-bit month bitmask, so filtering by
+month is a couple of NumPy operations instead of a per-row `df.apply`.
+"""
+import numpy as np
+import pandas as pd
+
+from plant_calendar.lookup import lookup_position
+from plant_calendar.profiling import stage
+from plant_calendar.schema import category_mask
+
+MONTH_MAP = {'Jan': 1, 'Feb': 2, 'Mar': 3, 'Apr': 4, 'May': 5, 'Jun': 6, 'Jul': 7, 'Aug': 8, 'Sep': 9, 'Oct': 10, 'Nov': 11, 'Dec': 12}
+
+SORT_ORDERS = ["Alphabetical (A-Z)", "Alphabetical (Z-A)"]
+
+# Activity keys covered by the "Primary Activities (Sow/Cut/Divide/Plant)" checkbox
+PRIMARY_ACTIVITIES = ['Sow', 'Cut', 'Division', 'Plant']
+
+
+def is_month_in_range(start_month_str, end_month_str, check_m_num, month_map_dict):
+    """
+    Reference (scalar) check of whether `check_m_num` falls inside a start/end
+    month range, including ranges that span the year end (e.g. Nov-Feb).
+    """
+    if pd.isna(start_month_str) or pd.isna(end_month_str):
+        return False
+    start_m = month_map_dict.get(str(start_month_str).strip())
+    end_m = month_map_dict.get(str(end_month_str).strip())
+    if start_m is None or end_m is None:
+        return False
+    if start_m <= end_m:
+        return start_m <= check_m_num <= end_m
+    else: # Range spans across year end (e.g., Nov-Feb)
+        return check_m_num >= start_m or check_m_num <= end_m
+
+
+def _build_range_masks():
+    # RANGE_MASKS[start, end] holds the month bitmask (bit 0 = January) for a
+    # pair of month codes; code 0 means missing/unrecognised and matches nothing.
+    masks = np.zeros((13, 13), dtype=np.uint16)
+    for start in range(1, 13):
+        for end in range(1, 13):
+            if start <= end:
+                months = range(start, end + 1)
+            else: # Range spans across year end (e.g., Nov-Feb)
+                months = list(range(start, 13)) + list(range(1, end + 1))
+            for month in months:
+                masks[start, end] |= 1 << (month - 1)
+    return masks
+
+RANGE_MASKS = _build_range_masks()
+
+
+def parse_month_codes(values):
+    """Maps month abbreviations to 1-12, using 0 for missing or unrecognised values."""
+    values = pd.Series(values)
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # Parse the categories once; code -1 (missing) maps to the trailing 0
+        category_month_codes = np.append(parse_month_codes(values.cat.categories), np.int8(0))
+        return category_month_codes[values.cat.codes.to_numpy()]
+    codes = values.astype(str).str.strip().map(MONTH_MAP)
+    return codes.fillna(0).to_numpy(dtype=np.int8)
+
+
+def month_bitmask(start_codes, end_codes):
+    """Vectorised 12-bit month bitmask for arrays of start/end month codes."""
+    return RANGE_MASKS[np.asarray(start_codes, dtype=np.intp), np.asarray(end_codes, dtype=np.intp)]
+
+
+def start_code_column(activity): return f"_{activity} Start Month"
+def end_code_column(activity): return f"_{activity} End Month"
+def month_mask_column(activity): return f"_{activity} Months"
+
+
+def add_month_codes(df, activity_periods):
+    """
+    Adds integer start/end month code columns and a month bitmask column for
+    every activity in `activity_periods` whose columns exist in `df`.
+    """
+    for activity, (start_col, end_col) in activity_periods.items():
+        if start_col in df.columns and end_col in df.columns:
+            start_codes = parse_month_codes(df[start_col])
+            end_codes = parse_month_codes(df[end_col])
+            df[start_code_column(activity)] = start_codes
+            df[end_code_column(activity)] = end_codes
+            df[month_mask_column(activity)] = month_bitmask(start_codes, end_codes)
+    return df
+
+
+def selected_activities(activity_periods, primary=False, plant_out=False, flower=False):
+    """Activity keys of `activity_periods` ticked by the sidebar activity checkboxes."""
+    activities = []
+    for activity_key in activity_periods:
+        if (primary and activity_key in PRIMARY_ACTIVITIES) \
+                or (plant_out and activity_key == 'Plant Out') \
+                or (flower and activity_key == 'Flower'):
+            activities.append(activity_key)
+    return activities
+
+
+def activity_months(df, activity, month_masks=None):
+    """
+    Month bitmask array of `activity` for the rows of `df`, from
+    `month_masks` ({activity: uint16 array}, e.g. a calendar shifted by
+    `climate.shift_calendar`) or else the column added by `add_month_codes`;
+    None if neither has it.
+    """
+    if month_masks is not None:
+        return month_masks.get(activity)
+    column = month_mask_column(activity)
+    return df[column].to_numpy(dtype=np.uint16) if column in df.columns else None
+
+
+def activity_month_mask(df, activities, month_num, month_masks=None):
+    """
+    Boolean array marking rows where any of `activities` is active in
+    `month_num` (1-12). Requires the columns added by `add_month_codes`,
+    unless `month_masks` replaces them.
+    """
+    bits = np.zeros(len(df), dtype=np.uint16)
+    for activity in activities:
+        months = activity_months(df, activity, month_masks)
+        if months is not None:
+            bits |= months
+    return (bits & (1 << (month_num - 1))) != 0
+
+
+def activity_month_counts(df, activities, labels=None, month_masks=None):
+    """
+    Number of rows of `df` (or of the rows at index `labels`) with each of
+    `activities` active in each month, as an int array of shape
+    (len(activities), 12), January first. Requires the columns added by
+    `add_month_codes`, unless `month_masks` replaces them.
+    """
+    rows = slice(None) if labels is None else df.index.get_indexer(labels)
+    counts = np.zeros((len(activities), 12), dtype=np.int64)
+    for i, activity in enumerate(activities):
+        months = activity_months(df, activity, month_masks)
+        if months is not None:
+            bits = months[rows]
+            for month in range(12):
+                counts[i, month] = np.count_nonzero(bits & (1 << month))
+    return counts
+
+
+def light_mask(df, light_types):
+    """Boolean array marking rows whose 'Light' value is one of `light_types`."""
+    if isinstance(df['Light'].dtype, pd.CategoricalDtype):
+        return category_mask(df['Light'], light_types)
+    return df['Light'].astype(str).isin(light_types).to_numpy()
+
+
+def sort_plant_names(df, common_name_column, name_index, sort_order=SORT_ORDERS[0], positions=None):
+    """
+    Unique plant names of `df` (or of its rows at `positions`) in
+    `sort_order`, with the catalog position of the row shown for each.
+    Returns (display_positions, plant_names_sorted).
+    """
+    names = df[common_name_column] if positions is None else df[common_name_column].take(positions)
+    plant_names_sorted = np.asarray(names.unique(), dtype=object).tolist() # Not element by element from the Arrow array
+    if sort_order == "Alphabetical (A-Z)":
+        plant_names_sorted.sort()
+    elif sort_order == "Alphabetical (Z-A)":
+        plant_names_sorted.sort(reverse=True)
+
+    # A name on one row is shown from it; only duplicated names look for their first row still in `names`
+    display_positions = []
+    for plant_name in plant_names_sorted:
+        rows = name_index[plant_name]
+        display_positions.append(rows[0] if len(rows) == 1 else lookup_position(names, name_index, plant_name))
+    return display_positions, plant_names_sorted
+
+
+def filter_and_sort(df, common_name_column, name_index, month_num=0, activities=None, light_types=(), sort_order=SORT_ORDERS[0],
+                    positions=None, month_masks=None):
+    """
+    Applies the month/activity filter (when `month_num` is non-zero and
+    `activities` is not None) and the sunlight filter to the rows of `df` at
+    `positions` (default: all, in order), then sorts the remaining plant
+    names for the chart's y axis. The filters narrow down row positions, so
+    `df` itself is never copied. `month_masks` replaces the month bitmask
+    columns for the month filter (see `activity_months`).
+
+    Returns (empty_stage, display_positions, plant_names_sorted), where
+    empty_stage is 'month' or 'light' if that filter left no plants, else None.
+    """
+    positions = np.arange(len(df)) if positions is None else np.asarray(positions, dtype=np.intp)
+    if month_num != 0 and activities is not None:
+        with stage('month filter'):
+            positions = positions[activity_month_mask(df, activities, month_num, month_masks)[positions]]
+        if len(positions) == 0:
+            return 'month', [], []
+
+    if light_types and 'Light' in df.columns:
+        # Keep rows whose 'Light' value is IN the list of selected types
+        with stage('light filter'):
+            positions = positions[light_mask(df, light_types)[positions]]
+        if len(positions) == 0:
+            return 'light', [], []
+
+    with stage('sort'):
+        display_positions, plant_names_sorted = sort_plant_names(df, common_name_column, name_index, sort_order, positions)
+    return None, display_positions, plant_names_sorted
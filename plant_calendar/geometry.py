@@ -0,0 +1,135 @@
+"""
+Day-of-year geometry for the calendar chart.
+
+`activity_intervals` turns a loaded calendar into a compact integer table of
+activity bars, computed once per calendar file and year, with year-wrapping
+ranges already split and leap years handled. `calendar_geometry` holds the
+per-year month ticks, month boundaries and frost bands. Nothing on the chart's
+hot path needs `datetime` arithmetic any more.
+"""
+import calendar
+from functools import lru_cache
+
+import numpy as np
+
+from plant_calendar.config import get_bar_color_and_legend
+from plant_calendar.filters import start_code_column, end_code_column
+
+# Columns of the interval table returned by `activity_intervals`
+POSITION, ACTIVITY, START_DOY, END_DOY, SEGMENT, LEGEND = range(6)
+
+# UK frost bands as (start month, start day, end month, end day), inclusive
+FROST_BANDS = [(1, 1, 3, 31), (10, 1, 12, 31)]
+
+
+def days_in_year(year):
+    return 366 if calendar.isleap(year) else 365
+
+
+@lru_cache(maxsize=8)
+def month_day_bounds(year):
+    """
+    (first_day, last_day) int16 arrays indexed by month code 1-12, giving each
+    month's first and last day of the year. Index 0 (missing month) is 0.
+    """
+    first_day = np.zeros(13, dtype=np.int16)
+    last_day = np.zeros(13, dtype=np.int16)
+    day = 0
+    for month in range(1, 13):
+        first_day[month] = day + 1
+        day += calendar.monthrange(year, month)[1]
+        last_day[month] = day
+    first_day.flags.writeable = False
+    last_day.flags.writeable = False
+    return first_day, last_day
+
+
+def day_of_year(year, month, day):
+    return int(month_day_bounds(year)[0][month]) + day - 1
+
+
+@lru_cache(maxsize=8)
+def calendar_geometry(year):
+    """
+    Month tick positions, month boundary lines and frost bands for `year`, in
+    day-of-year units. The x axis runs from 1 to days_in_year + 1 so the last
+    day of December is drawn in full.
+    """
+    first_day, _ = month_day_bounds(year)
+    year_end = days_in_year(year) + 1
+    return {
+        'month_midpoints': tuple(int(first_day[m]) + 14 for m in range(1, 13)),
+        'month_boundaries': tuple(int(first_day[m]) for m in range(1, 13)) + (year_end,),
+        'frost_bands': tuple(
+            (day_of_year(year, start_month, start_day), day_of_year(year, end_month, end_day) + 1)
+            for start_month, start_day, end_month, end_day in FROST_BANDS
+        ),
+        'x_range': (1, year_end),
+    }
+
+
+def activity_intervals(df, option, activity_periods, year, with_legends=True):
+    """
+    Builds the interval table for a loaded calendar (needs the month code
+    columns from `filters.add_month_codes`). Returns (intervals, legends):
+
+    - intervals: int32 array of (position, activity, start_doy, end_doy,
+      segment, legend) rows. `position` is the row's index label in `df`,
+      `activity` indexes `activity_periods`, and the day range is inclusive.
+      A range spanning the year end is split into segment 0 (to 31 Dec) and
+      segment 1 (from 1 Jan).
+    - legends: list of (legend_name, color) pairs that `legend` indexes,
+      from `get_bar_color_and_legend`.
+
+    With `with_legends=False` the per-row legend lookup is skipped: every
+    legend is 0 and the list is empty, which is enough for day ranges and
+    month masks.
+    """
+    first_day, last_day = month_day_bounds(year)
+    year_days = days_in_year(year)
+    positions = df.index.to_numpy(dtype=np.int32)
+    records = None
+
+    legend_codes, parts = {}, []
+    for activity_idx, activity in enumerate(activity_periods):
+        if start_code_column(activity) not in df.columns:
+            continue
+        start_codes = df[start_code_column(activity)].to_numpy(dtype=np.intp)
+        end_codes = df[end_code_column(activity)].to_numpy(dtype=np.intp)
+        valid = (start_codes > 0) & (end_codes > 0)
+        if not valid.any():
+            continue
+
+        # Colour/legend can depend on other columns (e.g. 'Cutting Type'), so
+        # resolve it per row here, once per load, rather than per bar per rerun
+        legend = np.zeros(len(df), dtype=np.int32)
+        if with_legends:
+            if records is None:
+                records = df.to_dict('records')
+            for row_idx in np.flatnonzero(valid):
+                key = get_bar_color_and_legend(option, activity, records[row_idx])[::-1]
+                legend[row_idx] = legend_codes.setdefault(key, len(legend_codes))
+
+        start_doy = first_day[start_codes]
+        end_doy = last_day[end_codes]
+        wraps = valid & (end_codes < start_codes)
+        same_year = valid & ~wraps
+
+        segments = (
+            (same_year, start_doy, end_doy, 0),
+            (wraps, start_doy, np.full_like(end_doy, year_days), 0), # Start month to 31 Dec
+            (wraps, np.ones_like(start_doy), end_doy, 1), # 1 Jan to end month
+        )
+        for mask, start, end, segment in segments:
+            count = int(mask.sum())
+            parts.append(np.column_stack([
+                positions[mask], np.full(count, activity_idx), start[mask], end[mask], np.full(count, segment), legend[mask]
+            ]))
+
+    legends = [key for key, _ in sorted(legend_codes.items(), key=lambda item: item[1])]
+    if not parts:
+        return np.empty((0, 6), dtype=np.int32), legends
+    intervals = np.concatenate(parts).astype(np.int32)
+    intervals = intervals[np.lexsort((intervals[:, SEGMENT], intervals[:, ACTIVITY], intervals[:, POSITION]))]
+    intervals.flags.writeable = False
+    return intervals, legends
@@ -0,0 +1,289 @@
+"""
+Streaming, schema-validated reading of calendar CSVs.
+
+`ingest_calendar` reads a calendar file in chunks of `chunk_rows` rows,
+with every cell read as text (pandas guesses no types), and converts each
+chunk to the compact types of `schema.compact_calendar` as it goes, so
+memory holds the compact table built so far plus one chunk of text. The
+expected type of each column comes from `calendar_schema`: the activity month
+columns of the calendar's COLUMN_MAPPINGS entry, and the measurements and
+attributes of PLANT_DETAILS_MAPPING (typed by `schema.INTEGER_COLUMNS` and
+`schema.CATEGORY_COLUMNS`, as any other column the file has).
+
+Problems go to a QuarantineReport instead of through silently or to an
+exception:
+
+- rows with more fields than the header, or with values but no common
+  name, are left out (quarantined)
+- a row with a month value that is neither a month nor a placeholder the
+  calendars use ('–', 'Varies') is left out; full or lower-case month
+  names ('march') are read as the abbreviation (coerced)
+- a measurement that isn't a whole number in Int16 range is read as
+  missing (coerced)
+
+Blank rows are skipped, as `data.read_calendar_csv` drops them.
+
+    df, report = ingest_calendar('Annuals_by_Seed.csv', COLUMN_MAPPINGS["Annuals From Seed"], 'Common Name')
+    report.summary()
+"""
+import os
+import time
+import warnings
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from plant_calendar.config import PLANT_DETAILS_MAPPING, MONTH_NAMES
+from plant_calendar.schema import MONTH_CATEGORIES, CATEGORY_COLUMNS, INTEGER_COLUMNS, INTEGER_DTYPE, stripped_uniques, stripped_text, stripped_categorical
+
+CHUNK_ROWS = 50_000
+MAX_REPORTED = 1000 # Problem rows kept for display; the counts cover every one
+
+# Month cell values meaning "no fixed window", kept as categories after 'Dec' like compact_calendar keeps them
+MONTH_PLACEHOLDERS = ['–', '-', 'Varies']
+
+# Lower-cased month spellings read as the abbreviation
+MONTH_SPELLINGS = {spelling: abbreviation for abbreviation, name in zip(MONTH_CATEGORIES, MONTH_NAMES)
+                   for spelling in (abbreviation.lower(), name.lower())}
+MONTH_SPELLINGS['sept'] = 'Sep'
+
+REPORT_COLUMNS = ['line', 'column', 'value', 'problem', 'action']
+
+
+def column_kind(column):
+    """'integer', 'category' or 'text': how a column outside the activity months is typed."""
+    if column in INTEGER_COLUMNS:
+        return 'integer'
+    if column in CATEGORY_COLUMNS:
+        return 'category'
+    return 'text'
+
+
+def calendar_schema(activity_periods, common_name_column):
+    """
+    {column: kind} of a calendar CSV with the activities `activity_periods`;
+    kinds are 'name', 'month', 'integer', 'category' and 'text'.
+    """
+    schema = {common_name_column: 'name'}
+    for start_col, end_col in activity_periods.values():
+        schema[start_col] = schema[end_col] = 'month'
+    for details in PLANT_DETAILS_MAPPING.values():
+        for detail in details:
+            for column in detail['cols']:
+                schema.setdefault(column, column_kind(column))
+    return schema
+
+
+def parser_inputs(activity_periods, common_name_column):
+    """
+    Everything besides the file that the table `ingest_calendar` reads
+    depends on (its schema and how each kind of column is typed), as JSON-
+    serialisable values: what the Parquet cache keys a stored table on.
+    """
+    return {
+        'activity_periods': activity_periods,
+        'schema': calendar_schema(activity_periods, common_name_column),
+        'integer_columns': INTEGER_COLUMNS,
+        'integer_dtype': INTEGER_DTYPE,
+        'category_columns': CATEGORY_COLUMNS,
+        'months': MONTH_CATEGORIES,
+        'month_placeholders': MONTH_PLACEHOLDERS,
+        'month_spellings': MONTH_SPELLINGS,
+    }
+
+
+class QuarantineReport:
+    """
+    What `ingest_calendar` left out or changed, with its throughput. `rows`
+    lists up to `max_reported` problems (REPORT_COLUMNS: the CSV line, the
+    column, the value as written, the problem and 'quarantined' or
+    'coerced'); `summary` counts all of them. Line numbers assume no quoted
+    value spans several lines.
+    """
+
+    def __init__(self, max_reported=MAX_REPORTED):
+        self.max_reported = max_reported
+        self.counts = Counter() # (problem, column, action) -> values
+        self.rows_read = self.rows_loaded = self.rows_quarantined = self.blank_rows = self.chunks = 0
+        self.bytes_read, self.seconds = 0, 0.0
+        self.skipped_lines = [] # Lines the parser skipped, which the data row numbers don't count
+        self._parts, self._reported = [], 0
+
+    def add(self, problems):
+        """Records a DataFrame of problems with a data 'row' (0-based, as parsed) or a 'line', and the other REPORT_COLUMNS."""
+        if problems.empty:
+            return
+        self.counts.update(zip(problems['problem'], problems['column'], problems['action']))
+        if self._reported < self.max_reported:
+            self._parts.append(problems.iloc[:self.max_reported - self._reported])
+            self._reported += len(self._parts[-1])
+
+    @property
+    def rows(self):
+        if not self._parts:
+            return pd.DataFrame(columns=REPORT_COLUMNS)
+        rows = pd.concat(self._parts, ignore_index=True)
+        lines = rows['row'].to_numpy(dtype=float) + 2 # After the header, counting from 1
+        for skipped in sorted(self.skipped_lines):
+            lines[lines >= skipped] += 1
+        rows['line'] = rows['line'].fillna(pd.Series(lines)).astype(np.int64)
+        return rows[REPORT_COLUMNS].sort_values('line', kind='stable', ignore_index=True)
+
+    def summary(self):
+        """Problems per (problem, column, action), most frequent first."""
+        summary = pd.DataFrame([(*key, count) for key, count in self.counts.items()], columns=['problem', 'column', 'action', 'count'])
+        return summary.sort_values('count', ascending=False, kind='stable', ignore_index=True)
+
+    @property
+    def megabytes_per_second(self):
+        return self.bytes_read / 2**20 / self.seconds if self.seconds else 0.0
+
+
+def _problems(rows, column, values, problem, action):
+    return pd.DataFrame({'row': rows, 'line': np.nan, 'column': column, 'value': values, 'problem': problem, 'action': action})
+
+
+def _month_values(values):
+    """
+    (values, bad) for the text of a month column: values as stripped
+    abbreviations (missing when blank), bad marking unrecognised values,
+    and coerced marking values that were read differently than written.
+    """
+    codes, uniques = pd.factorize(values)
+    cleaned = np.empty(len(uniques) + 1, dtype=object) # Last entry: code -1 (missing)
+    cleaned[-1] = np.nan
+    bad, coerced = np.zeros(len(uniques) + 1, dtype=bool), np.zeros(len(uniques) + 1, dtype=bool)
+    for i, value in enumerate(uniques):
+        value = value.strip()
+        if value == '' or value in MONTH_CATEGORIES or value in MONTH_PLACEHOLDERS:
+            cleaned[i] = value or np.nan
+        elif value.lower().rstrip('.') in MONTH_SPELLINGS:
+            cleaned[i], coerced[i] = MONTH_SPELLINGS[value.lower().rstrip('.')], True
+        else:
+            cleaned[i], bad[i] = np.nan, True
+    return cleaned[codes], bad[codes], coerced[codes]
+
+
+def _integer_values(values):
+    """(Int16 array, bad) for the text of a measurement column; bad values become missing."""
+    codes, uniques = stripped_uniques(values) # Each distinct value is parsed once
+    numbers = pd.to_numeric(pd.Series(uniques, dtype=object), errors='coerce').to_numpy(dtype=float, copy=True)
+    limits = np.iinfo(np.int16)
+    with np.errstate(invalid='ignore'):
+        bad = np.isnan(numbers) | (numbers % 1 != 0) | (numbers < limits.min) | (numbers > limits.max)
+    bad &= ~pd.isna(uniques) # Blank cells are missing, not bad
+    numbers[bad] = np.nan
+    numbers, bad = np.append(numbers, np.nan), np.append(bad, False) # Code -1 (missing) picks the last entry
+    return pd.array(numbers[codes], dtype=INTEGER_DTYPE), bad[codes]
+
+
+def ingest_chunk(chunk, schema, report):
+    """
+    Validates and converts one chunk of text columns (as read with
+    dtype=object). Returns the kept rows as a DataFrame of compact columns,
+    recording problems and row counts in `report`.
+    """
+    rows = chunk.index.to_numpy()
+    name_column = next(column for column, kind in schema.items() if kind == 'name')
+    blank = chunk.isna().all(axis=1).to_numpy()
+    quarantined = np.zeros(len(chunk), dtype=bool)
+    names = stripped_text(chunk[name_column]).to_numpy()
+    no_name = pd.isna(names) & ~blank
+    report.add(_problems(rows[no_name], name_column, '', 'no common name', 'quarantined'))
+    quarantined |= no_name
+
+    columns, coerced_problems = {}, []
+    for column in chunk.columns:
+        kind = schema.get(column) or column_kind(column)
+        if kind == 'month':
+            values, bad, coerced = _month_values(chunk[column])
+            report.add(_problems(rows[bad & ~blank], column, chunk[column].to_numpy()[bad & ~blank], 'not a month', 'quarantined'))
+            quarantined |= bad
+            coerced_problems.append((column, coerced, 'month spelling'))
+            columns[column] = values
+        elif kind == 'integer':
+            values, bad = _integer_values(chunk[column])
+            coerced_problems.append((column, bad, 'not a whole number in range'))
+            columns[column] = values
+        else:
+            columns[column] = chunk[column].to_numpy()
+    for column, mask, problem in coerced_problems: # Only for the rows that are kept
+        mask = mask & ~quarantined & ~blank
+        report.add(_problems(rows[mask], column, chunk[column].to_numpy()[mask], problem, 'coerced'))
+
+    keep = ~quarantined & ~blank
+    report.rows_read += int((~blank).sum())
+    report.blank_rows += int(blank.sum())
+    report.rows_quarantined += int(quarantined.sum())
+    report.rows_loaded += int(keep.sum())
+
+    kept = {}
+    for column, values in columns.items():
+        kind = schema.get(column) or column_kind(column)
+        if kind == 'month':
+            kept[column] = stripped_categorical(pd.Series(values[keep], dtype=object), MONTH_CATEGORIES)
+        elif kind == 'category':
+            kept[column] = stripped_categorical(chunk[column][keep])
+        elif kind == 'integer':
+            kept[column] = values[keep]
+        else:
+            kept[column] = values[keep] # Made 'str' once, in _combine
+    return pd.DataFrame(kept)
+
+
+def _combine(parts, schema):
+    """Concatenates the converted chunks, recoding each categorical column to the categories of all of them."""
+    combined = {}
+    for column in parts[0].columns:
+        kind = schema.get(column) or column_kind(column)
+        if kind in ('month', 'category'):
+            leading = MONTH_CATEGORIES if kind == 'month' else []
+            values = {str(value) for part in parts for value in part[column].cat.categories} - set(leading)
+            categories = pd.Index(leading + sorted(values)) # As stripped_categorical orders them
+            codes = [part[column].cat.set_categories(categories).cat.codes.to_numpy() for part in parts]
+            combined[column] = pd.Categorical.from_codes(np.concatenate(codes), categories=categories)
+        elif kind == 'integer':
+            combined[column] = pd.concat([part[column] for part in parts], ignore_index=True).array
+        else:
+            combined[column] = pd.array(np.concatenate([part[column].to_numpy() for part in parts]), dtype='str')
+    return pd.DataFrame(combined)
+
+
+def ingest_calendar(file_path, activity_periods, common_name_column, chunk_rows=CHUNK_ROWS, max_reported=MAX_REPORTED):
+    """
+    Reads a calendar CSV in chunks, validating each against
+    `calendar_schema(activity_periods, common_name_column)`. Returns (df,
+    QuarantineReport); df has the columns and types
+    `data.read_calendar_csv` + `schema.compact_calendar` give a file
+    without problems. Raises KeyError if `common_name_column` is missing.
+    """
+    start = time.perf_counter()
+    schema = calendar_schema(activity_periods, common_name_column)
+    report = QuarantineReport(max_reported)
+    header = pd.read_csv(file_path, nrows=0, skipinitialspace=True).columns.str.strip()
+    if common_name_column not in header:
+        raise KeyError(common_name_column)
+
+    parts = []
+    with warnings.catch_warnings(record=True) as skipped:
+        warnings.simplefilter('always', pd.errors.ParserWarning)
+        reader = pd.read_csv(file_path, dtype=object, skipinitialspace=True, chunksize=chunk_rows, on_bad_lines='warn')
+        for chunk in reader:
+            chunk.columns = header
+            parts.append(ingest_chunk(chunk, schema, report))
+            report.chunks += 1
+    skipped = [message for warning in skipped for message in str(warning.message).strip().splitlines()
+               if message.startswith('Skipping line')] # "Skipping line 12: expected 22 fields, saw 23"
+    report.skipped_lines = [int(message.split()[2].rstrip(':')) for message in skipped]
+    report.add(pd.DataFrame({'row': np.nan, 'line': report.skipped_lines, 'column': '', 'value': '',
+                             'problem': [message.split(': ', 1)[1] for message in skipped], 'action': 'quarantined'}))
+    report.rows_read += len(skipped)
+    report.rows_quarantined += len(skipped)
+
+    df = _combine(parts, schema) if parts else pd.DataFrame(columns=header)
+    empty_unnamed = [column for column in df.columns if column.startswith('Unnamed:') and df[column].isna().all()]
+    df = df.drop(columns=empty_unnamed)
+    report.bytes_read = os.path.getsize(file_path)
+    report.seconds = time.perf_counter() - start
+    return df, report
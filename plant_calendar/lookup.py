@@ -0,0 +1,39 @@
+"""
+Name -> row position index for a loaded calendar.
+
+`load_data` resets the DataFrame index, so row positions double as index
+labels. The filters narrow down those positions (no copies, no `reset_index`),
+which lets the chart and the Plant Details panel fetch a plant's row with a
+dict lookup instead of a boolean-mask scan over the whole column.
+"""
+
+
+def build_name_index(names):
+    """
+    Maps every common name to the list of row positions carrying it, in
+    file order. Returns (name_index, duplicate_names) where duplicate_names
+    holds only the names that appear more than once.
+    """
+    name_index = {}
+    for position, name in enumerate(names):
+        name_index.setdefault(name, []).append(position)
+    duplicate_names = {name: positions for name, positions in name_index.items() if len(positions) > 1}
+    return name_index, duplicate_names
+
+
+def lookup_position(df, name_index, plant_name):
+    """
+    Returns the row position for `plant_name` in `df` (the full calendar,
+    any filtered subset of it, or of one of its columns). When a name is
+    duplicated, the first matching row still present in `df` wins, as
+    `.iloc[0]` on a name mask used to.
+    """
+    for position in name_index[plant_name]:
+        if position in df.index:
+            return position
+    raise KeyError(plant_name)
+
+
+def lookup_row(df, name_index, plant_name):
+    """Returns the row for `plant_name` in `df`, resolved as in `lookup_position`."""
+    return df.loc[lookup_position(df, name_index, plant_name)]
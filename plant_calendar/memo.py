@@ -0,0 +1,66 @@
+"""
+Small thread-safe LRU cache with hit/miss counters, used to memoize search
+results, filtered row sets and built figures across reruns and sessions.
+"""
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    Least-recently-used cache bounded by entry count and, optionally, by the
+    total of `sizeof(value)` over all entries (in whatever unit it returns).
+    """
+
+    def __init__(self, max_entries=128, max_size=None, sizeof=None):
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.sizeof = sizeof or (lambda value: 0)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        size = self.sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self.size -= self._entries.pop(key)[1]
+            if self.max_size is not None and size > self.max_size:
+                return # Would evict everything else and still not fit
+            self._entries[key] = (value, size)
+            self.size += size
+            while len(self._entries) > self.max_entries or (self.max_size is not None and self.size > self.max_size):
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.size -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'size': self.size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,185 @@
+"""
+Per-rerun stage timing.
+
+A `RerunProfile` is started at the top of a rerun and finished at the end.
+While it is active, `stage(name)` blocks anywhere in the app or the package
+record their wall time (and, if memory tracking is on, their peak traced
+memory). With no active profile, `stage` costs almost nothing, so library
+code can be instrumented unconditionally.
+
+    profile = RerunProfile(track_memory=True).start()
+    with stage('load_data'):
+        ...
+    record = profile.finish('complete')
+"""
+import contextvars
+import cProfile
+import io
+import json
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+
+HISTORY_LENGTH = 100 # Reruns kept in the rolling history
+CPROFILE_LINES = 30 # Functions listed in a cProfile report
+OTHER_STAGE = 'other' # Time not covered by any named stage (widgets, layout, cache lookups)
+
+_active_profile = contextvars.ContextVar('plant_calendar_rerun_profile', default=None)
+
+# tracemalloc is process-wide, while profiles belong to sessions running concurrently: tracing runs
+# while any memory-tracking profile is active, and the peak is reset only by a stage that no other
+# measured stage overlaps
+_tracing_lock = threading.Lock()
+_tracing_profiles = 0 # Active profiles tracking memory
+_tracing_started = False # Whether tracing was started here (and so is stopped here)
+_tracing_epoch = 0 # Times tracing was started here; a stage spanning a restart has no peak
+_measured_stages = 0 # Stages running with memory measured
+
+
+def _start_tracing():
+    global _tracing_profiles, _tracing_started, _tracing_epoch
+    with _tracing_lock:
+        _tracing_profiles += 1
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing_started = True
+            _tracing_epoch += 1
+        return tracemalloc.is_tracing()
+
+
+def _stop_tracing():
+    global _tracing_profiles, _tracing_started
+    with _tracing_lock:
+        _tracing_profiles -= 1
+        if _tracing_profiles == 0 and _tracing_started:
+            tracemalloc.stop()
+            _tracing_started = False
+
+
+class RerunProfile:
+    """
+    Stage timings for one rerun. Stages should not nest. Peak memory comes
+    from tracemalloc, which traces every thread of the process (other
+    sessions included, so stages overlapping in time share one peak) and
+    slows allocation-heavy code down noticeably.
+    """
+
+    def __init__(self, track_memory=False, cprofile=False, **context):
+        self.track_memory = track_memory
+        self.context = context # Extra fields for the record, e.g. the calendar shown
+        self.stages = {}
+        self._profiler = cProfile.Profile() if cprofile else None
+        self._token = None
+
+    def start(self):
+        self._token = _active_profile.set(self)
+        self.started = datetime.now(timezone.utc)
+        self._memory_tracked = self.track_memory and _start_tracing()
+        if self._profiler is not None:
+            self._profiler.enable()
+        self._start = time.perf_counter()
+        return self
+
+    @contextmanager
+    def stage(self, name):
+        global _measured_stages
+        tracing = False
+        if self._memory_tracked:
+            with _tracing_lock:
+                tracing, epoch = tracemalloc.is_tracing(), _tracing_epoch
+                if tracing:
+                    if _measured_stages == 0:
+                        tracemalloc.reset_peak()
+                    _measured_stages += 1
+                    start_memory = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry = self.stages.setdefault(name, {'ms': 0.0, 'calls': 0})
+            entry['ms'] += (time.perf_counter() - start) * 1000
+            entry['calls'] += 1
+            if tracing:
+                with _tracing_lock:
+                    _measured_stages -= 1
+                    if tracemalloc.is_tracing() and _tracing_epoch == epoch: # Not stopped while the stage ran
+                        peak_kib = (tracemalloc.get_traced_memory()[1] - start_memory) / 1024
+                        entry['peak_kib'] = max(entry.get('peak_kib', 0.0), peak_kib)
+
+    def finish(self, outcome):
+        """
+        Stops timing and returns the rerun's record: a JSON-serialisable dict
+        with the total time, every stage, `outcome` ('complete', 'stopped',
+        'error', ...) and, if cProfile was on, its report as text.
+        """
+        total_ms = (time.perf_counter() - self._start) * 1000
+        if self._profiler is not None:
+            self._profiler.disable()
+        if self.track_memory:
+            _stop_tracing()
+        _active_profile.reset(self._token)
+
+        stages = dict(self.stages)
+        stages[OTHER_STAGE] = {'ms': max(total_ms - sum(entry['ms'] for entry in stages.values()), 0.0), 'calls': 1}
+        record = {
+            'started': self.started.isoformat(timespec='milliseconds'),
+            **self.context,
+            'outcome': outcome,
+            'total_ms': total_ms,
+            'memory_tracked': self._memory_tracked,
+            'cprofile': self._profiler is not None,
+            'stages': stages,
+        }
+        if self._profiler is not None:
+            record['cprofile_report'] = self.cprofile_report()
+        return record
+
+    def cprofile_report(self, limit=CPROFILE_LINES, sort_by='cumulative'):
+        """Text table of the `limit` most expensive functions, if cProfile was on."""
+        if self._profiler is None:
+            return ""
+        out = io.StringIO()
+        pstats.Stats(self._profiler, stream=out).strip_dirs().sort_stats(sort_by).print_stats(limit)
+        return out.getvalue()
+
+
+def stage(name):
+    """Times a block against the active rerun profile, if there is one."""
+    profile = _active_profile.get()
+    return profile.stage(name) if profile is not None else nullcontext()
+
+
+def stage_table(history):
+    """
+    Per-stage summary of a list of rerun records, slowest stage first: the
+    last rerun's time plus the median, 95th percentile and max over the
+    history (all in ms), and the largest peak memory seen (KiB).
+    """
+    import pandas as pd
+
+    rows = [
+        {'rerun': n, 'stage': name, 'ms': entry['ms'], 'peak_kib': entry.get('peak_kib')}
+        for n, record in enumerate(history) for name, entry in record['stages'].items()
+    ]
+    if not rows:
+        return pd.DataFrame(columns=['last ms', 'median ms', 'p95 ms', 'max ms', 'runs', 'peak KiB'])
+    frame = pd.DataFrame(rows)
+    by_stage = frame.groupby('stage', sort=False)
+    last = frame[frame['rerun'] == frame['rerun'].max()].set_index('stage')['ms']
+    table = pd.DataFrame({
+        'last ms': last,
+        'median ms': by_stage['ms'].median(),
+        'p95 ms': by_stage['ms'].quantile(0.95),
+        'max ms': by_stage['ms'].max(),
+        'runs': by_stage.size(),
+        'peak KiB': by_stage['peak_kib'].max(),
+    })
+    return table.sort_values('median ms', ascending=False).round(1)
+
+
+def to_jsonl(history):
+    """Rerun records as JSON lines, one rerun per line."""
+    return "".join(json.dumps(record) + "\n" for record in history)
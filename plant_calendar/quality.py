@@ -0,0 +1,154 @@
+"""
+Data quality engine.
+
+- `MissingnessReport` stacks every calendar into one boolean bitmap of
+  missing values (plants x the union of all CSV columns), computed in one
+  pass when the calendars are loaded, so per-calendar and per-column
+  questions are slices and sums of that array.
+- `diff_against_reference` compares a calendar with a curated "golden"
+  copy of the same file. Rows are paired by plant name and compared by a
+  content hash first, so only rows whose hash changed are compared field by
+  field.
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+
+def source_columns(df):
+    """Columns that came from the CSV: not the derived month code columns, not unnamed empty ones."""
+    return [column for column in df.columns if not column.startswith('_') and not column.startswith('Unnamed:')]
+
+
+def missing_mask(frame):
+    """Boolean array (rows x columns) marking NaN/None cells and text that is empty once stripped."""
+    missing = frame.isna().to_numpy()
+    for j, column in enumerate(frame.columns):
+        if frame[column].dtype == object:
+            codes, uniques = pd.factorize(frame[column])
+            blank = pd.Series(uniques, dtype=object).astype(str).str.strip().eq('').to_numpy(dtype=bool)
+            missing[:, j] |= np.append(blank, False)[codes] # code -1 is NaN, already marked
+    return missing
+
+
+class MissingnessReport:
+    """
+    Missing values of several loaded calendars in one bitmap. `frames` maps
+    each calendar option to the (df, common_name_column) pair returned by
+    `data.load_calendar`. Rows of `bitmap` are the calendars' plants stacked
+    in `calendars` order; its columns are `columns`, the union of the
+    calendars' CSV columns. Cells of columns a calendar does not have are
+    never marked missing.
+    """
+
+    def __init__(self, frames):
+        self.calendars = list(frames)
+        parts, names, self._rows = [], [], {}
+        start = 0
+        for option, (df, common_name_column) in frames.items():
+            parts.append(df[source_columns(df)])
+            names.append(df[common_name_column].to_numpy(dtype=object))
+            self._rows[option] = slice(start, start + len(df))
+            start += len(df)
+
+        combined = pd.concat(parts, ignore_index=True, sort=False)
+        self.columns = list(combined.columns)
+        self.names = np.concatenate(names) if names else np.zeros(0, dtype=object)
+        # applicable[c, j]: calendar c has column j
+        self.applicable = np.array([[column in part.columns for column in self.columns] for part in parts], dtype=bool)
+        self.bitmap = missing_mask(combined)
+        for c, option in enumerate(self.calendars):
+            self.bitmap[self._rows[option]] &= self.applicable[c]
+
+    def has_column(self, calendar, column):
+        return column in self.columns and self.applicable[self.calendars.index(calendar), self.columns.index(column)]
+
+    def missing_plants(self, calendar, column):
+        """Names of the plants in `calendar` with no value for `column`, in file order."""
+        if not self.has_column(calendar, column):
+            return []
+        rows = self._rows[calendar]
+        return self.names[rows][self.bitmap[rows, self.columns.index(column)]].tolist()
+
+    def counts(self):
+        """Missing values per column (rows) and calendar (columns); empty where a calendar has no such column."""
+        counts = np.array([self.bitmap[self._rows[option]].sum(axis=0) for option in self.calendars], dtype=float)
+        counts[~self.applicable] = np.nan
+        return pd.DataFrame(counts.T, index=self.columns, columns=self.calendars).astype('Int64')
+
+
+# --- Golden reference diff ---
+ReferenceDiff = namedtuple('ReferenceDiff', ['added', 'removed', 'changes', 'added_columns', 'removed_columns'])
+ReferenceDiff.__doc__ = """
+Result of `diff_against_reference`: plant names only in the current file
+(`added`) or only in the reference (`removed`), a DataFrame of changed
+fields with columns Plant, Field, Reference and Current, and the columns
+only in the current file or only in the reference.
+"""
+
+
+def normalized_text(df, columns):
+    """
+    Cell values as comparable text: numbers in one canonical float form (so
+    15, 15.0 and ' 15' are equal), other text stripped, missing as ''.
+    """
+    text = {}
+    for column in columns:
+        # Catalog columns repeat a few values many times: normalise each distinct value once
+        codes, uniques = pd.factorize(df[column])
+        uniques = pd.Series(uniques, dtype=object)
+        numbers = pd.to_numeric(uniques, errors='coerce').astype(float)
+        strings = uniques.astype(str).str.strip().where(numbers.isna(), numbers.astype(str))
+        text[column] = np.append(strings.to_numpy(dtype=object), '')[codes] # code -1 (missing) picks the ''
+    return pd.DataFrame(text, index=df.index)
+
+
+def row_hashes(text):
+    """64-bit content hash of every row of a `normalized_text` frame."""
+    if text.shape[1] == 0:
+        return np.zeros(len(text), dtype=np.uint64)
+    return pd.util.hash_pandas_object(text, index=False).to_numpy()
+
+
+def row_keys(names):
+    """(name, occurrence) keys, so plants listed more than once pair up in file order."""
+    names = pd.Series(names).reset_index(drop=True)
+    return pd.MultiIndex.from_arrays([names, names.groupby(names).cumcount()])
+
+
+def diff_against_reference(current, reference, common_name_column):
+    """
+    Compares two versions of a calendar table (as returned by
+    `data.read_calendar_csv` or `data.load_calendar`). Returns a ReferenceDiff.
+    """
+    current_columns, reference_columns = source_columns(current), source_columns(reference)
+    shared = [column for column in current_columns if column in reference_columns and column != common_name_column]
+    current_text, reference_text = normalized_text(current, shared), normalized_text(reference, shared)
+
+    current_keys, reference_keys = row_keys(current[common_name_column]), row_keys(reference[common_name_column])
+    reference_rows = reference_keys.get_indexer(current_keys)
+    added = current_keys[reference_rows < 0].get_level_values(0).tolist()
+    removed = reference_keys[current_keys.get_indexer(reference_keys) < 0].get_level_values(0).tolist()
+
+    # Only rows whose content hash changed are compared field by field
+    current_rows = np.flatnonzero(reference_rows >= 0)
+    reference_rows = reference_rows[current_rows]
+    changed = row_hashes(current_text)[current_rows] != row_hashes(reference_text)[reference_rows]
+    current_rows, reference_rows = current_rows[changed], reference_rows[changed]
+
+    differs = current_text.iloc[current_rows].to_numpy() != reference_text.iloc[reference_rows].to_numpy()
+    row_idx, field_idx = np.nonzero(differs)
+    changes = pd.DataFrame({
+        'Plant': current[common_name_column].to_numpy(dtype=object)[current_rows[row_idx]],
+        'Field': np.array(shared, dtype=object)[field_idx],
+        'Reference': reference[shared].iloc[reference_rows].to_numpy(dtype=object)[row_idx, field_idx],
+        'Current': current[shared].iloc[current_rows].to_numpy(dtype=object)[row_idx, field_idx],
+    })
+    return ReferenceDiff(
+        added=added,
+        removed=removed,
+        changes=changes,
+        added_columns=[column for column in current_columns if column not in reference_columns],
+        removed_columns=[column for column in reference_columns if column not in current_columns],
+    )
@@ -0,0 +1,90 @@
+"""
+Row-level change detection between two loaded versions of a calendar file.
+
+Every loaded table carries a 64-bit content hash per row (ROW_HASH_COLUMN,
+added when the CSV is parsed). When a file is saved again, `match_rows`
+pairs the new rows with unchanged rows of the previous version by hash, so
+derived structures can be carried over and recomputed only for the rows
+that were edited, added or moved:
+
+    changes = match_rows(previous_df, df, common_name_column)
+    intervals, legends = update_intervals(previous_intervals, changes, df, option, activity_periods, year)
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from plant_calendar.geometry import activity_intervals, POSITION, ACTIVITY, SEGMENT, LEGEND
+
+ROW_HASH_COLUMN = '_Row Hash'
+
+RowChanges = namedtuple('RowChanges', ['previous_positions', 'moved_to', 'changed', 'names_unchanged'])
+RowChanges.__doc__ = """
+How the rows of a new table relate to the previous version's rows:
+`previous_positions[i]` is the previous position of new row i, or -1 if
+row i is new or edited; `moved_to[j]` is the new position of previous row
+j, or -1 if it was edited or removed; `changed` lists the new positions
+with no unchanged counterpart; `names_unchanged` is True if the common
+names are the same, in the same order.
+"""
+
+
+def add_row_hashes(df):
+    """Adds ROW_HASH_COLUMN: a hash of each row's values over every column that came from the CSV."""
+    columns = [column for column in df.columns if not column.startswith('_')]
+    if columns:
+        df[ROW_HASH_COLUMN] = pd.util.hash_pandas_object(df[columns], index=False).to_numpy()
+    else:
+        df[ROW_HASH_COLUMN] = np.zeros(len(df), dtype=np.uint64)
+    return df
+
+
+def match_rows(previous, current, common_name_column):
+    """
+    Pairs the rows of `current` with identical rows of `previous` (both with
+    ROW_HASH_COLUMN). Rows with the same content pair up in file order.
+    Returns a RowChanges.
+    """
+    def keys(hashes):
+        hashes = pd.Series(hashes)
+        return pd.MultiIndex.from_arrays([hashes, hashes.groupby(hashes).cumcount()])
+
+    previous_keys, current_keys = keys(previous[ROW_HASH_COLUMN].to_numpy()), keys(current[ROW_HASH_COLUMN].to_numpy())
+    previous_positions = previous_keys.get_indexer(current_keys).astype(np.int64)
+    moved_to = np.full(len(previous), -1, dtype=np.int64)
+    kept = np.flatnonzero(previous_positions >= 0)
+    moved_to[previous_positions[kept]] = kept
+
+    previous_names = previous[common_name_column].to_numpy(dtype=object)
+    current_names = current[common_name_column].to_numpy(dtype=object)
+    return RowChanges(
+        previous_positions=previous_positions,
+        moved_to=moved_to,
+        changed=np.flatnonzero(previous_positions < 0),
+        names_unchanged=len(previous_names) == len(current_names) and bool((previous_names == current_names).all()),
+    )
+
+
+def update_intervals(previous, changes, df, option, activity_periods, year):
+    """
+    The (intervals, legends) pair of `geometry.activity_intervals` for `df`,
+    from the previous version's pair: bars of unchanged rows are moved to
+    their new positions and only the changed rows are computed again.
+    Legends keep their previous codes; new ones are appended.
+    """
+    intervals, legends = previous
+    kept = intervals[changes.moved_to[intervals[:, POSITION]] >= 0]
+    kept[:, POSITION] = changes.moved_to[kept[:, POSITION]]
+
+    fresh, fresh_legends = activity_intervals(df.iloc[changes.changed], option, activity_periods, year)
+    legend_codes = {legend: code for code, legend in enumerate(legends)}
+    fresh_codes = np.array([legend_codes.setdefault(legend, len(legend_codes)) for legend in fresh_legends], dtype=np.int32)
+    fresh = fresh.copy()
+    if len(fresh):
+        fresh[:, LEGEND] = fresh_codes[fresh[:, LEGEND]]
+
+    merged = np.concatenate([kept, fresh]).astype(np.int32)
+    merged = merged[np.lexsort((merged[:, SEGMENT], merged[:, ACTIVITY], merged[:, POSITION]))]
+    merged.flags.writeable = False
+    return merged, list(legend_codes)
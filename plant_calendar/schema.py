@@ -0,0 +1,110 @@
+"""
+Compact column types for loaded calendars.
+
+`compact_calendar` is applied to every freshly parsed calendar (before it is
+stored in the Parquet cache), so a loaded table holds:
+
+- activity month columns ('Sow Start', ...) as categoricals over the month
+  abbreviations in calendar order, one byte per cell
+- low-cardinality plant attributes ('Light', 'Water Need', ...) as
+  categoricals of their stripped values
+- whole-number measurements ('Height (cm)', ...) as nullable Int16
+- no empty 'Unnamed: N' columns (trailing commas in a CSV header)
+
+Blank text becomes missing. Values are never lost: a month column keeps any
+unrecognised value as an extra category after 'Dec', and a measurement
+column with fractions, text or out-of-range numbers keeps its parsed dtype.
+"""
+import numpy as np
+import pandas as pd
+
+# Month abbreviations used in the CSVs, in calendar order (category code + 1 = month number)
+MONTH_CATEGORIES = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+# Plant attributes with a handful of distinct values
+CATEGORY_COLUMNS = ['Difficulty', 'Light', 'Water Need', 'Pollinator Friendly', 'Evergreen/ Deciduous', 'Cutting Type',
+                    'How to Overwinter']
+
+# Whole-number measurements (temperatures, day counts, sizes)
+INTEGER_COLUMNS = ['Germ Temp Min (°C)', 'Germ Temp Max (°C)', 'Germ Days Min', 'Germ Days Max',
+                   'Root Temp Min (°C)', 'Root Temp Max (°C)', 'Root Days Min', 'Root Days Max',
+                   'Height (cm)', 'Spread (cm)', 'Spacing (cm)']
+INTEGER_DTYPE = 'Int16'
+
+
+def stripped_uniques(values):
+    """pd.factorize of `values` with each distinct value stripped once; blank values become NaN."""
+    codes, uniques = pd.factorize(values)
+    uniques = pd.Series(uniques, dtype=object).map(lambda value: value.strip() if isinstance(value, str) else value)
+    return codes, uniques.where(uniques != '').to_numpy(dtype=object)
+
+
+def stripped_text(values):
+    """Values as stripped strings, with missing and blank cells as NaN."""
+    codes, uniques = stripped_uniques(values)
+    return pd.Series(np.append(uniques, np.nan)[codes], index=values.index, dtype=object) # Code -1 (missing) picks the NaN
+
+
+def stripped_categorical(values, leading_categories=()):
+    """
+    Stripped values as a categorical whose categories are
+    `leading_categories` followed by every other value, sorted.
+    """
+    codes, uniques = stripped_uniques(values)
+    present = ~pd.isna(uniques)
+    extra = sorted(set(uniques[present].astype(str)) - set(leading_categories))
+    categories = pd.Index(list(leading_categories) + extra)
+    unique_codes = np.full(len(uniques) + 1, -1, dtype=np.int64) # Last entry: code -1 (missing) stays missing
+    unique_codes[:-1][present] = categories.get_indexer(uniques[present].astype(str))
+    return pd.Categorical.from_codes(unique_codes[codes], categories=categories)
+
+
+def small_integers(values):
+    """`values` as nullable Int16, or None if any value is not a whole number in range."""
+    numbers = pd.to_numeric(values, errors='coerce')
+    if (numbers.isna() & stripped_text(values).notna()).any():
+        return None # Text that isn't a number
+    present = numbers.dropna()
+    limits = np.iinfo(np.int16)
+    if not ((present % 1 == 0) & (present >= limits.min) & (present <= limits.max)).all():
+        return None
+    return numbers.astype(INTEGER_DTYPE)
+
+
+def compact_calendar(df, activity_periods):
+    """
+    Converts the columns of a parsed calendar to the compact types above, in
+    place, and drops its empty unnamed columns. `activity_periods` maps each
+    activity to its (start, end) month columns. Returns `df`.
+    """
+    empty_unnamed = [column for column in df.columns if column.startswith('Unnamed:') and df[column].isna().all()]
+    df.drop(columns=empty_unnamed, inplace=True)
+
+    month_columns = {column for columns in activity_periods.values() for column in columns}
+    for column in df.columns:
+        if column in month_columns:
+            df[column] = stripped_categorical(df[column], MONTH_CATEGORIES)
+        elif column in CATEGORY_COLUMNS:
+            df[column] = stripped_categorical(df[column])
+        elif column in INTEGER_COLUMNS:
+            integers = small_integers(df[column])
+            if integers is not None:
+                df[column] = integers
+    return df
+
+
+def category_mask(values, wanted):
+    """
+    Boolean array marking the entries of a categorical Series whose value is
+    one of `wanted`, computed on the integer codes. Missing values and
+    values not among the categories never match.
+    """
+    wanted_codes = values.cat.categories.get_indexer(list(wanted))
+    lookup = np.zeros(len(values.cat.categories) + 1, dtype=bool) # Last entry: code -1 (missing)
+    lookup[wanted_codes[wanted_codes >= 0]] = True
+    return lookup[values.cat.codes.to_numpy()]
+
+
+def memory_usage(df):
+    """Bytes held by `df`, including the Python strings of object columns."""
+    return int(df.memory_usage(deep=True).sum())
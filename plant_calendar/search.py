@@ -0,0 +1,144 @@
+"""
+Plant-name search index: accent-folded substring search plus typo-tolerant,
+ranked trigram matching, over one calendar or several at once.
+
+Names are folded to lower-case letters and digits only, so 'sweetpea' finds
+'Sweet Pea' and 'bears breeches' finds 'Acanthus (Bear’s breeches)'. Each
+name is indexed under its full form, the part outside parentheses and every
+parenthetical (scientific or common) name, so a misspelled 'yarow' still
+ranks 'Achillea (Yarrow)' first.
+"""
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+_NON_ALNUM = re.compile(r'[^0-9a-z]+')
+_PARENTHETICAL = re.compile(r'\(([^)]*)\)')
+
+
+def fold(text):
+    """Lower-cases `text`, strips accents and drops everything but letters and digits."""
+    text = str(text)
+    if not text.isascii():
+        text = unicodedata.normalize('NFKD', text)
+        text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    return _NON_ALNUM.sub('', text.lower())
+
+
+def name_keys(name):
+    """Folded forms a plant name is indexed under (full name, name outside brackets, bracketed names)."""
+    keys = [fold(name), fold(_PARENTHETICAL.sub(' ', name))]
+    keys += [fold(part) for part in _PARENTHETICAL.findall(name)]
+    return list(dict.fromkeys(key for key in keys if key))
+
+
+def trigrams(key):
+    padded = f"^{key}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex:
+    """
+    Search index over the names of one or more calendars.
+
+    `sources` is a list of (catalog, names) pairs, where `names` is a pandas
+    Series of common names indexed by row position. Matches are returned as
+    entry ids; `catalog_of`/`position_of`/`name_of` map them back.
+    """
+
+    def __init__(self, sources):
+        self.catalogs = []
+        entry_catalog, entry_position, self.names, self._folded = [], [], [], []
+        key_entry, key_length, postings = [], [], {}
+
+        for catalog, names in sources:
+            catalog_idx = len(self.catalogs)
+            self.catalogs.append(catalog)
+            for position, name in names.items():
+                entry = len(self.names)
+                entry_catalog.append(catalog_idx)
+                entry_position.append(position)
+                self.names.append(name)
+                self._folded.append(fold(name))
+                for key in name_keys(name):
+                    key_id = len(key_entry)
+                    key_entry.append(entry)
+                    grams = trigrams(key)
+                    key_length.append(len(grams))
+                    for gram in grams:
+                        postings.setdefault(gram, []).append(key_id)
+
+        self.entry_catalog = np.array(entry_catalog, dtype=np.int32)
+        self.entry_position = np.array(entry_position, dtype=np.int64)
+        self._key_entry = np.array(key_entry, dtype=np.int32)
+        self._key_length = np.array(key_length, dtype=np.int32)
+        self._postings = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+        # Vectorised scan for queries too short to have a trigram
+        self._folded_series = pd.Series(self._folded, dtype='string')
+
+    def __len__(self):
+        return len(self.names)
+
+    def catalog_of(self, entry): return self.catalogs[self.entry_catalog[entry]]
+    def position_of(self, entry): return int(self.entry_position[entry])
+    def name_of(self, entry): return self.names[entry]
+
+    def substring(self, query):
+        """Entry ids (in index order) whose folded name contains the folded `query`."""
+        query = fold(query)
+        if not query:
+            return np.arange(len(self.names))
+        if len(query) < 3:
+            return np.flatnonzero(self._folded_series.str.contains(query, regex=False).to_numpy(dtype=bool))
+
+        # Keys containing every trigram of the query, then confirm on the full folded name
+        grams = sorted((self._postings.get(gram) for gram in trigrams(query) if '^' not in gram and '$' not in gram),
+                       key=lambda ids: -1 if ids is None else len(ids))
+        if grams[0] is None:
+            return np.empty(0, dtype=np.int64)
+        candidates = grams[0]
+        for ids in grams[1:]:
+            candidates = np.intersect1d(candidates, ids, assume_unique=True)
+            if len(candidates) == 0:
+                return np.empty(0, dtype=np.int64)
+        entries = np.unique(self._key_entry[candidates])
+        return np.array([entry for entry in entries if query in self._folded[entry]], dtype=np.int64)
+
+    def fuzzy(self, query, limit=20, min_score=0.5):
+        """
+        Typo-tolerant matches as (entry, score) pairs, best first. The score
+        is the trigram Dice similarity between the query and the closest
+        indexed form of the name, from 0 to 1.
+        """
+        query = fold(query)
+        if not query:
+            return []
+        grams = trigrams(query)
+        hits = [self._postings[gram] for gram in grams if gram in self._postings]
+        if not hits:
+            return []
+        shared = np.bincount(np.concatenate(hits), minlength=len(self._key_entry))
+        keys = np.flatnonzero(shared)
+        key_scores = 2.0 * shared[keys] / (len(grams) + self._key_length[keys])
+
+        # Best-scoring key per entry
+        order = np.lexsort((-key_scores, self._key_entry[keys]))
+        entries, first = np.unique(self._key_entry[keys][order], return_index=True)
+        scores = key_scores[order][first]
+
+        keep = scores >= min_score
+        entries, scores = entries[keep], scores[keep]
+        best = np.lexsort((entries, -scores))[:limit]
+        return [(int(entries[i]), float(scores[i])) for i in best]
+
+    def search(self, query, limit=20):
+        """
+        Substring matches if there are any (exact=True), otherwise the ranked
+        fuzzy matches (exact=False). Returns (entry ids, exact).
+        """
+        entries = self.substring(query)
+        if len(entries):
+            return entries, True
+        return np.array([entry for entry, _ in self.fuzzy(query, limit=limit)], dtype=np.int64), False
@@ -0,0 +1,407 @@
+"""
+Optional SQLite storage for the calendars, queried with indexes instead of
+loading a whole table into pandas and masking it.
+
+`CalendarStore.sync` imports a calendar file (parsed by `data.load_calendar`,
+so through the Parquet cache) into one table per calendar, indexed on the
+common name, light and each activity's start/end month codes, plus a
+trigram table for name search. The query methods mirror what the app does
+with a loaded DataFrame and return the same results:
+
+- `search`: `search.SearchIndex.search` (substring, then ranked fuzzy matches)
+- `filter_and_sort`: `filters.filter_and_sort` (month/activity and light filters, sorted names)
+- `lookup_row`: `lookup.lookup_row` (a plant's row for the details panel)
+- `rows`: only the rows at the given positions, typed as `load_calendar` types them
+- `month_codes`: every row's month codes, to shift the calendar to a climate region
+
+    store = CalendarStore('.calendar_cache/calendars.sqlite')
+    store.sync(option, file_path, COLUMN_MAPPINGS[option])
+    _, positions, names = store.filter_and_sort(option, month_num=3, activities=['Sow'], light_types=['Full Sun'])
+    df = store.rows(option, positions)
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+from plant_calendar.data import data_version, load_calendar
+from plant_calendar.filters import SORT_ORDERS, month_bitmask, start_code_column, end_code_column, month_mask_column
+from plant_calendar.reload import ROW_HASH_COLUMN
+from plant_calendar.search import fold, name_keys, trigrams
+
+FOLDED_NAME_COLUMN = '_Folded Name' # Folded common name, for searches too short to have a trigram
+INSERT_BATCH_ROWS = 10_000
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _column_type(values):
+    """How `rows` restores a column's type: its categories if categorical, else its dtype name."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return [str(category) for category in values.cat.categories]
+    return str(values.dtype)
+
+
+def _python_values(values):
+    """A column as a list of Python values that sqlite3 can bind, with None for missing values."""
+    values = pd.Series(values)
+    return values.astype(object).where(values.notna(), None).tolist()
+
+
+class CalendarStore:
+    """
+    SQLite database of imported calendars at `db_path`. Safe to share
+    between threads: each thread gets its own connection and imports are
+    serialised.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._import_lock = threading.Lock()
+        self._meta_lock = threading.Lock()
+        self._meta = {} # option -> row of the `calendars` table, as a dict
+        self._imports = 0 # Imports committed; metadata read before one of them is not kept
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with self._connection() as con:
+            con.execute("""CREATE TABLE IF NOT EXISTS calendars (
+                option TEXT PRIMARY KEY, table_name TEXT, file_version TEXT, common_name_column TEXT, columns TEXT,
+                activity_periods TEXT, row_count INTEGER)""") # columns: {column: `_column_type`}, in file order
+
+    def _connection(self):
+        con = getattr(self._local, 'connection', None)
+        if con is None:
+            con = self._local.connection = sqlite3.connect(self.db_path)
+            con.execute('PRAGMA journal_mode=WAL') # Readers aren't blocked by an import
+        return con
+
+    # --- Import ---
+    def sync(self, option, file_path, activity_periods, cache_dir=None):
+        """
+        Imports `file_path` as calendar `option` unless this version of the
+        file already is. Returns True if it was imported. Raises what
+        `load_calendar` raises.
+        """
+        version = data_version(file_path)
+        if self.version(option) == version:
+            return False
+        with self._import_lock:
+            self._forget(option)
+            if self.version(option) == version: # Imported by another thread meanwhile
+                return False
+            df, common_name_column = load_calendar(file_path, activity_periods, cache_dir)
+            self._import(option, df, common_name_column, activity_periods, version)
+            self._forget(option)
+        return True
+
+    def _import(self, option, df, common_name_column, activity_periods, version):
+        table = 'calendar_' + re.sub(r'[^a-z0-9]+', '_', option.lower()).strip('_')
+        source_columns = [column for column in df.columns if not column.startswith('_')]
+        activities = [activity for activity in activity_periods if start_code_column(activity) in df.columns]
+        code_columns = [column for activity in activities for column in (start_code_column(activity), end_code_column(activity))]
+        names = df[common_name_column].to_numpy(dtype=object)
+
+        columns = {
+            **{column: _python_values(df[column]) for column in source_columns},
+            **{column: df[column].to_numpy(dtype=np.int64).tolist() for column in code_columns},
+            ROW_HASH_COLUMN: df[ROW_HASH_COLUMN].to_numpy().view(np.int64).tolist(), # SQLite integers are signed
+            FOLDED_NAME_COLUMN: [fold(name) for name in names],
+        }
+        keys, grams = [], []
+        for position, name in enumerate(names):
+            for key in name_keys(name):
+                key_grams = trigrams(key)
+                keys.append((len(keys), position, len(key_grams)))
+                grams.extend((gram, keys[-1][0]) for gram in key_grams)
+        grams.sort() # Inserted in primary key order, the B-tree only ever appends
+
+        con = self._connection()
+        with con: # One transaction: readers see the old version until it commits
+            con.execute('BEGIN') # sqlite3 would otherwise run the DDL below outside the transaction
+            for suffix in ('', '_keys', '_grams'):
+                con.execute(f"DROP TABLE IF EXISTS {table}{suffix}")
+            column_sql = ', '.join(_quote(column) + (' INTEGER' if column in code_columns or column == ROW_HASH_COLUMN else '')
+                                   for column in columns)
+            con.execute(f"CREATE TABLE {table} (position INTEGER PRIMARY KEY, {column_sql})")
+            insert = f"INSERT INTO {table} VALUES ({', '.join('?' * (len(columns) + 1))})"
+            rows = zip(range(len(df)), *columns.values())
+            while batch := [row for _, row in zip(range(INSERT_BATCH_ROWS), rows)]:
+                con.executemany(insert, batch)
+
+            con.execute(f"CREATE INDEX {table}_name ON {table} ({_quote(common_name_column)})")
+            if 'Light' in source_columns:
+                con.execute(f"CREATE INDEX {table}_light ON {table} (Light)")
+            for activity in activities:
+                slug = re.sub(r'[^a-z0-9]+', '_', activity.lower())
+                start, end = _quote(start_code_column(activity)), _quote(end_code_column(activity))
+                con.execute(f"CREATE INDEX {table}_{slug}_start ON {table} ({start}, {end})")
+                con.execute(f"CREATE INDEX {table}_{slug}_end ON {table} ({end})")
+
+            con.execute(f"CREATE TABLE {table}_keys (key_id INTEGER PRIMARY KEY, position INTEGER, gram_count INTEGER)")
+            con.executemany(f"INSERT INTO {table}_keys VALUES (?, ?, ?)", keys)
+            con.execute(f"CREATE TABLE {table}_grams (gram TEXT, key_id INTEGER, PRIMARY KEY (gram, key_id)) WITHOUT ROWID")
+            con.executemany(f"INSERT INTO {table}_grams VALUES (?, ?)", grams)
+
+            con.execute(f"ANALYZE {table}") # Row statistics, so the planner skips indexes for unselective filters
+            con.execute("INSERT OR REPLACE INTO calendars VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (option, table, version, common_name_column, json.dumps({column: _column_type(df[column]) for column in source_columns}),
+                         json.dumps({activity: activity_periods[activity] for activity in activities}), len(df)))
+
+    # --- Metadata ---
+    def _forget(self, option):
+        # Drops the cached metadata of `option` and any being read by other threads, which may predate an import
+        with self._meta_lock:
+            self._imports += 1
+            self._meta.pop(option, None)
+
+    def _calendar(self, option):
+        with self._meta_lock:
+            meta, imports = self._meta.get(option), self._imports
+        if meta is None:
+            row = self._connection().execute(
+                "SELECT table_name, file_version, common_name_column, columns, activity_periods, row_count FROM calendars WHERE option = ?",
+                (option,)
+            ).fetchone()
+            if row is None:
+                return None
+            meta = {'table': row[0], 'version': row[1], 'common_name_column': row[2], 'columns': json.loads(row[3]),
+                    'activity_periods': {activity: tuple(columns) for activity, columns in json.loads(row[4]).items()},
+                    'rows': row[5]}
+            with self._meta_lock:
+                if self._imports == imports: # No import since the read began, so this is the current version
+                    self._meta[option] = meta
+        return meta
+
+    def _require(self, option):
+        meta = self._calendar(option)
+        if meta is None:
+            raise KeyError(f"Calendar {option!r} has not been imported")
+        return meta
+
+    def version(self, option):
+        """The `data_version` of the file `option` was last imported from, or None."""
+        meta = self._calendar(option)
+        return meta['version'] if meta else None
+
+    def columns(self, option):
+        """Columns of the imported calendar file, in file order."""
+        return list(self._require(option)['columns'])
+
+    def common_name_column(self, option):
+        return self._require(option)['common_name_column']
+
+    def row_count(self, option):
+        return self._require(option)['rows']
+
+    # --- Queries ---
+    def _query(self, sql, params=()):
+        return self._connection().execute(sql, params).fetchall()
+
+    def light_types(self, option):
+        """Distinct light values, sorted (empty if the calendar has no 'Light' column)."""
+        meta = self._require(option)
+        if 'Light' not in meta['columns']:
+            return []
+        return [row[0] for row in self._query(f"SELECT DISTINCT Light FROM {meta['table']} WHERE Light IS NOT NULL ORDER BY Light")]
+
+    def duplicate_names(self, option):
+        """{name: positions} for the common names on more than one row, like `lookup.build_name_index`."""
+        meta = self._require(option)
+        name = _quote(meta['common_name_column'])
+        rows = self._query(f"""SELECT {name}, json_group_array(position) FROM (
+            SELECT {name}, position FROM {meta['table']} WHERE {name} IN (
+                SELECT {name} FROM {meta['table']} GROUP BY {name} HAVING COUNT(*) > 1) ORDER BY position)
+            GROUP BY {name} ORDER BY MIN(position)""")
+        return {plant_name: json.loads(positions) for plant_name, positions in rows}
+
+    def names(self, option, positions=None):
+        """Unique common names, in file order, of the rows at `positions` (default: all)."""
+        meta = self._require(option)
+        name = _quote(meta['common_name_column'])
+        where, params = self._positions_clause(positions)
+        rows = self._query(f"SELECT {name} FROM {meta['table']} {'WHERE ' + where if where else ''} "
+                           f"GROUP BY {name} ORDER BY MIN(position)", params)
+        return [row[0] for row in rows]
+
+    @staticmethod
+    def _positions_clause(positions):
+        if positions is None:
+            return '', []
+        return "position IN (SELECT value FROM json_each(?))", [json.dumps([int(position) for position in positions])]
+
+    def substring(self, option, query):
+        """Row positions (sorted) whose folded name contains the folded `query`, as `SearchIndex.substring` finds them."""
+        meta = self._require(option)
+        table = meta['table']
+        folded = fold(query)
+        if not folded:
+            return np.arange(meta['rows'])
+        if len(folded) < 3:
+            rows = self._query(f"SELECT position FROM {table} WHERE instr({_quote(FOLDED_NAME_COLUMN)}, ?) > 0 ORDER BY position", (folded,))
+        else:
+            # Keys holding every trigram of the query, confirmed on the full folded name
+            grams = sorted(gram for gram in trigrams(folded) if '^' not in gram and '$' not in gram)
+            rows = self._query(f"""SELECT DISTINCT k.position FROM {table}_keys k
+                JOIN {table} p ON p.position = k.position
+                WHERE k.key_id IN (SELECT key_id FROM {table}_grams WHERE gram IN ({', '.join('?' * len(grams))})
+                                   GROUP BY key_id HAVING COUNT(*) = ?)
+                  AND instr(p.{_quote(FOLDED_NAME_COLUMN)}, ?) > 0
+                ORDER BY k.position""", (*grams, len(grams), folded))
+        return np.array([row[0] for row in rows], dtype=np.int64)
+
+    def search(self, option, query, limit=20):
+        """
+        Substring matches if there are any (exact=True), otherwise the ranked
+        fuzzy matches (exact=False), like `SearchIndex.search` but as sorted
+        row positions. Returns (positions, exact).
+        """
+        positions = self.substring(option, query)
+        if len(positions):
+            return positions, True
+        return np.sort(np.array([position for position, _ in self.fuzzy(option, query, limit)], dtype=np.int64)), False
+
+    def search_calendars(self, options, query, limit=20):
+        """
+        `search` over several calendars at once, with the results a single
+        SearchIndex over all of them gives: substring matches in any of them,
+        else the `limit` best fuzzy matches overall. Returns
+        ([(option, position), ...], exact).
+        """
+        matches = [(option, int(position)) for option in options for position in self.substring(option, query)]
+        if matches:
+            return matches, True
+        scored = sorted((-score, calendar, position, option) for calendar, option in enumerate(options)
+                        for position, score in self.fuzzy(option, query, limit))
+        return [(option, position) for _, _, position, option in scored[:limit]], False
+
+    def fuzzy(self, option, query, limit=20, min_score=0.5):
+        """Typo-tolerant matches as (position, score) pairs, best first, scored as in `SearchIndex.fuzzy`."""
+        table = self._require(option)['table']
+        grams = sorted(trigrams(fold(query))) if fold(query) else []
+        if not grams:
+            return []
+        rows = self._query(f"""SELECT k.position, MAX(2.0 * s.shared / (? + k.gram_count)) AS score
+            FROM (SELECT key_id, COUNT(*) AS shared FROM {table}_grams WHERE gram IN ({', '.join('?' * len(grams))}) GROUP BY key_id) s
+            JOIN {table}_keys k ON k.key_id = s.key_id
+            GROUP BY k.position HAVING score >= ? ORDER BY score DESC, k.position LIMIT ?""",
+            (len(grams), *grams, min_score, limit))
+        return [(position, score) for position, score in rows]
+
+    def _month_clause(self, meta, activities, month_num):
+        # Active in `month_num` for any of `activities`: a start-end range containing it, or a range
+        # over the year end (start > end) reaching it from either side. Month code 0 matches nothing.
+        clauses, params = [], []
+        for activity in activities:
+            if activity in meta['activity_periods']:
+                start, end = _quote(start_code_column(activity)), _quote(end_code_column(activity))
+                clauses.append(f"({start} BETWEEN 1 AND ? AND {end} >= ?)")
+                clauses.append(f"({start} > {end} AND {end} >= 1 AND ({start} <= ? OR {end} >= ?))")
+                params += [month_num] * 4
+        return '(' + (' OR '.join(clauses) or '0') + ')', params
+
+    def filter_and_sort(self, option, positions=None, month_num=0, activities=None, light_types=(), sort_order=SORT_ORDERS[0],
+                        month_masks=None):
+        """
+        `filters.filter_and_sort` on the rows at `positions` (default: all,
+        e.g. the positions `search` returned): returns (empty_stage,
+        display_positions, plant_names_sorted), with each name's first row.
+        `month_masks` ({activity: uint16 array by position}, e.g. from
+        `climate.shift_calendar` over `month_codes`) replaces the stored
+        month codes for the month filter.
+        """
+        meta = self._require(option)
+        table, name = meta['table'], _quote(meta['common_name_column'])
+        where, params = self._positions_clause(positions)
+        wheres = [where] if where else []
+
+        def any_row():
+            return bool(self._query(f"SELECT 1 FROM {table} WHERE {' AND '.join(wheres)} LIMIT 1", params))
+
+        if month_num != 0 and activities is not None:
+            if month_masks is not None: # The positions active in the month, as `filters.activity_month_mask` finds them
+                bits = np.zeros(meta['rows'], dtype=np.uint16)
+                for activity in activities:
+                    if activity in month_masks:
+                        bits |= month_masks[activity]
+                month_where, month_params = self._positions_clause(np.flatnonzero(bits & (1 << (month_num - 1))))
+            else:
+                month_where, month_params = self._month_clause(meta, activities, month_num)
+            wheres.append(month_where)
+            params += month_params
+            if not any_row():
+                return 'month', [], []
+        if light_types and 'Light' in meta['columns']:
+            wheres.append(f"Light IN ({', '.join('?' * len(light_types))})")
+            params += list(light_types)
+            if not any_row():
+                return 'light', [], []
+
+        order = {"Alphabetical (A-Z)": name, "Alphabetical (Z-A)": f"{name} DESC"}.get(sort_order, 'MIN(position)')
+        # Matching positions first, from the month/light indexes; grouped on the name index, the
+        # planner would read every row to test the filters
+        matching = f"WHERE position IN (SELECT position FROM {table} WHERE {' AND '.join(wheres)})" if wheres else ''
+        rows = self._query(f"SELECT {name}, MIN(position) FROM {table} {matching} GROUP BY {name} ORDER BY {order}", params)
+        return None, [row[1] for row in rows], [row[0] for row in rows]
+
+    def rows(self, option, positions):
+        """
+        The rows at `positions`, in that order and labelled by position,
+        with the column types and month code columns of `load_calendar`.
+        """
+        meta = self._require(option)
+        code_columns = [column for activity in meta['activity_periods']
+                        for column in (start_code_column(activity), end_code_column(activity))]
+        where, params = self._positions_clause(positions)
+        selected = ', '.join(map(_quote, [*meta['columns'], ROW_HASH_COLUMN, *code_columns]))
+        by_position = {row[0]: row[1:] for row in self._query(f"SELECT position, {selected} FROM {meta['table']} WHERE {where}", params)}
+        positions = [int(position) for position in positions]
+        values = list(zip(*(by_position[position] for position in positions))) or [()] * (len(meta['columns']) + 1 + len(code_columns))
+
+        # Built column by column from the stored types, rather than compact_calendar and
+        # add_month_codes again: on a page of rows their per-column overhead outweighs the query
+        columns = {}
+        for (column, column_type), column_values in zip(meta['columns'].items(), values):
+            if isinstance(column_type, list):
+                category_codes = {category: code for code, category in enumerate(column_type)}
+                columns[column] = pd.Categorical.from_codes([category_codes.get(value, -1) for value in column_values], categories=column_type)
+            else: # Via object, so NULLs (None) become missing
+                columns[column] = pd.array(column_values, dtype=object).astype(column_type)
+        columns[ROW_HASH_COLUMN] = np.array(values[len(meta['columns'])], dtype=np.int64).view(np.uint64)
+        codes = iter(values[len(meta['columns']) + 1:])
+        for activity in meta['activity_periods']:
+            start_codes, end_codes = (np.array(next(codes), dtype=np.int8) for _ in range(2))
+            columns[start_code_column(activity)] = start_codes
+            columns[end_code_column(activity)] = end_codes
+            columns[month_mask_column(activity)] = month_bitmask(start_codes, end_codes)
+        return pd.DataFrame(columns, index=pd.Index(positions, dtype=np.int64))
+
+    def month_codes(self, option):
+        """
+        Every row's activity start/end month code columns (as `rows` types
+        them, without the month masks), labelled by position: enough for
+        `climate.shift_calendar` to shift the whole calendar.
+        """
+        meta = self._require(option)
+        code_columns = [column for activity in meta['activity_periods']
+                        for column in (start_code_column(activity), end_code_column(activity))]
+        rows = self._query(f"SELECT position, {', '.join(map(_quote, code_columns))} FROM {meta['table']} ORDER BY position")
+        values = list(zip(*rows)) or [()] * (len(code_columns) + 1)
+        return pd.DataFrame({column: np.array(column_values, dtype=np.int8) for column, column_values in zip(code_columns, values[1:])},
+                            index=pd.Index(values[0], dtype=np.int64))
+
+    def lookup_row(self, option, plant_name, positions=None):
+        """The first row named `plant_name` (among `positions`, if given), as `lookup.lookup_row` finds it. KeyError if none."""
+        meta = self._require(option)
+        where, params = self._positions_clause(positions)
+        row = self._query(f"SELECT position FROM {meta['table']} WHERE {_quote(meta['common_name_column'])} = ? "
+                          f"{'AND ' + where if where else ''} ORDER BY position LIMIT 1", [plant_name, *params])
+        if not row:
+            raise KeyError(plant_name)
+        return self.rows(option, [row[0][0]]).iloc[0]
@@ -0,0 +1,184 @@
+"""
+"What needs doing" by date: an interval index over the day-of-year windows
+of every activity in several calendars, and the weekly task list built on
+it.
+
+`DayIntervalIndex` is a centred interval tree over inclusive day ranges:
+each node holds the ranges containing its centre day, sorted by start and
+by end, so a point ("stab") or range query visits one root-to-leaf path
+per side and slices the matches off sorted arrays, in O(log n + matches)
+rather than comparing every range. Year-wrapping windows arrive already
+split in two by `geometry.activity_intervals`, and a query range that
+wraps (e.g. 20 Dec to 10 Jan) is answered as two.
+
+`TaskIndex` indexes every calendar for one year:
+
+    tasks = TaskIndex(frames, 2026) # {option: (df, common_name_column)}, as CalendarCatalog takes
+    tasks.between(date(2026, 3, 10), date(2026, 4, 25), activities=['Sow', 'Cut'])
+    for week_start, week_end, week_tasks in tasks.weekly(date(2026, 3, 9), weeks=4): ...
+"""
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from plant_calendar.config import COLUMN_MAPPINGS, MONTH_NAMES
+from plant_calendar.geometry import POSITION, ACTIVITY, START_DOY, END_DOY, SEGMENT, activity_intervals, month_day_bounds
+
+
+class DayIntervalIndex:
+    """
+    Centred interval tree over inclusive day ranges [starts[i], ends[i]]
+    (start <= end). Queries return the ids i of the matching ranges, in no
+    particular order.
+    """
+
+    def __init__(self, starts, ends):
+        self.starts = np.asarray(starts, dtype=np.int32)
+        self.ends = np.asarray(ends, dtype=np.int32)
+        # Per node: (centre, left child, right child, ids by start, their starts, ids by end descending, their -ends);
+        # child -1 is none
+        self._nodes = []
+        self._root = self._build(np.arange(len(self.starts)))
+
+    def _build(self, ids):
+        if len(ids) == 0:
+            return -1
+        endpoints = np.concatenate([self.starts[ids], self.ends[ids]])
+        centre = int(np.partition(endpoints, len(endpoints) // 2)[len(endpoints) // 2]) # An endpoint, so some range holds it
+        starts, ends = self.starts[ids], self.ends[ids]
+        here = ids[(starts <= centre) & (ends >= centre)]
+        by_start = here[np.argsort(self.starts[here], kind='stable')]
+        by_end = here[np.argsort(-self.ends[here], kind='stable')]
+        node = len(self._nodes)
+        self._nodes.append(None)
+        left, right = self._build(ids[ends < centre]), self._build(ids[starts > centre])
+        self._nodes[node] = (centre, left, right, by_start, self.starts[by_start], by_end, -self.ends[by_end])
+        return node
+
+    def __len__(self):
+        return len(self.starts)
+
+    def overlapping(self, first_day, last_day):
+        """Ids of the ranges sharing a day with [first_day, last_day]; first_day > last_day wraps over the year end."""
+        if first_day > last_day:
+            early = self._overlapping(1, last_day)
+            # Ranges reaching both ends of the year are already among the late ones
+            return np.concatenate([self._overlapping(first_day, np.iinfo(np.int32).max), early[self.ends[early] < first_day]])
+        return self._overlapping(first_day, last_day)
+
+    def stab(self, day):
+        """Ids of the ranges containing `day`."""
+        return self._overlapping(day, day)
+
+    def _overlapping(self, first_day, last_day):
+        found, stack = [], [self._root]
+        while stack:
+            node = stack.pop()
+            if node < 0:
+                continue
+            centre, left, right, by_start, starts, by_end, neg_ends = self._nodes[node]
+            if last_day < centre: # Only ranges here starting by last_day; nothing to the right
+                found.append(by_start[:np.searchsorted(starts, last_day, side='right')])
+                stack.append(left)
+            elif first_day > centre: # Only ranges here ending from first_day; nothing to the left
+                found.append(by_end[:np.searchsorted(neg_ends, -first_day, side='right')])
+                stack.append(right)
+            else: # The query holds the centre: every range here overlaps it
+                found.append(by_start)
+                stack += [left, right]
+        return np.concatenate(found) if found else np.empty(0, dtype=np.intp)
+
+
+def day_label(year, day):
+    """Day of the year as '10 Mar'."""
+    first_day, _ = month_day_bounds(year)
+    month = int(np.searchsorted(first_day[1:], day, side='right'))
+    return f"{day - int(first_day[month]) + 1} {MONTH_NAMES[month - 1][:3]}"
+
+
+def week_ranges(start, weeks):
+    """(first, last) dates of `weeks` consecutive weeks from `start`."""
+    return [(start + timedelta(weeks=week), start + timedelta(weeks=week, days=6)) for week in range(weeks)]
+
+
+class TaskIndex:
+    """
+    Every activity window of several calendars in `year`, indexed by day.
+    `frames` maps each calendar option to the (df, common_name_column) pair
+    returned by `data.load_calendar`.
+    """
+
+    def __init__(self, frames, year):
+        self.year = year
+        self.calendars = list(frames)
+        activity_names = list(dict.fromkeys(activity for option in frames for activity in COLUMN_MAPPINGS[option]))
+        parts, names, next_id = [], [], 0
+        for calendar_idx, (option, (df, common_name_column)) in enumerate(frames.items()):
+            intervals, _ = activity_intervals(df, option, COLUMN_MAPPINGS[option], year, with_legends=False)
+            activity_codes = np.array([activity_names.index(activity) for activity in COLUMN_MAPPINGS[option]], dtype=np.int32)
+            rows = df.index.get_indexer(intervals[:, POSITION])
+            parts.append(np.column_stack([
+                np.full(len(intervals), calendar_idx), intervals[:, POSITION], rows + next_id,
+                activity_codes[intervals[:, ACTIVITY]] if len(intervals) else intervals[:, ACTIVITY],
+                intervals[:, START_DOY], intervals[:, END_DOY], intervals[:, SEGMENT],
+            ]))
+            names.append(df[common_name_column].to_numpy(dtype=object))
+            next_id += len(df)
+        windows = np.concatenate(parts) if parts else np.empty((0, 7), dtype=np.int64)
+        self.activity_names = activity_names
+        self._calendar, self._position, self._plant, self._activity, starts, ends, segment = windows.T.astype(np.int32)
+
+        # A window over the year end is two segments in a row (activity_intervals sorts them so); both share
+        # a window id and carry the whole window's first and last day for display
+        continues = np.zeros(len(windows), dtype=bool)
+        continues[1:] = segment[1:] == 1
+        self._window = np.cumsum(~continues) - 1
+        self._window_start, self._window_end = starts.copy(), ends.copy()
+        self._window_start[continues] = starts[np.flatnonzero(continues) - 1]
+        self._window_end[np.flatnonzero(continues) - 1] = ends[continues]
+
+        self.index = DayIntervalIndex(starts, ends)
+        self._day_labels = np.array([''] + [day_label(year, day) for day in range(1, int(month_day_bounds(year)[1][12]) + 1)], dtype=object)
+        self._plant_names = np.concatenate(names) if names else np.empty(0, dtype=object)
+
+    def __len__(self):
+        return len(self.index)
+
+    def day_of_year(self, day):
+        """The day of this index's year with the month and day of the date `day` (29 Feb is 28 Feb outside leap years)."""
+        first_day, last_day = month_day_bounds(self.year)
+        return min(int(first_day[day.month]) + day.day - 1, int(last_day[day.month]))
+
+    def between(self, first, last, activities=None, calendars=None, plant_ids=None):
+        """
+        Activity windows overlapping the dates `first` to `last` (inclusive;
+        only month and day count, so a range may run over the year end),
+        optionally only for `activities`, `calendars` and `plant_ids`
+        (plants numbered as CalendarCatalog numbers them: calendars in
+        order, rows in order, e.g. its search index's matches). One row per
+        window, by activity and plant name.
+        """
+        ids = self.index.overlapping(self.day_of_year(first), self.day_of_year(last))
+        if activities is not None:
+            ids = ids[np.isin(self._activity[ids], [self.activity_names.index(a) for a in activities if a in self.activity_names])]
+        if calendars is not None:
+            ids = ids[np.isin(self._calendar[ids], [self.calendars.index(c) for c in calendars if c in self.calendars])]
+        if plant_ids is not None:
+            ids = ids[np.isin(self._plant[ids], plant_ids)]
+        # Both segments of a window over the year end can match: keep one row per window
+        _, first_ids = np.unique(self._window[ids], return_index=True)
+        ids = ids[first_ids]
+        result = pd.DataFrame({
+            'Plant': self._plant_names[self._plant[ids]],
+            'Calendar': np.array(self.calendars, dtype=object)[self._calendar[ids]],
+            'Activity': np.array(self.activity_names, dtype=object)[self._activity[ids]],
+            'From': self._day_labels[self._window_start[ids]],
+            'To': self._day_labels[self._window_end[ids]],
+            'position': self._position[ids],
+        })
+        return result.sort_values(['Activity', 'Plant', 'Calendar'], kind='stable', ignore_index=True)
+
+    def weekly(self, start, weeks=4, **filters):
+        """[(first date, last date, `between` of that week)] for `weeks` weeks from `start`."""
+        return [(first, last, self.between(first, last, **filters)) for first, last in week_ranges(start, weeks)]
@@ -0,0 +1,204 @@
+"""
+Process-wide, single-flight loading of the calendar files, with a background
+warm-up and hot reload of edited files.
+
+A `CalendarLoader` keeps the latest loaded version of every calendar file.
+`warm_up` loads every file on a thread pool without blocking the caller, and
+`get` returns a file's table, joining a load already in flight instead of
+starting another one, so a file is parsed once however many sessions (or
+warm-up threads) ask for it at the same moment.
+
+`watch` polls the files for changes and reloads an edited file in the
+background. The new version's rows are matched to the previous version's
+by content hash (see `reload`), and structures derived from the table
+(`derived`) are carried over, recomputing only what the changed rows need.
+
+    loader = CalendarLoader(cache_dir='.calendar_cache')
+    loader.warm_up([(path, COLUMN_MAPPINGS[option]) for option, path in ...])
+    loader.watch([...])
+    df, common_name_column = loader.get(path, COLUMN_MAPPINGS[option])
+"""
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from plant_calendar.data import data_version, load_calendar
+from plant_calendar.reload import match_rows
+
+WARM_UP_WORKERS = 4 # Parquet reads and most of CSV parsing release the GIL
+WATCH_INTERVAL = 2.0 # Seconds between checks of the watched files
+
+
+class _LoadedFile:
+    """One version of a file: its table, how its rows relate to the previous version's, and derived structures."""
+
+    def __init__(self, version, future):
+        self.version = version
+        self.future = future # Future of (df, common_name_column)
+        self.changes = None # reload.RowChanges against `previous`, for a reload
+        self.previous = None # Derived structures of the previous version, until carried over
+        self.derived = {}
+
+
+class CalendarLoader:
+    """
+    Loads calendars through `data.load_calendar` (with the Parquet cache in
+    `cache_dir`, if given), one load per file version at a time. Safe to
+    share between threads and sessions.
+    """
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir
+        self.warm_up_ms = None # Wall time of the last warm-up, once it has finished
+        self._lock = threading.Lock()
+        self._files = {} # abs path -> _LoadedFile
+        self._stats = {} # abs path -> load and first-request timings, see `report`
+        self._watcher = None
+
+    def get(self, file_path, activity_periods):
+        """
+        The (df, common_name_column) pair of `file_path`, loaded if this
+        version of the file hasn't been yet. Raises what `load_calendar`
+        raises; a failed load is retried by the next call.
+        """
+        return self._get(file_path, activity_periods, source='request')
+
+    def _get(self, file_path, activity_periods, source):
+        path = os.path.abspath(file_path)
+        start = time.perf_counter()
+        version = data_version(path) # FileNotFoundError if the file is missing, like load_calendar
+        with self._lock:
+            previous = self._files.get(path)
+            owner = previous is None or previous.version != version
+            if owner:
+                loaded = self._files[path] = _LoadedFile(version, Future())
+                self._stats[path] = {'version': version, 'loaded_by': source, 'load_ms': None, 'changed_rows': None,
+                                     'first_request_ms': None, 'requests': 0}
+            else:
+                loaded = previous
+
+        if owner:
+            try:
+                df, common_name_column = load_calendar(file_path, activity_periods, self.cache_dir)
+                if previous is not None and previous.future.done() and previous.future.exception() is None:
+                    # A reload: pair rows with the previous version so derived structures can be carried over
+                    loaded.changes = match_rows(previous.future.result()[0], df, common_name_column)
+                    loaded.previous = previous.derived
+                    self._stats[path]['changed_rows'] = len(loaded.changes.changed)
+                loaded.future.set_result((df, common_name_column))
+            except BaseException as error:
+                loaded.future.set_exception(error)
+                with self._lock:
+                    if self._files.get(path) is loaded:
+                        del self._files[path] # Let the next request try again
+            with self._lock:
+                self._stats[path]['load_ms'] = (time.perf_counter() - start) * 1000
+
+        try:
+            return loaded.future.result()
+        finally:
+            if source == 'request':
+                with self._lock:
+                    stats = self._stats.get(path)
+                    if stats is not None and stats['version'] == version:
+                        stats['requests'] += 1
+                        if stats['first_request_ms'] is None:
+                            stats['first_request_ms'] = (time.perf_counter() - start) * 1000
+
+    def derived(self, file_path, version, df, name, build, update=None):
+        """
+        A structure derived from `df`, version `version` of a loaded file,
+        built once per version by `build(df)` and shared. If the file was
+        reloaded and the previous version had it, `update(previous_value,
+        changes, df)` is tried first (with `changes` a reload.RowChanges); it
+        may return None to fall back to `build`. A structure for any version
+        but the latest loaded one is built and not kept.
+        """
+        with self._lock:
+            loaded = self._files.get(os.path.abspath(file_path))
+        if loaded is None or loaded.version != version or not loaded.future.done():
+            return build(df)
+        if name in loaded.derived:
+            return loaded.derived[name]
+
+        value = None
+        previous = (loaded.previous or {}).get(name)
+        if update is not None and previous is not None and loaded.changes is not None:
+            value = update(previous, loaded.changes, df)
+        if value is None:
+            value = build(df)
+        with self._lock:
+            value = loaded.derived.setdefault(name, value)
+            if loaded.previous is not None:
+                loaded.previous.pop(name, None) # Carried over; drop the old one
+        return value
+
+    def warm_up(self, files, max_workers=WARM_UP_WORKERS):
+        """
+        Starts loading every (file_path, activity_periods) pair in `files` on
+        a thread pool and returns at once. Files that are missing or fail to
+        load are skipped; requests for them report the error themselves.
+        """
+        files = [(path, periods) for path, periods in files if os.path.exists(path)]
+        if not files:
+            self.warm_up_ms = 0.0
+            return
+        start = time.perf_counter()
+        pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='calendar-warm-up')
+        pending = [len(files)]
+
+        def load(path, periods):
+            try:
+                self._get(path, periods, source='warm-up')
+            except Exception:
+                pass
+            finally:
+                with self._lock:
+                    pending[0] -= 1
+                    if pending[0] == 0:
+                        self.warm_up_ms = (time.perf_counter() - start) * 1000
+
+        for path, periods in files:
+            pool.submit(load, path, periods)
+        pool.shutdown(wait=False) # Threads exit once the queued loads are done
+
+    def watch(self, files, interval=WATCH_INTERVAL):
+        """
+        Starts a daemon thread that checks every (file_path, activity_periods)
+        pair in `files` each `interval` seconds and reloads a loaded file
+        whose version changed, so the next request finds it ready. Only one
+        watcher runs per loader.
+        """
+        if self._watcher is not None:
+            return
+
+        def poll():
+            while True:
+                time.sleep(interval)
+                for path, periods in files:
+                    with self._lock:
+                        loaded = self._files.get(os.path.abspath(path))
+                    try:
+                        if loaded is not None and data_version(path) != loaded.version:
+                            self._get(path, periods, source='reload')
+                    except Exception:
+                        pass # Missing or half-written file: requests report it, the next poll retries
+
+        self._watcher = threading.Thread(target=poll, name='calendar-watcher', daemon=True)
+        self._watcher.start()
+
+    def report(self):
+        """
+        One row per loaded file version: file name, who loaded it ('warm-up',
+        'request' or 'reload'), load time, rows changed since the previous
+        version (for a reload), the latency the first request for it saw
+        (near zero if it was loaded in the background) and the number of
+        requests.
+        """
+        import pandas as pd
+
+        with self._lock:
+            rows = [{'file': os.path.basename(path), **stats} for path, stats in self._stats.items()]
+        columns = ['file', 'loaded_by', 'load_ms', 'changed_rows', 'first_request_ms', 'requests']
+        return pd.DataFrame(rows, columns=columns).set_index('file').round(1)